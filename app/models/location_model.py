@@ -0,0 +1,22 @@
+import os
+from mongoengine import Document, StringField
+
+
+class City(Document):
+    meta = {
+        "collection": os.getenv("CITY_COLLECTION", "cities"),  # change to your real collection
+        "auto_create_index": False,
+        "strict": False,  # read-only: ignore fields not declared here
+    }
+
+    name = StringField(required=True)
+
+
+class State(Document):
+    meta = {
+        "collection": os.getenv("STATE_COLLECTION", "states"),  # change to your real collection
+        "auto_create_index": False,
+        "strict": False,
+    }
+
+    name = StringField(required=True)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 
 class SearchRequest(BaseModel):
@@ -8,4 +8,10 @@ class SearchRequest(BaseModel):
     page: Optional[int] = Field(default=1, ge=1)
     limit: Optional[int] = Field(default=10, ge=1, le=50)
    
-    threshold_ratio: Optional[float] = Field(default=0.20)
\ No newline at end of file
+    threshold_ratio: Optional[float] = Field(default=0.20)
+    facets: Optional[bool] = Field(default=False, description="Include facet counts (city/state/price/experience)")
+    fields: Optional[List[str]] = Field(
+        default=None,
+        description="Result fields to return (e.g. vendorName, city, startingPrice); _id is always included, unknown names are ignored",
+    )
+    include_structured_query: Optional[bool] = Field(default=True, description="Echo the parsed structured_query in the response")
\ No newline at end of file
@@ -51,7 +51,15 @@ from mongoengine import Document, StringField, IntField, BooleanField, DateTimeF
 
 
 class Vendor(Document):
-    meta = {"collection": "vendors"}  # change to your actual collection name
+    meta = {
+        "collection": "vendors",  # change to your actual collection name
+        # Indexes are declared here and created by the mongo_indexes warm-up step (main.py)
+        "auto_create_index": False,
+        "indexes": [
+            ("-lastActive", "-_id"),  # candidate retrieval order
+            "-updatedAt",  # incremental sync of materialized geo lists
+        ],
+    }
 
     # BASIC
     vendorName = StringField(required=True)
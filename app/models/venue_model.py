@@ -49,7 +49,18 @@ from mongoengine import Document, StringField, IntField, BooleanField, DateTimeF
 
 
 class VenuePackage(Document):
-    meta = {"collection": "venuepackages"}  # change to your real collection
+    meta = {
+        "collection": "venuepackages",  # change to your real collection
+        # Indexes are declared here and created by the mongo_indexes warm-up step (main.py)
+        "auto_create_index": False,
+        "indexes": [
+            ("visibility", "-createdAt", "-_id"),  # candidate retrieval order
+            # Geo equality filters (resolved city/state ObjectIds)
+            ("visibility", "location.state", "-createdAt", "-_id"),
+            ("visibility", "location.city", "-createdAt", "-_id"),
+            "-updatedAt",  # incremental sync of materialized geo lists
+        ],
+    }
 
     title = StringField(required=True)
     description = StringField()
@@ -1,73 +1,436 @@
 import time
-from fastapi import APIRouter, HTTPException
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response
 from bson import ObjectId
 from datetime import datetime
 
 from app.models.request import SearchRequest
-from app.utils.nlp_engine import run_nlp_engine
-from app.utils.hard_filter import hard_filter_vendors, hard_filter_venues
+from app.utils.nlp_engine import is_llm_enabled, run_nlp_engine
+from app.utils.hard_filter import hard_filter_vendors, hard_filter_venues, project_fields
+from app.utils.suggest import SUGGEST_TOP_K, get_suggest_index
+from app.utils.response_cache import cache_key, encoded_etag, etag_matches, get_response_cache, is_response_cache_enabled
+from app.utils.compression import choose_encoding, compress, is_compression_enabled, record_sizes
+from app.utils.metrics import incr, snapshot
+from app.utils.facets import facet_counts
+from app.utils.warmup import readiness
+from app.utils.offload import encode_response, run_cpu_stage
+from app.utils.sharding import is_sharded_search_enabled, sharded_search
+from app.utils.materialized_geo import is_materialized_geo_enabled, materialized_search
+from app.utils.speculative import is_speculative_retrieval_enabled, start_speculation
+from app.utils.cache_warming import record_query
+from app.utils.capture import begin_capture, end_capture, note, stage_timer
+from app.utils.profiling import finish_profile, get_profile, is_admin_token, list_profiles, start_profile
+from app.utils.admission import (
+    DEGRADED_MAX_DEPTH,
+    TIER_CACHE_ONLY,
+    TIER_NORMAL,
+    TIER_SHRINK_POOL,
+    TIER_SKIP_LLM,
+    Overloaded,
+    get_admission_controller,
+    is_admission_control_enabled,
+    stage_slot,
+)
+from app.utils.msgpack_codec import MSGPACK_MEDIA_TYPE, decode_request, encode_msgpack_response, is_msgpack_available
+from app.utils.deadline import DEADLINE_HEADER, DeadlineExceeded, check_deadline, end_deadline, start_deadline, watch_disconnect
+from mongoengine import get_db
     
 
 router = APIRouter()
 
 @router.get("/db-health")
 def db_health():
-    return {"status": "Connection is healthy"}
+    try:
+        start = time.time()
+        get_db().command("ping")
+        return {"status": "Connection is healthy", "ping_ms": round((time.time() - start) * 1000, 2)}
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Database unavailable: {e}")
+
+
+@router.get("/ready")
+def ready():
+    # Readiness probe: 503 until startup warm-up has finished
+    state = readiness()
+    return JSONResponse(content=state, status_code=200 if state["ready"] else 503)
+
+
+@router.get("/metrics")
+def metrics():
+    return snapshot()
+
+
+@router.get("/profiles")
+def profiles(request: Request):
+    if not is_admin_token(request.headers.get("x-admin-token")):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    return {"profiles": list_profiles()}
+
+
+@router.get("/profiles/{profile_id}")
+def profile_download(profile_id: str, request: Request, format: str = Query("speedscope", pattern="^(speedscope|collapsed)$")):
+    """
+    speedscope: open in https://www.speedscope.app
+    collapsed: flamegraph.pl / inferno input (weights in µs)
+    """
+    if not is_admin_token(request.headers.get("x-admin-token")):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    profile = get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found (expired or unknown id)")
+    if format == "collapsed":
+        return Response(content=profile.collapsed(), media_type="text/plain")
+    return JSONResponse(
+        content=profile.speedscope(),
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.speedscope.json"'},
+    )
 
 
 from app.utils.pagination import paginate_results
 from app.utils.ranker import  apply_strict_filter, rank_results
 
 
-@router.post("/search")
-async def search_api(payload: SearchRequest):
-    start_time = time.time()
+SUGGEST_TYPES = {"vendor", "venue", "city", "state", "locality"}
+
+
+@router.get("/suggest")
+async def suggest_api(
+    q: str = Query("", max_length=100),
+    limit: int = Query(8, ge=1, le=SUGGEST_TOP_K),
+    types: Optional[str] = Query(None, description="comma separated: vendor,venue,city,state,locality"),
+):
+    """
+    Typeahead: served purely from the in-memory prefix index.
+    Never touches Mongo or the LLM.
+    """
+    type_filter = None
+    if types:
+        type_filter = {t.strip().lower() for t in types.split(",")} & SUGGEST_TYPES
+
+    return {
+        "query": q,
+        "suggestions": get_suggest_index().suggest(q, limit=limit, types=type_filter) if q.strip() else [],
+    }
+
+
+# Response formats: format → (encoder, media type)
+_FORMATS = {
+    "json": (encode_response, "application/json"),
+    "msgpack": (encode_msgpack_response, MSGPACK_MEDIA_TYPE),
+}
+
+
+def _empty_response(payload: SearchRequest) -> dict:
+    return {
+        "structured_query": {
+            "raw_query": "",
+            "message": "Empty search query. Please provide search keywords."
+        },
+        "vendors": [],
+        "venues": [],
+        "pagination": {
+            "page": payload.page,
+            "limit": payload.limit,
+            "total_vendor_results": 0,
+            "total_venue_results": 0,
+            "total_pages_vendors": 0,
+            "total_pages_venues": 0,
+        },
+        "execution_time_ms": 0,
+    }
 
+
+@router.post("/search")
+async def search_api(payload: SearchRequest, request: Request):
     # Prevent empty or meaningless queries
     if not payload.query or not payload.query.strip():
-        return JSONResponse(
-            content={
-                "structured_query": {
-                    "raw_query": "",
-                    "message": "Empty search query. Please provide search keywords."
-                },
-                "vendors": [],
-                "venues": [],
-                "pagination": {
-                    "page": payload.page,
-                    "limit": payload.limit,
-                    "total_vendor_results": 0,
-                    "total_venue_results": 0,
-                    "total_pages_vendors": 0,
-                    "total_pages_venues": 0,
-                },
-                "execution_time_ms": 0,
-            }
+        return JSONResponse(content=_empty_response(payload))
+
+    return await _serve(payload, request, "json")
+
+
+@router.post("/internal/search", include_in_schema=False)
+async def internal_search_api(request: Request):
+    """
+    Service-to-service /search over MessagePack (app/utils/msgpack_codec.py):
+    positional request array, result rows as column tables. Same pipeline,
+    cache, admission and deadlines as the JSON endpoint.
+    """
+    if not is_msgpack_available():
+        raise HTTPException(status_code=415, detail="msgpack is not installed on this server")
+    try:
+        payload = decode_request(await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not payload.query.strip():
+        return Response(content=encode_msgpack_response(_empty_response(payload)), media_type=MSGPACK_MEDIA_TYPE)
+
+    return await _serve(payload, request, "msgpack")
+
+
+async def _serve(payload: SearchRequest, request: Request, fmt: str) -> Response:
+    # Popularity table for cache warming
+    record_query(payload)
+
+    # QUERY CAPTURE (opt-in, sampled) for offline replay
+    token = begin_capture(payload)
+    # PROFILING (admin header or sampled), id returned in X-Profile-Id
+    profile = start_profile(request.headers.get("x-profile"), f"{payload.flag}: {payload.query[:80]}")
+    # DEADLINE (config / client header) + cancellation when the client goes away
+    deadline_token = start_deadline(request.headers.get(DEADLINE_HEADER))
+    watcher = watch_disconnect(request)
+    status, cache_status = 500, None
+    try:
+        response = await _search(payload, request, fmt)
+        status, cache_status = response.status_code, response.headers.get("X-Cache")
+        if profile is not None:
+            response.headers["X-Profile-Id"] = profile.id
+        return response
+    except HTTPException as e:
+        status = e.status_code
+        raise
+    except asyncio.CancelledError:
+        if watcher is None or not watcher.disconnected:
+            raise
+        # Nobody is reading: 499 (client closed request) goes to the logs only
+        status = 499
+        return Response(status_code=499)
+    except DeadlineExceeded as e:
+        status = 504
+        raise HTTPException(status_code=504, detail=f"Search deadline exceeded: {e}")
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        end_deadline(deadline_token)
+        end_capture(token, status=status, cache=cache_status)
+        if profile is not None:
+            await finish_profile(profile)
+
+
+async def _search(payload: SearchRequest, request: Request, fmt: str) -> Response:
+    cache = get_response_cache() if is_response_cache_enabled() else None
+    # Binary bodies are cached next to (not instead of) the JSON ones
+    key = cache_key(payload) if fmt == "json" else cache_key(payload) + (fmt,)
+
+    # Cache hits (or joining an identical in-flight request) skip admission
+    if cache is not None:
+        found = await cache.peek(key)
+        if found is not None:
+            return await _cached_response(*found, request, fmt)
+
+    # ADMISSION CONTROL (bounded queue, fast 503, degradation tier)
+    tier = TIER_NORMAL
+    if is_admission_control_enabled():
+        controller = get_admission_controller()
+        tier = controller.tier()
+        incr(f"admission.tier.{tier}")
+        if tier >= TIER_CACHE_ONLY:
+            incr("admission.rejected.cache_only_miss")
+            raise HTTPException(status_code=503, detail="Search overloaded, try again shortly", headers={"Retry-After": "1"})
+
+        try:
+            async with controller.admit():
+                return await _execute_search(payload, request, cache, key, tier, fmt)
+        except Overloaded as e:
+            raise HTTPException(status_code=503, detail=f"Search overloaded: {e}", headers={"Retry-After": "1"})
+
+    return await _execute_search(payload, request, cache, key, tier, fmt)
+
+
+async def _execute_search(payload: SearchRequest, request: Request, cache, key, tier: int, fmt: str):
+    if cache is None:
+        response_data = await run_search_pipeline(payload, tier)
+        body = await _encode(response_data, fmt)
+        tier = response_data.get("degradation_tier", TIER_NORMAL)
+        return await _send(body, request, {"X-Degradation-Tier": str(tier)}, media_type=_FORMATS[fmt][1])
+
+    # RESPONSE CACHE (data-version invalidated, concurrent misses coalesced)
+    entry, status = await cache.get_or_compute(key, lambda: _compute_body(payload, tier, fmt))
+    return await _cached_response(entry, status, request, fmt)
+
+
+async def _compute_body(payload: SearchRequest, tier: int, fmt: str = "json"):
+    response_data = await run_search_pipeline(payload, tier)
+    body = await _encode(response_data, fmt)
+    return body, response_data.get("degradation_tier", TIER_NORMAL)
+
+
+async def warm_search(payload_data: dict) -> bool:
+    """
+    Cache warming: runs one popular request through the full pipeline
+    (LLM, Mongo, ranking) into the response cache. False → already cached.
+    """
+    payload = SearchRequest(**payload_data)
+    if not is_response_cache_enabled():
+        # Still warms the Mongo working set and the LLM connection
+        await run_search_pipeline(payload)
+        return True
+
+    cache = get_response_cache()
+    key = cache_key(payload)
+    if cache.get(key) is not None or key in cache.inflight:
+        return False
+    await cache.get_or_compute(key, lambda: _compute_body(payload, TIER_NORMAL), warmed=True)
+    return True
+
+
+async def _encode(response_data: dict, fmt: str = "json") -> bytes:
+    size = len(response_data["vendors"]) + len(response_data["venues"])
+    check_deadline("serialize")
+    with stage_timer("serialize"):
+        return await run_cpu_stage("serialize", size, _FORMATS[fmt][0], response_data)
+
+
+def _rank(results, structured_query, threshold_ratio):
+    return apply_strict_filter(rank_results(results, structured_query), threshold_ratio=threshold_ratio)
+
+
+async def _retrieve_and_rank(kind: str, structured_query: dict, payload: SearchRequest, top_n: int, max_depth, speculation=None):
+    """
+    Returns (ranked results, total results, _ids of all results).
+    Sharded / materialized modes return only the top of the ranked list plus the totals.
+    """
+    # Pure geo query → precomputed ranked list + one page fetch
+    if is_materialized_geo_enabled():
+        with stage_timer(f"materialized.{kind}"):
+            served = await materialized_search(kind, structured_query, top_n, payload.threshold_ratio, payload.fields)
+        if served is not None:
+            return served
+
+    if is_sharded_search_enabled():
+        try:
+            with stage_timer(f"sharded.{kind}"):
+                async with stage_slot("db"):
+                    return await sharded_search(kind, structured_query, top_n, max_depth, payload.threshold_ratio, payload.fields)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            # Dead/unavailable workers → in-process path
+            print("SHARDED SEARCH FAILED:", str(e))
+            incr(f"shard.fallback.{kind}")
+
+    results = None
+    if speculation is not None:
+        # Pool fetched while the LLM ran; None → filters changed, query normally
+        with stage_timer(f"speculative.{kind}"):
+            results = await speculation.resolve(structured_query, top_n, max_depth, payload.threshold_ratio)
+
+    if results is None:
+        hard_filter = hard_filter_vendors if kind == "vendor" else hard_filter_venues
+        with stage_timer(f"retrieve.{kind}"):
+            async with stage_slot("db"):
+                results = await hard_filter(
+                    structured_query, top_n=top_n, max_depth=max_depth, fields=payload.fields,
+                    threshold_ratio=payload.threshold_ratio,
+                )
+
+    # Off the event loop for large pools
+    if results:
+        check_deadline(f"rank.{kind}")
+        with stage_timer(f"rank.{kind}"):
+            results = await run_cpu_stage("rank", len(results), _rank, results, structured_query, payload.threshold_ratio)
+    return results, len(results), [item.get("_id") for item in results]
+
+
+async def _cached_response(entry, status: str, request: Request, fmt: str = "json") -> Response:
+    encoding = choose_encoding(request.headers.get("accept-encoding"), len(entry.body))
+    headers = {"ETag": encoded_etag(entry.etag, encoding), "X-Cache": status, "X-Degradation-Tier": str(entry.tier)}
+    if is_compression_enabled():
+        headers["Vary"] = "Accept-Encoding"
+
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        incr("response_cache.not_modified")
+        return Response(status_code=304, headers=headers)
+
+    # Compressed variants are cached with the entry
+    return await _send(entry.body, request, headers, encoding, entry.variants, _FORMATS[fmt][1])
+
+
+async def _send(
+    body: bytes,
+    request: Request,
+    headers: dict,
+    encoding: Optional[str] = None,
+    variants: Optional[dict] = None,
+    media_type: str = "application/json",
+) -> Response:
+    """
+    JSON (or msgpack) response, gzip / brotli compressed when the client accepts it
+    and the body is at least COMPRESS_MIN_BYTES.
+    """
+    if encoding is None and variants is None:
+        encoding = choose_encoding(request.headers.get("accept-encoding"), len(body))
+
+    content = body
+    if encoding is not None:
+        content = variants.get(encoding) if variants is not None else None
+        if content is None:
+            with stage_timer("compress"):
+                content = await run_cpu_stage("compress", len(body), compress, body, encoding)
+            if variants is not None:
+                variants[encoding] = content
+        headers["Content-Encoding"] = encoding
+    if is_compression_enabled():
+        headers["Vary"] = "Accept-Encoding"
+
+    record_sizes(len(body), len(content), encoding)
+    return Response(content=content, media_type=media_type, headers=headers)
+
+
+async def run_search_pipeline(payload: SearchRequest, tier: int = TIER_NORMAL) -> dict:
+    """
+    NLP → HARD FILTER → RANKING → PAGINATION.
+    Returns the response body (not yet encoded).
+
+    tier >= 1: skip LLM enrichment, tier >= 2: shrink candidate pool.
+    """
+    start_time = time.time()
+
+    # SPECULATIVE RETRIEVAL: overlap the DB fetch with the LLM call
+    speculations = {}
+    if is_speculative_retrieval_enabled() and is_llm_enabled() and tier < TIER_SKIP_LLM and not is_sharded_search_enabled():
+        speculations = start_speculation(payload.query, payload.flag)
+
+    try:
+        return await _run_pipeline(payload, tier, start_time, speculations)
+    finally:
+        for speculation in speculations.values():
+            speculation.cancel()  # no-op once resolved
+
+
+async def _run_pipeline(payload: SearchRequest, tier: int, start_time: float, speculations: dict) -> dict:
+    with stage_timer("nlp"):
+        structured_query = await run_nlp_engine(
+            query=payload.query,
+            flag=payload.flag,
+            skip_llm=tier >= TIER_SKIP_LLM,
         )
-   
-    structured_query = await run_nlp_engine(
-        query=payload.query,
-        flag=payload.flag
-    )
     print("Structured Query after NLP Engine:", structured_query)
+    note("structured_query", dict(structured_query))
+
+    # LLM stage saturated → same effect as tier 1
+    if structured_query.pop("llm_skipped", False):
+        tier = max(tier, TIER_SKIP_LLM)
     # print("Structured Query:", structured_query)
     page = payload.page
     limit = payload.limit
+    top_n = page * limit  # retrieval can stop once this many results are settled
+    max_depth = DEGRADED_MAX_DEPTH if tier >= TIER_SHRINK_POOL else None
 
-    vendors = []
-    venues = []
+    vendors, vendor_total, vendor_ids = [], 0, []
+    venues, venue_total, venue_ids = [], 0, []
 
     intent = structured_query.get("intent", "hybrid_search")
     
-    # HARD FILTER (DB via models)
+    # HARD FILTER (DB via models) + SOFT RANKING (Relevance Layer)
     if intent == "vendor_search":
-        vendors = await hard_filter_vendors(structured_query)
-        
+        vendors, vendor_total, vendor_ids = await _retrieve_and_rank("vendor", structured_query, payload, top_n, max_depth, speculations.get("vendor"))
 
     elif intent == "venue_search":
-        venues = await hard_filter_venues(structured_query)
+        venues, venue_total, venue_ids = await _retrieve_and_rank("venue", structured_query, payload, top_n, max_depth, speculations.get("venue"))
 
     else:  # hybrid
         # hard search as insufficient data is available for venues, we will return empty results for venues if budget_max is provided in the query.
@@ -77,26 +440,16 @@ async def search_api(payload: SearchRequest):
         # else :
         #     vendors = await hard_filter_vendors(structured_query)
         #     venues = []
-        vendors = await hard_filter_vendors(structured_query)
-        venues = await hard_filter_venues(structured_query)
-    # SOFT RANKING (Relevance Layer)
-    if vendors:
-
-        vendors = rank_results(vendors, structured_query)
-       
-        vendors = apply_strict_filter(vendors, threshold_ratio=payload.threshold_ratio)
-        
-        
-    if venues:
-        print(structured_query)
-        venues = rank_results(venues, structured_query)
-      
-        venues = apply_strict_filter(venues,threshold_ratio=payload.threshold_ratio)
-  
+        vendors, vendor_total, vendor_ids = await _retrieve_and_rank("vendor", structured_query, payload, top_n, max_depth, speculations.get("vendor"))
+        venues, venue_total, venue_ids = await _retrieve_and_rank("venue", structured_query, payload, top_n, max_depth, speculations.get("venue"))
 
     #  FINAL PAGINATION (AFTER RANKING)
-    paginated_vendors = paginate_results(vendors, page, limit)
-    paginated_venues = paginate_results(venues, page, limit)
+    paginated_vendors = paginate_results(vendors, page, limit, total_results=vendor_total)
+    paginated_venues = paginate_results(venues, page, limit, total_results=venue_total)
+
+    # FIELD PROJECTION (client-selected result fields)
+    paginated_vendors["data"] = project_fields(paginated_vendors["data"], payload.fields)
+    paginated_venues["data"] = project_fields(paginated_venues["data"], payload.fields)
 
     execution_time = (time.time() - start_time) * 1000
 
@@ -114,4 +467,20 @@ async def search_api(payload: SearchRequest):
         },
         "execution_time_ms": round(execution_time, 2),
     }
-    return JSONResponse(content=jsonable_encoder(response_data))
+
+    # Echo of the parsed query is optional (debugging aid, ~1 KB per response)
+    if payload.include_structured_query is False:
+        del response_data["structured_query"]
+
+    if tier > TIER_NORMAL:
+        response_data["degradation_tier"] = tier
+        incr(f"admission.degraded.tier_{tier}")
+
+    # FACETS (bitmap counts over the full ranked result sets)
+    if payload.facets:
+        response_data["facets"] = {
+            "vendors": facet_counts("vendor", [{"_id": _id} for _id in vendor_ids]),
+            "venues": facet_counts("venue", [{"_id": _id} for _id in venue_ids]),
+        }
+
+    return response_data
@@ -0,0 +1,155 @@
+import os
+import asyncio
+from contextlib import asynccontextmanager, nullcontext
+from typing import AsyncContextManager, AsyncIterator, List, Optional
+
+from app.utils.metrics import incr, set_gauge
+
+
+SEARCH_MAX_INFLIGHT = int(os.getenv("SEARCH_MAX_INFLIGHT", "64"))
+SEARCH_MAX_QUEUE = int(os.getenv("SEARCH_MAX_QUEUE", "64"))
+SEARCH_QUEUE_TIMEOUT_MS = float(os.getenv("SEARCH_QUEUE_TIMEOUT_MS", "2000"))
+LLM_MAX_INFLIGHT = int(os.getenv("LLM_MAX_INFLIGHT", "16"))
+DB_MAX_INFLIGHT = int(os.getenv("DB_MAX_INFLIGHT", "32"))
+
+# Load = (inflight + queued) / SEARCH_MAX_INFLIGHT at arrival.
+# Thresholds for tier 1 (skip LLM), 2 (shrink candidate pool), 3 (cache only)
+ADMISSION_TIERS: List[float] = [float(x) for x in os.getenv("ADMISSION_TIERS", "0.75,1.0,1.5").split(",")]
+
+# Candidate depth used from tier 2 upwards
+DEGRADED_MAX_DEPTH = int(os.getenv("DEGRADED_MAX_DEPTH", "200"))
+
+TIER_NORMAL = 0
+TIER_SKIP_LLM = 1
+TIER_SHRINK_POOL = 2
+TIER_CACHE_ONLY = 3
+
+
+def is_admission_control_enabled() -> bool:
+    return os.getenv("ENABLE_ADMISSION_CONTROL", "true").lower() == "true"
+
+
+class Overloaded(Exception):
+    pass
+
+
+class StageLimiter:
+    """
+    In-flight concurrency cap for one pipeline stage (LLM, DB).
+    """
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.inflight = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def try_acquire(self) -> bool:
+        # Non-blocking: callers degrade instead of queueing behind the stage
+        if self._semaphore.locked():
+            incr(f"admission.{self.name}.saturated")
+            return False
+        await self._semaphore.acquire()  # free slot → returns without waiting
+        self.inflight += 1
+        set_gauge(f"admission.{self.name}.inflight", self.inflight)
+        return True
+
+    def release(self) -> None:
+        self.inflight -= 1
+        self._semaphore.release()
+        set_gauge(f"admission.{self.name}.inflight", self.inflight)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self._semaphore.acquire()
+        self.inflight += 1
+        set_gauge(f"admission.{self.name}.inflight", self.inflight)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class AdmissionController:
+    """
+    Bounded admission for /search.
+
+    - up to max_inflight requests run, up to max_queue wait
+    - a full queue (or a wait past queue_timeout) → Overloaded (503) fast
+    - the load seen at arrival picks a degradation tier
+    """
+
+    def __init__(self, max_inflight: int, max_queue: int, queue_timeout_ms: float):
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout_ms / 1000
+        self.inflight = 0
+        self.queued = 0
+        self._semaphore = asyncio.Semaphore(max_inflight)
+
+    def load(self) -> float:
+        return (self.inflight + self.queued) / self.max_inflight
+
+    def tier(self) -> int:
+        load = self.load()
+        tier = TIER_NORMAL
+        for i, threshold in enumerate(ADMISSION_TIERS, start=1):
+            if load >= threshold:
+                tier = i
+        return tier
+
+    def _publish(self) -> None:
+        set_gauge("admission.search.inflight", self.inflight)
+        set_gauge("admission.search.queued", self.queued)
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        if self._semaphore.locked() and self.queued >= self.max_queue:
+            incr("admission.rejected.queue_full")
+            raise Overloaded("search queue full")
+
+        self.queued += 1
+        self._publish()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            incr("admission.rejected.queue_timeout")
+            raise Overloaded("search queue wait timed out")
+        finally:
+            self.queued -= 1
+
+        self.inflight += 1
+        self._publish()
+        try:
+            yield
+        finally:
+            self.inflight -= 1
+            self._semaphore.release()
+            self._publish()
+
+
+_controller: Optional[AdmissionController] = None
+_limiters = {}
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController(SEARCH_MAX_INFLIGHT, SEARCH_MAX_QUEUE, SEARCH_QUEUE_TIMEOUT_MS)
+    return _controller
+
+
+def get_stage_limiter(name: str) -> StageLimiter:
+    limiter = _limiters.get(name)
+    if limiter is None:
+        limit = LLM_MAX_INFLIGHT if name == "llm" else DB_MAX_INFLIGHT
+        limiter = _limiters[name] = StageLimiter(name, limit)
+    return limiter
+
+
+def stage_slot(name: str) -> AsyncContextManager:
+    # Blocking stage slot (DB); no-op when admission control is off
+    if not is_admission_control_enabled():
+        return nullcontext()
+    return get_stage_limiter(name).slot()
+
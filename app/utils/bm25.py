@@ -0,0 +1,230 @@
+import math
+import os
+import re
+from array import array
+from bisect import bisect_left
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Query words that carry no relevance signal for our catalog
+STOP_WORDS = {
+    "a", "an", "and", "the", "of", "for", "in", "at", "on", "near", "with",
+    "to", "by", "from", "or", "me", "my", "i", "is", "are", "best", "top",
+    "good", "show", "find", "vendor", "vendors", "venue", "venues",
+    "under", "below", "max", "upto", "budget", "since", "year", "years",
+    "experience", "exp", "lakh", "lac", "k", "cr", "crore",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    if not text:
+        return []
+    return TOKEN_RE.findall(str(text).lower())
+
+
+def query_terms(structured_query: Dict[str, Any]) -> List[str]:
+    """
+    Terms used for BM25 scoring.
+    raw_query + LLM semantic_tags, stop words removed, de-duplicated.
+    """
+    tokens = tokenize(structured_query.get("raw_query") or "")
+    for tag in structured_query.get("semantic_tags") or []:
+        tokens.extend(tokenize(tag))
+
+    seen = set()
+    terms = []
+    for token in tokens:
+        if token in STOP_WORDS or token.isdigit() or token in seen:
+            continue
+        seen.add(token)
+        terms.append(token)
+    return terms
+
+
+class BM25Index:
+    """
+    Compact in-memory inverted index with BM25 scoring.
+
+    - Postings are parallel typed arrays (doc ordinal, term frequency)
+      sorted by doc ordinal → bounded memory, binary-searchable
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_ids: List[str] = []
+        self.doc_lens = array("I")
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.idf: Dict[str, float] = {}
+        self.avg_len = 0.0
+        self._ordinal_lookup: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    @classmethod
+    def build(cls, documents: Iterable[Tuple[str, str]], k1: float = 1.2, b: float = 0.75) -> "BM25Index":
+        """
+        documents: iterable of (doc_id, text)
+        """
+        index = cls(k1=k1, b=b)
+        postings: Dict[str, Tuple[array, array]] = {}
+
+        for doc_id, text in documents:
+            ordinal = len(index.doc_ids)
+            tokens = tokenize(text)
+
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+
+            for token, tf in counts.items():
+                entry = postings.get(token)
+                if entry is None:
+                    entry = (array("I"), array("H"))
+                    postings[token] = entry
+                entry[0].append(ordinal)
+                entry[1].append(min(tf, 65535))
+
+            index.doc_ids.append(doc_id)
+            index.doc_lens.append(len(tokens))
+
+        index.postings = postings
+        index._finalize()
+        return index
+
+    def _finalize(self) -> None:
+        n = len(self.doc_ids)
+        self.avg_len = (sum(self.doc_lens) / n) if n else 0.0
+
+        for term, (docs, _) in self.postings.items():
+            df = len(docs)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            self.idf[term] = idf
+
+    def _term_score(self, idf: float, tf: int, doc_len: int) -> float:
+        norm = self.k1 * (1 - self.b + self.b * (doc_len / self.avg_len if self.avg_len else 0))
+        return idf * (tf * (self.k1 + 1)) / (tf + norm)
+
+    def score(self, terms: List[str], allowed: Optional[set] = None) -> Dict[str, float]:
+        """
+        BM25 score of every document matching at least one term.
+
+        The ranker adds a bonus to every candidate, so there is no top-k
+        cut to prune against: all matches are scored.
+        allowed: optional set of doc ordinals to restrict scoring to.
+        Returns {doc_id: score} (only scores > 0).
+        """
+        if not self.doc_ids:
+            return {}
+
+        lists = []
+        for term in dict.fromkeys(terms):
+            entry = self.postings.get(term)
+            if entry is not None:
+                lists.append((self.idf[term], entry[0], entry[1]))
+
+        if not lists:
+            return {}
+
+        # Small candidate sets: probing each candidate is cheaper than
+        # walking every posting list
+        if allowed is not None:
+            total_postings = sum(len(entry[1]) for entry in lists)
+            probe_cost = len(allowed) * len(lists) * max(1, int(math.log2(total_postings + 1)))
+            if probe_cost < total_postings:
+                return self._score_allowed(lists, allowed)
+
+        # Term-at-a-time accumulation
+        scores: Dict[int, float] = {}
+        doc_lens = self.doc_lens
+        for idf, docs, tfs in lists:
+            for pos, doc in enumerate(docs):
+                if allowed is not None and doc not in allowed:
+                    continue
+                scores[doc] = scores.get(doc, 0.0) + self._term_score(idf, tfs[pos], doc_lens[doc])
+
+        return {self.doc_ids[doc]: score for doc, score in scores.items() if score > 0}
+
+    def _score_allowed(self, lists: list, allowed: set) -> Dict[str, float]:
+        scored = {}
+        for candidate in allowed:
+            doc_len = self.doc_lens[candidate]
+            score = 0.0
+            for idf, docs, tfs in lists:
+                pos = bisect_left(docs, candidate)
+                if pos < len(docs) and docs[pos] == candidate:
+                    score += self._term_score(idf, tfs[pos], doc_len)
+            if score > 0:
+                scored[self.doc_ids[candidate]] = score
+        return scored
+
+    def ordinals(self, doc_ids: Iterable[str]) -> set:
+        lookup = self._ordinal_lookup
+        if lookup is None:
+            lookup = {doc_id: i for i, doc_id in enumerate(self.doc_ids)}
+            self._ordinal_lookup = lookup
+        return {lookup[d] for d in doc_ids if d in lookup}
+
+
+# GLOBAL INDEXES (vendor / venue)
+_INDEXES: Dict[str, BM25Index] = {}
+
+
+def is_bm25_enabled() -> bool:
+    return os.getenv("ENABLE_BM25", "true").lower() == "true"
+
+
+def get_index(kind: str) -> Optional[BM25Index]:
+    return _INDEXES.get(kind)
+
+
+def set_index(kind: str, index: BM25Index) -> None:
+    _INDEXES[kind] = index
+
+
+def build_search_indexes() -> Dict[str, int]:
+    """
+    Load vendor/venue text fields from Mongo and (re)build both indexes.
+    Only text fields are projected to keep the load cheap.
+    """
+    from app.models.vendor_model import Vendor
+    from app.models.venue_model import VenuePackage
+
+    vendor_docs = (
+        (str(v.id), f"{v.vendorName or ''} {v.locality or ''}")
+        for v in Vendor.objects.only("id", "vendorName", "locality").no_cache()
+    )
+    venue_docs = (
+        (str(v.id), f"{v.title or ''} {v.description or ''}")
+        for v in VenuePackage.objects(visibility="public").only("id", "title", "description").no_cache()
+    )
+
+    set_index("vendor", BM25Index.build(vendor_docs))
+    set_index("venue", BM25Index.build(venue_docs))
+
+    return {kind: len(index) for kind, index in _INDEXES.items()}
+
+
+def has_postings(kind: str, terms: List[str]) -> bool:
+    # Any query term present in the index (else no doc gets a BM25 bonus)
+    index = get_index(kind)
+    return index is not None and any(term in index.postings for term in terms)
+
+
+def bm25_scores(kind: str, terms: List[str], candidate_ids: List[str]) -> Dict[str, float]:
+    """
+    BM25 scores for the given candidate ids (every matching candidate).
+    Returns {} if the index isn't loaded or nothing matches.
+    """
+    index = get_index(kind)
+    if index is None or not terms or not candidate_ids:
+        return {}
+
+    allowed = index.ordinals(candidate_ids)
+    if not allowed:
+        return {}
+
+    return index.score(terms, allowed=allowed)
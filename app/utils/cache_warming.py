@@ -0,0 +1,233 @@
+import os
+import json
+import time
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.models.request import SearchRequest
+from app.utils.admission import get_admission_controller, is_admission_control_enabled
+from app.utils.metrics import incr, observe, set_gauge
+from app.utils.read_routing import search_reads_settle_in
+from app.utils.response_cache import cache_key
+
+
+WARM_STATS_PATH = os.getenv("WARM_STATS_PATH", "captures/popular_queries.json")
+WARM_TOP_N = int(os.getenv("WARM_TOP_N", "50"))
+WARM_CONCURRENCY = int(os.getenv("WARM_CONCURRENCY", "2"))
+# Popularity halves every WARM_HALF_LIFE_SECONDS without new requests
+WARM_HALF_LIFE_SECONDS = float(os.getenv("WARM_HALF_LIFE_SECONDS", str(24 * 3600)))
+# Below this decayed count a query is not worth an LLM call
+WARM_MIN_SCORE = float(os.getenv("WARM_MIN_SCORE", "2"))
+WARM_MAX_TRACKED = int(os.getenv("WARM_MAX_TRACKED", "5000"))
+WARM_PERSIST_SECONDS = int(os.getenv("WARM_PERSIST_SECONDS", "60"))
+# Warming pauses while live load (admission inflight / max) is above this
+WARM_MAX_LOAD = float(os.getenv("WARM_MAX_LOAD", "0.25"))
+WARM_BACKOFF_SECONDS = float(os.getenv("WARM_BACKOFF_SECONDS", "1"))
+
+
+def is_cache_warming_enabled() -> bool:
+    return os.getenv("ENABLE_CACHE_WARMING", "false").lower() == "true"
+
+
+class PopularQueries:
+    """
+    Exponentially decayed request counts per normalized search request
+    (same key as the response cache). Scores are decayed lazily: each
+    entry keeps (score, updated_at) and is brought to "now" on touch / read.
+    """
+
+    def __init__(self, half_life: float = WARM_HALF_LIFE_SECONDS, max_tracked: int = WARM_MAX_TRACKED):
+        self.half_life = half_life
+        self.max_tracked = max_tracked
+        # key → [score, updated_at, payload]
+        self.entries: Dict[Tuple, List[Any]] = {}
+
+    def _decayed(self, score: float, updated_at: float, now: float) -> float:
+        return score * 0.5 ** (max(0.0, now - updated_at) / self.half_life)
+
+    def record(self, key: Tuple, payload: Dict[str, Any], now: Optional[float] = None) -> None:
+        now = now or time.time()
+        entry = self.entries.get(key)
+        if entry is None:
+            self.entries[key] = [1.0, now, payload]
+            # Amortized pruning: drop the long tail once 10% over the cap
+            if len(self.entries) > self.max_tracked * 1.1:
+                self.prune(now)
+            return
+        entry[0] = self._decayed(entry[0], entry[1], now) + 1.0
+        entry[1] = now
+        entry[2] = payload
+
+    def prune(self, now: float) -> None:
+        keep = sorted(self.entries.items(), key=lambda kv: self._decayed(kv[1][0], kv[1][1], now), reverse=True)
+        self.entries = dict(keep[:self.max_tracked])
+
+    def top(self, n: int, min_score: float = 0.0, now: Optional[float] = None) -> List[Tuple[float, Dict[str, Any]]]:
+        now = now or time.time()
+        scored = [(self._decayed(score, updated_at, now), payload) for score, updated_at, payload in self.entries.values()]
+        scored = [item for item in scored if item[0] >= min_score]
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return scored[:n]
+
+    def dump(self) -> Dict[str, Any]:
+        return {
+            "saved_at": time.time(),
+            "half_life": self.half_life,
+            "queries": [
+                {"score": round(score, 4), "updated_at": updated_at, "payload": payload}
+                for score, updated_at, payload in self.entries.values()
+            ],
+        }
+
+    def restore(self, data: Dict[str, Any]) -> int:
+        for row in data.get("queries", []):
+            payload = row["payload"]
+            self.entries[_payload_key(payload)] = [float(row["score"]), float(row["updated_at"]), payload]
+        return len(self.entries)
+
+
+def _payload_key(payload: Dict[str, Any]) -> Tuple:
+    return cache_key(SearchRequest(**payload))
+
+
+_POPULAR = PopularQueries()
+_save_lock = threading.Lock()
+_warm_requested: Optional[asyncio.Event] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_popular_queries() -> PopularQueries:
+    return _POPULAR
+
+
+def record_query(payload) -> None:
+    # Called on the event loop for every non-empty /search request
+    if not is_cache_warming_enabled():
+        return
+    _POPULAR.record(cache_key(payload), payload.model_dump())
+
+
+def load_popular_queries() -> str:
+    """
+    Warm-up step: restore the table persisted by the previous process.
+    """
+    if not is_cache_warming_enabled():
+        return "disabled"
+    if not os.path.exists(WARM_STATS_PATH):
+        return "no saved stats"
+    with open(WARM_STATS_PATH) as f:
+        count = _POPULAR.restore(json.load(f))
+    set_gauge("cache_warming.tracked", count)
+    return f"{count} queries"
+
+
+def _write_stats(data: Dict[str, Any]) -> None:
+    directory = os.path.dirname(WARM_STATS_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Atomic replace: a crash mid-write never leaves a truncated file
+    tmp_path = f"{WARM_STATS_PATH}.tmp"
+    with _save_lock:
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, WARM_STATS_PATH)
+
+
+def save_popular_queries() -> None:
+    # Final save at shutdown (the loop saves periodically)
+    if not is_cache_warming_enabled():
+        return
+    _write_stats(_POPULAR.dump())
+
+
+def request_warming(*_args) -> None:
+    """
+    Data version listener (runs off the event loop): schedules a warming
+    round on the loop running cache_warming_loop.
+    """
+    if _loop is not None and _warm_requested is not None:
+        _loop.call_soon_threadsafe(_warm_requested.set)
+
+
+async def _wait_for_quiet() -> None:
+    # Live traffic first: warming only runs while the service is lightly loaded
+    if not is_admission_control_enabled():
+        return
+    controller = get_admission_controller()
+    while controller.load() > WARM_MAX_LOAD:
+        incr("cache_warming.paused")
+        await asyncio.sleep(WARM_BACKOFF_SECONDS)
+
+
+async def warm_popular_queries(
+    warm_one: Callable[[Dict[str, Any]], Awaitable[bool]],
+    top_n: int = WARM_TOP_N,
+) -> Dict[str, int]:
+    """
+    Pre-executes the top_n most popular requests with at most
+    WARM_CONCURRENCY in flight. warm_one(payload) returns False when the
+    request was already cached (nothing to do).
+    """
+    candidates = _POPULAR.top(top_n, min_score=WARM_MIN_SCORE)
+    semaphore = asyncio.Semaphore(WARM_CONCURRENCY)
+    stats = {"candidates": len(candidates), "warmed": 0, "cached": 0, "failed": 0}
+
+    async def one(payload: Dict[str, Any]) -> None:
+        async with semaphore:
+            await _wait_for_quiet()
+            try:
+                warmed = await warm_one(payload)
+            except Exception as e:
+                print("CACHE WARMING FAILED:", payload.get("query"), str(e))
+                stats["failed"] += 1
+                incr("cache_warming.failed")
+                return
+            stats["warmed" if warmed else "cached"] += 1
+            incr("cache_warming.warmed" if warmed else "cache_warming.already_cached")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(payload) for _, payload in candidates))
+    observe("cache_warming.round_ms", (time.perf_counter() - start) * 1000)
+    incr("cache_warming.rounds")
+    return stats
+
+
+async def cache_warming_loop(warm_one: Callable[[Dict[str, Any]], Awaitable[bool]]) -> None:
+    """
+    Warms once at startup, again after every data version change, and
+    persists the popularity table every WARM_PERSIST_SECONDS.
+    """
+    global _loop, _warm_requested
+    if not is_cache_warming_enabled():
+        return
+
+    _loop = asyncio.get_running_loop()
+    _warm_requested = asyncio.Event()
+    _warm_requested.set()  # startup round
+
+    while True:
+        try:
+            await asyncio.wait_for(_warm_requested.wait(), timeout=WARM_PERSIST_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+        if _warm_requested.is_set():
+            _warm_requested.clear()
+            # Entries computed from lagging secondaries would not be stored
+            settle_in = search_reads_settle_in()
+            if settle_in is None:
+                print("CACHE WARMING SKIPPED: secondary reads without a staleness limit")
+            else:
+                await asyncio.sleep(settle_in)
+                try:
+                    print("CACHE WARMING:", await warm_popular_queries(warm_one))
+                except Exception as e:
+                    print("CACHE WARMING ROUND FAILED:", str(e))
+
+        try:
+            data = _POPULAR.dump()
+            set_gauge("cache_warming.tracked", len(data["queries"]))
+            await asyncio.to_thread(_write_stats, data)
+        except Exception as e:
+            print("POPULAR QUERIES SAVE FAILED:", str(e))
@@ -0,0 +1,113 @@
+import os
+import json
+import time
+import queue
+import random
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Dict, Iterator, Optional
+
+
+CAPTURE_PATH = os.getenv("CAPTURE_PATH", "captures/search.jsonl")
+CAPTURE_SAMPLE_RATE = float(os.getenv("CAPTURE_SAMPLE_RATE", "0.01"))
+CAPTURE_MAX_BYTES = int(os.getenv("CAPTURE_MAX_BYTES", str(50 * 1024 * 1024)))
+CAPTURE_BACKUPS = int(os.getenv("CAPTURE_BACKUPS", "5"))
+
+# Record of the request being captured (None → not sampled)
+_current: ContextVar[Optional[Dict[str, Any]]] = ContextVar("search_capture", default=None)
+
+_logger: Optional[logging.Logger] = None
+_listener: Optional[QueueListener] = None
+
+
+def is_capture_enabled() -> bool:
+    return os.getenv("ENABLE_QUERY_CAPTURE", "false").lower() == "true"
+
+
+def _get_logger() -> logging.Logger:
+    """
+    Writes happen on a QueueListener thread; the request path only
+    enqueues a preformatted line.
+    """
+    global _logger, _listener
+    if _logger is None:
+        directory = os.path.dirname(CAPTURE_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        handler = RotatingFileHandler(CAPTURE_PATH, maxBytes=CAPTURE_MAX_BYTES, backupCount=CAPTURE_BACKUPS)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        records: queue.Queue = queue.Queue(-1)
+        _listener = QueueListener(records, handler)
+        _listener.start()
+
+        _logger = logging.getLogger("search.capture")
+        _logger.setLevel(logging.INFO)
+        _logger.propagate = False
+        _logger.addHandler(QueueHandler(records))
+    return _logger
+
+
+def begin_capture(payload: Any) -> Optional[Token]:
+    # Sampling decision is made once per request; the payload model is
+    # only dumped for sampled requests
+    if not is_capture_enabled() or random.random() >= CAPTURE_SAMPLE_RATE:
+        return None
+    record = {
+        "ts": time.time(),
+        "payload": payload.model_dump(),
+        "structured_query": None,
+        "llm_enrichment": None,
+        "stages_ms": {},
+        "_start": time.perf_counter(),
+    }
+    return _current.set(record)
+
+
+def note(key: str, value: Any) -> None:
+    record = _current.get()
+    if record is not None:
+        record[key] = value
+
+
+@contextmanager
+def stage_timer(name: str) -> Iterator[None]:
+    record = _current.get()
+    if record is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages = record["stages_ms"]
+        stages[name] = round(stages.get(name, 0.0) + (time.perf_counter() - start) * 1000, 3)
+
+
+def end_capture(token: Optional[Token], **fields: Any) -> None:
+    if token is None:
+        return
+    record = _current.get()
+    _current.reset(token)
+    if record is None:
+        return
+
+    record["total_ms"] = round((time.perf_counter() - record.pop("_start")) * 1000, 3)
+    record.update(fields)
+    try:
+        _get_logger().info(json.dumps(record, default=str, separators=(",", ":")))
+    except Exception as e:
+        print("QUERY CAPTURE FAILED:", str(e))
+
+
+def stop_capture() -> None:
+    global _logger, _listener
+    if _listener is not None:
+        _listener.stop()  # flushes queued lines
+        for handler in _listener.handlers:
+            handler.close()
+    if _logger is not None:
+        _logger.handlers.clear()
+    _logger = _listener = None
@@ -0,0 +1,70 @@
+import os
+import gzip
+from typing import Dict, Optional
+
+from app.utils.metrics import observe
+from app.utils.offload import optional_import, process_safe
+
+
+# Bodies smaller than this go out uncompressed (headers + CPU not worth it)
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "5"))
+
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576)
+
+def is_compression_enabled() -> bool:
+    return os.getenv("ENABLE_COMPRESSION", "true").lower() == "true"
+
+
+def _accepted(accept_encoding: str) -> Dict[str, float]:
+    # "gzip;q=0.8, br" → {"gzip": 0.8, "br": 1.0}; a malformed q counts as 0
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, *params = part.split(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = min(max(float(value.strip()), 0.0), 1.0)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding: Optional[str], size: int) -> Optional[str]:
+    """
+    "br" or "gzip" for a body of this size, None → send as is.
+    Picks the supported encoding with the highest q (q=0 → not acceptable);
+    on a tie brotli wins (smaller JSON) when the server has it.
+    """
+    if not accept_encoding or size < COMPRESS_MIN_BYTES or not is_compression_enabled():
+        return None
+    accepted = _accepted(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    # Optional dependency: without brotli only gzip is offered
+    supported = ["br", "gzip"] if optional_import("brotli") is not None else ["gzip"]
+
+    best, best_q = None, 0.0
+    for encoding in supported:
+        q = accepted.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+@process_safe
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return optional_import("brotli").compress(body, quality=COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=COMPRESS_GZIP_LEVEL, mtime=0)
+
+
+def record_sizes(raw: int, sent: int, encoding: Optional[str]) -> None:
+    observe("response.bytes", raw, buckets=SIZE_BUCKETS)
+    observe(f"response.sent_bytes.{encoding or 'identity'}", sent, buckets=SIZE_BUCKETS)
@@ -0,0 +1,119 @@
+import os
+import time
+import asyncio
+import hashlib
+from typing import Any, Callable, Collection, Dict, List, Optional, Tuple
+
+
+# How often Mongo is polled for catalog changes
+DATA_VERSION_POLL_SECONDS = int(os.getenv("DATA_VERSION_POLL_SECONDS", "30"))
+
+_version: str = "init"
+_changed_at = time.monotonic()
+_listeners: List[Callable[[str], None]] = []
+
+
+def get_data_version() -> str:
+    return _version
+
+
+def data_version_age() -> float:
+    # Seconds since the current version was first seen
+    return time.monotonic() - _changed_at
+
+
+def on_data_version_change(callback: Callable[[str], None]) -> None:
+    """
+    Register a callback(new_version) fired after the catalog changes
+    (cache invalidation, index rebuilds, ...). Called off the event loop.
+    """
+    _listeners.append(callback)
+
+
+def compute_data_version() -> str:
+    """
+    Cheap catalog fingerprint: document count + latest updatedAt
+    for vendors and venues (both served by indexes / collection stats).
+    """
+    from app.models.vendor_model import Vendor
+    from app.models.venue_model import VenuePackage
+
+    parts = []
+    for model in (Vendor, VenuePackage):
+        latest = model.objects.only("updatedAt").order_by("-updatedAt").first()
+        parts.append(str(model.objects.count()))
+        parts.append(str(getattr(latest, "updatedAt", None)))
+
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:16]
+
+
+def set_data_version(version: str) -> bool:
+    global _version, _changed_at
+
+    if version == _version:
+        return False
+
+    first_load = _version == "init"
+    _version = version
+    _changed_at = time.monotonic()
+    if first_load:
+        return True
+
+    for callback in _listeners:
+        try:
+            callback(version)
+        except Exception as e:
+            print("DATA VERSION LISTENER FAILED:", str(e))
+    return True
+
+
+def sync_changed_documents(
+    objects,
+    fields: Tuple[str, ...],
+    visible: Dict[str, Any],
+    synced_at: Any,
+    upsert: Callable[[Dict[str, Any]], None],
+    remove: Callable[[str], None],
+    held_ids: Callable[[], Collection[str]],
+) -> Any:
+    """
+    Incremental sync of an in-memory view (suggest trie, materialized geo
+    lists) with a collection: documents changed since synced_at
+    (updatedAt) are upserted, or removed when no longer visible; first
+    call (synced_at None) = full load. Returns the new synced_at.
+
+    visible: filters a document must match to be held (e.g. public venues).
+    held_ids: _ids (str) the view currently holds, for the deletion diff.
+    """
+    # >= re-applies the boundary timestamp, upserts are idempotent
+    changed = objects(updatedAt__gte=synced_at) if synced_at is not None else objects(**visible)
+    for row in changed.only(*fields, *visible, "updatedAt").as_pymongo().no_cache():
+        row["_id"] = str(row["_id"])
+        if all(row.get(field) == value for field, value in visible.items()):
+            upsert(row)
+        else:
+            remove(row["_id"])
+        updated_at = row.get("updatedAt")
+        if updated_at is not None and (synced_at is None or updated_at > synced_at):
+            synced_at = updated_at
+
+    # Deletions don't bump updatedAt: diff ids only when the count disagrees
+    held = held_ids()
+    if objects(**visible).count() != len(held):
+        live = {str(row["_id"]) for row in objects(**visible).only("id").as_pymongo().no_cache()}
+        for doc_id in [doc_id for doc_id in held if doc_id not in live]:
+            remove(doc_id)
+
+    return synced_at
+
+
+async def poll_data_version_loop(interval: Optional[int] = None):
+    interval = interval or DATA_VERSION_POLL_SECONDS
+    while True:
+        try:
+            version = await asyncio.to_thread(compute_data_version)
+            if await asyncio.to_thread(set_data_version, version):
+                print("DATA VERSION CHANGED:", version)
+        except Exception as e:
+            print("DATA VERSION POLL FAILED:", str(e))
+        await asyncio.sleep(interval)
@@ -0,0 +1,166 @@
+import os
+import time
+import asyncio
+from contextvars import ContextVar, Token
+from typing import Any, Optional
+
+from app.utils.metrics import incr
+
+
+# End-to-end budget per /search request; a client may ask for less, never more
+SEARCH_DEADLINE_MS = float(os.getenv("SEARCH_DEADLINE_MS", "15000"))
+SEARCH_DEADLINE_MAX_MS = float(os.getenv("SEARCH_DEADLINE_MAX_MS", "30000"))
+DEADLINE_HEADER = os.getenv("DEADLINE_HEADER", "x-request-timeout-ms")
+# Held back from the LLM call for retrieval + ranking + encoding
+DEADLINE_RESERVE_MS = float(os.getenv("DEADLINE_RESERVE_MS", "500"))
+# LLM call not started with less than this left (regex extraction only)
+LLM_MIN_BUDGET_MS = float(os.getenv("LLM_MIN_BUDGET_MS", "250"))
+
+
+def is_request_deadlines_enabled() -> bool:
+    return os.getenv("ENABLE_REQUEST_DEADLINES", "true").lower() == "true"
+
+
+def is_disconnect_cancellation_enabled() -> bool:
+    return os.getenv("ENABLE_DISCONNECT_CANCELLATION", "true").lower() == "true"
+
+
+class DeadlineExceeded(Exception):
+    # reason: "deadline" (budget spent) | "disconnect" (client went away)
+    def __init__(self, stage: str, reason: str = "deadline"):
+        super().__init__(f"{reason} reached at {stage}")
+        self.stage = stage
+        self.reason = reason
+
+    def __reduce__(self):
+        # Raised in shard worker processes and re-raised in the API process
+        return DeadlineExceeded, (self.stage, self.reason)
+
+
+class Deadline:
+    """
+    Absolute expiry of one request (monotonic clock). The same object is
+    visible from worker threads (asyncio.to_thread copies the context), so
+    a retrieval loop notices an abort between two batches.
+    """
+
+    __slots__ = ("expires_at", "reason")
+
+    def __init__(self, budget_ms: float):
+        self.expires_at = time.monotonic() + budget_ms / 1000
+        self.reason = "deadline"
+
+    def remaining_ms(self) -> float:
+        return max(0.0, (self.expires_at - time.monotonic()) * 1000)
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def abort(self, reason: str) -> None:
+        self.reason = reason
+        self.expires_at = float("-inf")
+
+
+# Deadline of the request being served (None → unbounded: warming, benchmarks)
+_current: ContextVar[Optional[Deadline]] = ContextVar("search_deadline", default=None)
+
+
+def start_deadline(header_value: Optional[str] = None) -> Optional[Token]:
+    if not is_request_deadlines_enabled():
+        return None
+    budget = SEARCH_DEADLINE_MS
+    if header_value:
+        try:
+            requested = float(header_value)
+            if requested > 0:
+                budget = min(requested, SEARCH_DEADLINE_MAX_MS)
+        except ValueError:
+            pass
+    return _current.set(Deadline(budget))
+
+
+def end_deadline(token: Optional[Token]) -> None:
+    if token is not None:
+        _current.reset(token)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+def remaining_ms() -> Optional[float]:
+    deadline = _current.get()
+    return None if deadline is None else deadline.remaining_ms()
+
+
+def deadline_exceeded(stage: str) -> DeadlineExceeded:
+    # Counts the abandoned stage: cancelled.{deadline|disconnect}.{stage}
+    deadline = _current.get()
+    reason = deadline.reason if deadline is not None else "deadline"
+    incr(f"cancelled.{reason}")
+    incr(f"cancelled.{reason}.{stage}")
+    return DeadlineExceeded(stage, reason)
+
+
+def check_deadline(stage: str) -> None:
+    deadline = _current.get()
+    if deadline is not None and deadline.expired():
+        raise deadline_exceeded(stage)
+
+
+def llm_timeout_s() -> Optional[float]:
+    remaining = remaining_ms()
+    if remaining is None:
+        return None
+    return max(0.0, remaining - DEADLINE_RESERVE_MS) / 1000
+
+
+def with_max_time(queryset):
+    """
+    Server-side bound for a Mongo query: maxTimeMS = what is left of the
+    request budget. Mongo reads 0 as "no limit", hence the floor of 1.
+    """
+    remaining = remaining_ms()
+    if remaining is None:
+        return queryset
+    return queryset.max_time_ms(max(1, int(remaining)))
+
+
+class DisconnectWatcher:
+    """
+    Waits for http.disconnect on the request's receive channel (the body
+    has been read by then) and cancels the serving task, so the LLM call
+    and queued DB work stop instead of finishing for nobody.
+    """
+
+    def __init__(self, request: Any):
+        self.request = request
+        self.disconnected = False
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self) -> "DisconnectWatcher":
+        self.task = asyncio.create_task(self._watch(asyncio.current_task()))
+        return self
+
+    async def _watch(self, serving: asyncio.Task) -> None:
+        while True:
+            message = await self.request.receive()
+            if message.get("type") == "http.disconnect":
+                break
+        self.disconnected = True
+        deadline = _current.get()
+        if deadline is not None:
+            deadline.abort("disconnect")  # stops retrieval threads mid-fetch
+        incr("cancelled.disconnect")
+        incr("cancelled.disconnect.request")
+        serving.cancel()
+
+    def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+
+
+def watch_disconnect(request: Any) -> Optional[DisconnectWatcher]:
+    if not is_disconnect_cancellation_enabled():
+        return None
+    return DisconnectWatcher(request).start()
@@ -12,6 +12,36 @@ GEO_KEYWORDS = [
     "location"
 ]
 
+# PRECOMPILED PATTERNS (compiled once at import, not per request)
+PINCODE_RE = re.compile(r"\b\d{6}\b")
+
+BUDGET_PATTERNS = [
+    re.compile(r"(under|below|max|upto)\s*(?P<value>\d+)\s*(?P<unit>k|lakh|lac|cr|crore)?"),
+    re.compile(r"budget\s*(?P<value>\d+)\s*(?P<unit>k|lakh|lac|cr|crore)?"),
+]
+
+EXPERIENCE_PATTERNS = [
+    re.compile(r"(\d+)\s*\+\s*(?:years?|yrs?)"),
+    re.compile(r"more than\s*(\d+)\s*(?:years?|yrs?)"),
+    re.compile(r"(\d+)\s*(?:years?|yrs?)\s*(?:experience|exp)"),
+    re.compile(r"experience\s*(?:of\s*)?(\d+)\s*(?:years?|yrs?)"),
+    re.compile(r"(\d+)\s*(?:years?|yrs?)\s*of\s*experience"),
+    re.compile(r"(\d+)\s*year\s*experience"),
+    re.compile(r"experience\s*(\d+)"),
+]
+
+WORKING_SINCE_PATTERNS = [
+    re.compile(r"working since\s*(19|20)\d{2}"),
+    re.compile(r"since\s*(19|20)\d{2}"),
+    re.compile(r"from\s*(19|20)\d{2}"),
+    re.compile(r"in\s*market\s*since\s*(19|20)\d{2}"),
+    re.compile(r"established\s*in\s*(19|20)\d{2}"),
+    re.compile(r"since year\s*(19|20)\d{2}"),
+]
+
+YEAR_RE = re.compile(r"(19|20)\d{2}")
+
+
 def extract_pincode(query: str):
     """
     Context-aware Indian pincode extraction.
@@ -19,7 +49,7 @@ def extract_pincode(query: str):
     """
 
     # Step 1: Find all 6-digit numbers
-    matches = re.findall(r"\b\d{6}\b", query)
+    matches = PINCODE_RE.findall(query)
 
     if not matches:
         return None
@@ -60,16 +90,11 @@ def extract_budget(query: str):
     - max 50000
     - budget 1 lakh
     """
-    patterns = [
-        r"(under|below|max|upto)\s*(\d+)\s*(k|lakh|lac|cr|crore)?",
-        r"budget\s*(\d+)\s*(k|lakh|lac|cr|crore)?",
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, query)
+    for pattern in BUDGET_PATTERNS:
+        match = pattern.search(query)
         if match:
-            value = int(match.group(2))
-            unit = match.group(3)
+            value = int(match.group("value"))
+            unit = match.group("unit")
             return normalize_budget(value, unit)
 
     return None
@@ -88,18 +113,8 @@ def extract_experience(query: str):
     query = query.lower()
 
     # Direct numeric + experience patterns
-    patterns = [
-        r"(\d+)\s*\+\s*(?:years?|yrs?)",
-        r"more than\s*(\d+)\s*(?:years?|yrs?)",
-        r"(\d+)\s*(?:years?|yrs?)\s*(?:experience|exp)",
-        r"experience\s*(?:of\s*)?(\d+)\s*(?:years?|yrs?)",
-        r"(\d+)\s*(?:years?|yrs?)\s*of\s*experience",
-        r"(\d+)\s*year\s*experience",
-        r"experience\s*(\d+)",
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, query)
+    for pattern in EXPERIENCE_PATTERNS:
+        match = pattern.search(query)
         if match:
             try:
                 return int(match.group(1))
@@ -117,19 +132,10 @@ def extract_working_since(query: str):
     Extract working since year for HARD filtering.
     Covers real-world phrasing.
     """
-    patterns = [
-        r"working since\s*(19|20)\d{2}",
-        r"since\s*(19|20)\d{2}",
-        r"from\s*(19|20)\d{2}",
-        r"in\s*market\s*since\s*(19|20)\d{2}",
-        r"established\s*in\s*(19|20)\d{2}",
-        r"since year\s*(19|20)\d{2}",
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, query)
+    for pattern in WORKING_SINCE_PATTERNS:
+        match = pattern.search(query)
         if match:
-            year = re.search(r"(19|20)\d{2}", match.group(0))
+            year = YEAR_RE.search(match.group(0))
             if year:
                 return int(year.group(0))
 
@@ -173,3 +179,16 @@ def extract_hard_filters(query: str) -> dict:
 
 
     return hard_filters
+
+
+def warm_up_extractors() -> None:
+    """
+    Run every extractor once so first requests don't pay for
+    lazy code paths (patterns are already compiled at import).
+    """
+    for sample in (
+        "photographers in delhi with 5+ years experience",
+        "venues under 2 lakh near 201301",
+        "caterers working since 2010 budget 50k",
+    ):
+        extract_hard_filters(sample)
@@ -0,0 +1,146 @@
+import threading
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+from app.utils.hard_filter import safe_str
+from app.utils.geo_resolver import geo_name
+
+
+# (label, lower bound inclusive) — ascending
+EXPERIENCE_BANDS: List[Tuple[str, int]] = [("0-2", 0), ("3-5", 3), ("6-10", 6), ("11+", 11)]
+PRICE_BANDS: List[Tuple[str, int]] = [
+    ("under 1L", 0),
+    ("1L-2L", 100000),
+    ("2L-5L", 200000),
+    ("5L-10L", 500000),
+    ("10L+", 1000000),
+]
+
+VENDOR_FACETS = ("city", "state", "experience_band")
+VENUE_FACETS = ("city", "state", "price_band")
+
+
+def band(value: Any, bands: List[Tuple[str, int]]) -> Optional[str]:
+    if value is None:
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    label = None
+    for name, lower in bands:
+        if value >= lower:
+            label = name
+    return label
+
+
+class FacetIndex:
+    """
+    Per-value bitmaps over one collection.
+
+    Each facet value owns a Python int used as a packed bit array
+    (bit i = document ordinal i). Counting a result set is one AND +
+    popcount per facet value, independent of how the result set was built.
+    """
+
+    def __init__(self, facet_names: Iterable[str]):
+        self.ordinals: Dict[str, int] = {}
+        self.bitmaps: Dict[str, Dict[str, int]] = {name: {} for name in facet_names}
+        self.labels: Dict[str, Dict[str, str]] = {name: {} for name in facet_names}
+        self._pending: Dict[str, Dict[str, List[int]]] = {name: {} for name in self.bitmaps}
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    def add(self, doc_id: str, values: Dict[str, Any]) -> None:
+        ordinal = self.ordinals.setdefault(doc_id, len(self.ordinals))
+        for name, value in values.items():
+            if value is None or name not in self._pending:
+                continue
+            label = str(value).strip()
+            key = label.lower()
+            if not key:
+                continue
+            self._pending[name].setdefault(key, []).append(ordinal)
+            self.labels[name].setdefault(key, label)
+
+    def finalize(self) -> "FacetIndex":
+        # Pack ordinal lists into bitmaps once (cheaper than OR-ing per doc)
+        for name, values in self._pending.items():
+            for key, ordinals in values.items():
+                self.bitmaps[name][key] = self._pack(ordinals)
+        self._pending = {name: {} for name in self._pending}
+        return self
+
+    def _pack(self, ordinals: Iterable[int]) -> int:
+        bits = bytearray((len(self.ordinals) + 7) // 8)
+        for ordinal in ordinals:
+            bits[ordinal >> 3] |= 1 << (ordinal & 7)
+        return int.from_bytes(bits, "little")
+
+    def result_bitmap(self, doc_ids: Iterable[str]) -> int:
+        lookup = self.ordinals
+        return self._pack(lookup[d] for d in doc_ids if d in lookup)
+
+    def counts(self, doc_ids: Iterable[str], facet_names: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, int]]:
+        result = self.result_bitmap(doc_ids)
+        facets: Dict[str, Dict[str, int]] = {}
+
+        for name in facet_names or self.bitmaps.keys():
+            values = {}
+            if result:
+                labels = self.labels[name]
+                for key, bitmap in self.bitmaps.get(name, {}).items():
+                    count = (bitmap & result).bit_count()
+                    if count:
+                        values[labels[key]] = count
+            facets[name] = dict(sorted(values.items(), key=lambda x: (-x[1], x[0])))
+
+        return facets
+
+
+# GLOBAL FACET INDEXES
+_INDEXES: Dict[str, FacetIndex] = {}
+_lock = threading.Lock()
+
+
+def get_facet_index(kind: str) -> Optional[FacetIndex]:
+    return _INDEXES.get(kind)
+
+
+def build_facet_indexes() -> Dict[str, int]:
+    """
+    Load facet fields for all vendors / public venues and build bitmaps.
+    Swapped in atomically so readers never see a half-built index.
+    """
+    from app.models.vendor_model import Vendor
+    from app.models.venue_model import VenuePackage
+
+    vendors = FacetIndex(VENDOR_FACETS)
+    for vendor in Vendor.objects.only("id", "city", "state", "experience").as_pymongo().no_cache():
+        vendors.add(str(vendor["_id"]), {
+            "city": safe_str(vendor.get("city")),
+            "state": safe_str(vendor.get("state")),
+            "experience_band": band(vendor.get("experience"), EXPERIENCE_BANDS),
+        })
+
+    venues = FacetIndex(VENUE_FACETS)
+    for venue in VenuePackage.objects(visibility="public").only("id", "location", "startingPrice").as_pymongo().no_cache():
+        location = venue.get("location") or {}
+        venues.add(str(venue["_id"]), {
+            "city": geo_name("city", location.get("city")),
+            "state": geo_name("state", location.get("state")),
+            "price_band": band(venue.get("startingPrice"), PRICE_BANDS),
+        })
+
+    with _lock:
+        _INDEXES["vendor"] = vendors.finalize()
+        _INDEXES["venue"] = venues.finalize()
+
+    return {kind: len(index) for kind, index in _INDEXES.items()}
+
+
+def facet_counts(kind: str, results: List[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+    index = get_facet_index(kind)
+    if index is None:
+        return {}
+    return index.counts(item.get("_id") for item in results)
@@ -0,0 +1,125 @@
+import os
+import time
+import threading
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+
+from app.utils.metrics import incr, set_gauge
+
+
+GEO_REFRESH_SECONDS = int(os.getenv("GEO_REFRESH_SECONDS", "600"))
+
+
+def _normalize(name: Any) -> str:
+    return " ".join(str(name or "").lower().split())
+
+
+class GeoResolver:
+    """
+    Bidirectional city/state name ↔ ObjectId cache.
+
+    Venues store location.city / location.state as ObjectIds; this maps
+    query names to ids (for DB equality filters) and ids back to display
+    names (for results, ranking, facets) without per-row lookups.
+    Several cities can share a name (different states) → name maps to a list.
+    """
+
+    def __init__(self):
+        self.names: Dict[str, Dict[str, str]] = {"city": {}, "state": {}}
+        self.ids: Dict[str, Dict[str, List[ObjectId]]] = {"city": {}, "state": {}}
+        self.loaded_at: Optional[float] = None
+
+    def load(self, kind: str, rows) -> None:
+        names: Dict[str, str] = {}
+        ids: Dict[str, List[ObjectId]] = {}
+        for row in rows:
+            name = row.get("name")
+            if not name:
+                continue
+            names[str(row["_id"])] = name
+            ids.setdefault(_normalize(name), []).append(row["_id"])
+        # Swap whole dicts: readers never see a half-loaded map
+        self.names[kind] = names
+        self.ids[kind] = ids
+
+    def resolve(self, kind: str, name: Any) -> List[ObjectId]:
+        return self.ids[kind].get(_normalize(name), [])
+
+    def name_of(self, kind: str, value: Any) -> Optional[str]:
+        """
+        Display name for a stored value: ObjectIds (or their hex) resolve
+        through the cache, anything else is returned as is.
+        """
+        if value is None:
+            return None
+        key = str(value)
+        name = self.names[kind].get(key)
+        if name is None and isinstance(value, ObjectId):
+            incr(f"geo_resolver.miss.{kind}")
+            return key
+        return name or key
+
+
+_RESOLVER = GeoResolver()
+_lock = threading.Lock()
+
+
+def get_geo_resolver() -> GeoResolver:
+    return _RESOLVER
+
+
+def load_geo_names() -> Dict[str, int]:
+    """
+    Bulk load cities and states (name only). Used by warm-up and the
+    periodic refresh.
+    """
+    from app.models.location_model import City, State
+
+    with _lock:
+        _RESOLVER.load("city", City.objects.only("id", "name").as_pymongo().no_cache())
+        _RESOLVER.load("state", State.objects.only("id", "name").as_pymongo().no_cache())
+        _RESOLVER.loaded_at = time.time()
+
+    stats = {kind: len(names) for kind, names in _RESOLVER.names.items()}
+    for kind, count in stats.items():
+        set_gauge(f"geo_resolver.{kind}", count)
+    return stats
+
+
+def ensure_geo_names_fresh() -> None:
+    # For processes without the refresh loop (shard workers)
+    loaded_at = _RESOLVER.loaded_at
+    if loaded_at is None or time.time() - loaded_at > GEO_REFRESH_SECONDS:
+        load_geo_names()
+
+
+def resolve_geo_ids(kind: str, name: Any) -> List[ObjectId]:
+    return _RESOLVER.resolve(kind, name)
+
+
+def geo_name(kind: str, value: Any) -> Optional[str]:
+    return _RESOLVER.name_of(kind, value)
+
+
+def detect_geo_names(text: str, max_words: int = 3) -> Dict[str, str]:
+    """
+    Dictionary lookup of known city/state names in free text (longest
+    n-gram first). A word that is both a city and a state counts as city.
+    """
+    words = _normalize(text).split()
+    found: Dict[str, str] = {}
+    used = set()
+    for size in range(max_words, 0, -1):
+        for start in range(len(words) - size + 1):
+            span = range(start, start + size)
+            if used.intersection(span):
+                continue
+            phrase = " ".join(words[start:start + size])
+            for kind in ("city", "state"):
+                ids = _RESOLVER.ids[kind].get(phrase)
+                if ids and kind not in found:
+                    found[kind] = _RESOLVER.names[kind][str(ids[0])]
+                    used.update(span)
+                    break
+    return found
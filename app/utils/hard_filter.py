@@ -1,9 +1,27 @@
+import os
+import math
+import itertools
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional, Tuple
 from bson import ObjectId
+from mongoengine.queryset.visitor import Q
+from pymongo.errors import ExecutionTimeout
 import re
 from app.models.vendor_model import Vendor
 from app.models.venue_model import VenuePackage
+from app.utils.metrics import incr, observe
+from app.utils.offload import run_blocking
+from app.utils.read_routing import search_objects
+from app.utils.deadline import DeadlineExceeded, check_deadline, deadline_exceeded, with_max_time
+from app.utils.geo_resolver import geo_name, resolve_geo_ids
+from app.utils.bm25 import has_postings, is_bm25_enabled, query_terms
+from app.utils.ranker import BM25_WEIGHT, compute_score, max_score_components
+
+
+# Progressive candidate retrieval (replaces the fixed .limit(200))
+CANDIDATE_BATCH_SIZE = int(os.getenv("CANDIDATE_BATCH_SIZE", "50"))
+CANDIDATE_MAX_DEPTH = int(os.getenv("CANDIDATE_MAX_DEPTH", "1000"))
+DEPTH_BUCKETS = (25, 50, 100, 200, 400, 800, 1600)
 
 
 def safe_str(value):
@@ -28,190 +46,517 @@ def safe_datetime(dt):
     return None
 
 
-# HARD FILTER FOR VENDORS (DB → Clean Dicts)
-async def hard_filter_vendors(structured_query: Dict[str, Any]) -> List[Dict[str, Any]]:
-    try:
-        filters = {
-            # "status": "active"  # business rule: exclude pending vendors
-        }
-
-
-        min_experience = structured_query.get("min_experience")
-        working_since = structured_query.get("working_since")
-        city = structured_query.get("city")
-        state = structured_query.get("state")
-        pincode = structured_query.get("pincode")
-        entity_name = structured_query.get("entity_name")
-        
-        # FORCE TYPE CAST (CRITICAL FIX)
-        
-        if min_experience is not None:
-            min_experience = int(min_experience)
-            filters["experience__gte"] = min_experience
-        
-
-        if working_since is not None:
-            working_since = int(working_since)  
-            filters["workingSince__lte"] = working_since
-
-        if entity_name:
-            filters["vendorName__icontains"] = entity_name
-         
-        if pincode:
-            filters["pincode"] = str(pincode)
-
-
-        if working_since is None and min_experience is None and entity_name is None and pincode is None :  
-            if state:
-                filters["state__iexact"] = state
-            elif city:
-                filters["city__iexact"] = city  
-
-
-        queryset = (
-            Vendor.objects(**filters)
-            .only(
-                "id",
-                "vendorName",
-                "experience",
-                "teamSize",
-                "workingSince",
-                "state",
-                "city",
-                "locality",
-                "pincode",
-                "lastActive",
-                "createdAt",
-            )
-            # .order_by("-lastActive")
-            .limit(200)
-        )
+def _batch_size(top_n: int, max_depth: int) -> int:
+    return min(max(CANDIDATE_BATCH_SIZE, 2 * top_n), max_depth)
 
-        results: List[Dict[str, Any]] = []
 
-        for vendor in queryset:
-            results.append({
-                "_id": str(vendor.id),
-                "vendorName": getattr(vendor, "vendorName", None),
-                "experience": getattr(vendor, "experience", None),
-                "teamSize": getattr(vendor, "teamSize", None),
-                "workingSince": getattr(vendor, "workingSince", None),
+def text_margin(kind: str, structured_query: Dict[str, Any]) -> int:
+    """
+    Most BM25 points ranking can add to a doc: 0 when BM25 is off or no
+    query term occurs in the index (text_relevance_bonus is then empty).
+    """
+    if not is_bm25_enabled() or not has_postings(kind, query_terms(structured_query)):
+        return 0
+    return math.ceil(BM25_WEIGHT)
+
+
+def progressive_fetch(
+    queryset,
+    tiers: List[Tuple[Dict[str, Any], int]],
+    to_dict: Callable[[Any], Dict[str, Any]],
+    structured_query: Dict[str, Any],
+    kind: str,
+    top_n: int,
+    max_depth: Optional[int] = None,
+    pool: Optional[List[Dict[str, Any]]] = None,
+    pool_complete: bool = True,
+    threshold_ratio: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Fetch candidates in index-ordered batches and stop as soon as the
+    strict-filter result set is settled: no unread doc can reach
+    threshold_ratio × the best score. The result (and so totals and
+    facets) doesn't depend on the requested page; top_n only sizes batches.
+
+    tiers: [(extra_filters, score_upper_bound)] — strongest signal first.
+    A tier whose bound is below the threshold is skipped along with every
+    weaker tier. With BM25 on, ranking adds up to text_margin() per doc,
+    so bounds are widened by that margin (same as the shard cut).
+
+    pool: a queryset prefix already fetched in queryset order (speculative
+    retrieval). Tiers are then selected in memory and the output is the
+    same as querying. With pool_complete=False, a tier that runs past the
+    end of the prefix continues in Mongo with only the docs after it.
+    """
+    max_depth = max_depth or CANDIDATE_MAX_DEPTH
+    batch_size = _batch_size(top_n, max_depth)
+    ratio = threshold_ratio or 0
+    results: List[Dict[str, Any]] = []
+    best = None   # best base score seen so far (final top score is >= it)
+    settled = False
+    margin = text_margin(kind, structured_query)
+
+    for extra_filters, bound in tiers:
+        if best is not None and bound + margin < best * ratio:
+            settled = True
+            break
+
+        check_deadline(f"retrieve.{kind}")
+        if pool is None:
+            source = (to_dict(doc) for doc in queryset.filter(**extra_filters).batch_size(batch_size))
+        else:
+            source = (item for item in pool if matches_filters(item, extra_filters))
+            if not pool_complete:
+                rest = queryset.filter(**extra_filters)
+                if pool:
+                    rest = rest.filter(keyset_after(kind, pool[-1]))
+                source = itertools.chain(source, _follow_up(rest.batch_size(batch_size), to_dict, kind))
+
+        fetched = 0
+        for item in source:
+            results.append(item)
+            fetched += 1
+
+            score = compute_score(item, structured_query)
+            if best is None or score > best:
+                best = score
+
+            if len(results) >= max_depth:
+                break
+            if fetched % batch_size == 0:
+                # Between batches: the request may have timed out / been abandoned
+                check_deadline(f"retrieve.{kind}")
+
+        if len(results) >= max_depth:
+            break
+
+    observe(f"retrieval.depth.{kind}", len(results), buckets=DEPTH_BUCKETS)
+    if settled:
+        incr(f"retrieval.early_stop.{kind}")
+    elif len(results) >= max_depth:
+        incr(f"retrieval.depth_cap.{kind}")
+
+    return results
+
+
+def _follow_up(queryset, to_dict: Callable[[Any], Dict[str, Any]], kind: str):
+    # Runs (and is counted) only if a tier actually needs docs past the prefix
+    incr(f"retrieval.follow_up.{kind}")
+    for doc in queryset:
+        yield to_dict(doc)
+
+
+# Retrieval sort field per kind (order_by(-field, -id) below)
+_ORDER_FIELDS = {"vendor": "lastActive", "venue": "createdAt"}
+
+
+def keyset_after(kind: str, item: Dict[str, Any]) -> Q:
+    """
+    Docs sorting after item in retrieval order. Missing dates sort last
+    (descending order puts nulls at the end).
+    """
+    field = _ORDER_FIELDS[kind]
+    value = item.get(field)
+    last_id = ObjectId(item["_id"])
+    if value is None:
+        return Q(**{field: None, "id__lt": last_id})
+    value = datetime.fromisoformat(value) if isinstance(value, str) else value
+    return Q(**{f"{field}__lt": value}) | Q(**{field: value, "id__lt": last_id}) | Q(**{field: None})
 
-                #  SAFE STRING CONVERSION (avoid ObjectId issues)
-                "state": safe_str(getattr(vendor, "state", None)),
-                "city": safe_str(getattr(vendor, "city", None)),
-                "locality": safe_str(getattr(vendor, "locality", None)),
-                "pincode": safe_str(getattr(vendor, "pincode", None)), 
 
-                # DATETIME SAFE
-                "lastActive": safe_datetime(getattr(vendor, "lastActive", None)),
-                "createdAt": safe_datetime(getattr(vendor, "createdAt", None)),
-            })
+# Tier filter fields → keys of the _vendor_to_dict / _venue_to_dict output
+_DICT_FIELDS = {
+    "title": ("venueName",),
+    "location__pincode": ("pincode",),
+    "location__locality": ("locality",),
+    "location__city": ("location", "cityId"),
+    "location__state": ("location", "stateId"),
+}
 
-        return results
+_IN_MEMORY_OPS = {"icontains", "iexact", "in", "nin", "gte", "lte"}
 
-    except Exception as e:
-        print("HARD FILTER VENDOR ERROR:", str(e))
-        return []
 
+def can_match_in_memory(filters: Dict[str, Any]) -> bool:
+    # Plain equality is left to Mongo: stored types (str vs int pincode) differ from the dicts
+    return all("__" in key and key.rsplit("__", 1)[1] in _IN_MEMORY_OPS for key in filters)
 
-# HARD FILTER FOR VENUES
-async def hard_filter_venues(structured_query: Dict[str, Any]) -> List[Dict[str, Any]]:
-    try:
-        filters = {
-            "visibility": "public"
-            # NOTE: Do NOT force approved=True unless all DB docs are approved
-        }
 
-        budget_max = structured_query.get("budget_max")
+def matches_filters(item: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    """
+    In-memory equivalent of the tier / retrieval filters built below
+    (icontains / iexact / in / nin / gte / lte and their negations).
+    Missing values behave like Mongo: only negated operators match them.
+    """
+    for key, expected in filters.items():
+        negate = "__not__" in key
+        field, op = key.replace("__not__", "__").rsplit("__", 1)
+
+        value: Any = item
+        for part in _DICT_FIELDS.get(field, (field,)):
+            value = value.get(part) if isinstance(value, dict) else None
+
+        text = str(value).lower() if value is not None else None
+        if op == "icontains":
+            matched = text is not None and str(expected).lower() in text
+        elif op == "iexact":
+            matched = text is not None and text == str(expected).lower()
+        elif op in ("in", "nin"):
+            matched = value is not None and str(value) in {str(v) for v in expected}
+            negate = op == "nin"
+        elif op in ("gte", "lte"):
+            # Numbers only, like Mongo's type-bracketed comparison
+            matched = isinstance(value, (int, float)) and not isinstance(value, bool) and (
+                value >= expected if op == "gte" else value <= expected
+            )
+        else:
+            raise ValueError(f"unsupported tier filter: {key}")
 
-        # provide a hard search on budget as no other field is available for venues.
-        if budget_max is not  None:
-            filters["startingPrice__lte"] = budget_max
+        if matched == negate:
+            return False
+    return True
 
 
-        city = structured_query.get("city")
-        state = structured_query.get("state")
-        pincode = structured_query.get("pincode")
-        entity_name = structured_query.get("entity_name")
-    
-        if entity_name:
-            filters["title__icontains"] = entity_name
-
-
-        #  ########     FOR FUTURE ENCHANCEMENT
-        # if pincode:
-        #     filters["pincode"] = str(pincode)
-
-
-        # if budget_max is None and entity_name is None and pincode is None :  
-        #     if state:
-        #         filters["state__iexact"] = state
-        #     elif city:
-        #         filters["city__iexact"] = city  
-
-        # Candidate Pool Query (Optimized Projection)
-
-        queryset = (
-            VenuePackage.objects(**filters)
-            .only(
-                "id",
-                "title",
-                "startingPrice",
-                "location",
-                "approved",
-                "createdAt",
-                "updatedAt",
-                "isPremium",
-                "inquiryCount",
-            )
-            # .order_by("-createdAt")
-            .limit(200)
-        )
+def _geo_tiers(
+    components: Dict[str, int],
+    signals: List[Tuple[str, Dict[str, Any], Dict[str, Any]]],
+) -> List[Tuple[Dict[str, Any], int]]:
+    """
+    signals: [(component, match_filters, non_match_filters)] by priority.
+    Splits retrieval on the strongest signal present: matching docs first.
+    """
+    full_bound = sum(components.values())
+    for component, match, non_match in signals:
+        if component in components:
+            return [(match, full_bound), (non_match, full_bound - components[component])]
+    return [({}, full_bound)]
+
+
+# Result field → Mongo field it is built from (field projection)
+VENDOR_FIELD_SOURCES = {
+    "_id": "id",
+    "vendorName": "vendorName",
+    "experience": "experience",
+    "teamSize": "teamSize",
+    "workingSince": "workingSince",
+    "state": "state",
+    "city": "city",
+    "locality": "locality",
+    "pincode": "pincode",
+    "lastActive": "lastActive",
+    "createdAt": "createdAt",
+}
+VENUE_FIELD_SOURCES = {
+    "_id": "id",
+    "venueName": "title",
+    "startingPrice": "startingPrice",
+    "approved": "approved",
+    "isPremium": "isPremium",
+    "inquiryCount": "inquiryCount",
+    "locality": "location",
+    "city": "location",
+    "state": "location",
+    "pincode": "location",
+    "location": "location",
+    "createdAt": "createdAt",
+    "updatedAt": "updatedAt",
+}
+
+# Always fetched: compute_score / rank_key inputs
+RANKING_FIELDS = {
+    "vendor": ("_id", "vendorName", "experience", "workingSince", "state", "city", "locality", "pincode", "lastActive"),
+    "venue": ("_id", "venueName", "startingPrice", "location", "createdAt"),
+}
+
+
+def db_projection(kind: str, fields: Optional[List[str]] = None) -> List[str]:
+    """
+    Mongo fields to fetch: everything the result dicts use, or only
+    ranking inputs + the requested result fields.
+    """
+    sources = VENDOR_FIELD_SOURCES if kind == "vendor" else VENUE_FIELD_SOURCES
+    wanted = sources.keys() if not fields else set(RANKING_FIELDS[kind]) | set(fields)
+    return list(dict.fromkeys(source for name, source in sources.items() if name in wanted))
+
+
+def project_fields(items: List[Dict[str, Any]], fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+    # Client-selected result fields (_id always kept, unknown names ignored)
+    if not fields:
+        return items
+    keep = ["_id", *fields]
+    return [{name: item[name] for name in keep if name in item} for item in items]
+
+
+def _vendor_to_dict(vendor) -> Dict[str, Any]:
+    return {
+        "_id": str(vendor.id),
+        "vendorName": getattr(vendor, "vendorName", None),
+        "experience": getattr(vendor, "experience", None),
+        "teamSize": getattr(vendor, "teamSize", None),
+        "workingSince": getattr(vendor, "workingSince", None),
+
+        #  SAFE STRING CONVERSION (avoid ObjectId issues)
+        "state": safe_str(getattr(vendor, "state", None)),
+        "city": safe_str(getattr(vendor, "city", None)),
+        "locality": safe_str(getattr(vendor, "locality", None)),
+        "pincode": safe_str(getattr(vendor, "pincode", None)), 
+
+        # DATETIME SAFE
+        "lastActive": safe_datetime(getattr(vendor, "lastActive", None)),
+        "createdAt": safe_datetime(getattr(vendor, "createdAt", None)),
+    }
+
+
+def _venue_to_dict(venue) -> Dict[str, Any]:
+    location = getattr(venue, "location", {}) or {}
+
+    # Your DB stores ObjectId in city/state → display names from the resolver cache
+    locality = safe_str(location.get("locality"))
+    city = geo_name("city", location.get("city"))
+    state = geo_name("state", location.get("state"))
+    pincode = safe_str(location.get("pincode"))
+
+    return {
+        "_id": str(venue.id),
+
+        #  IMPORTANT: ranker expects venueName
+        "venueName": getattr(venue, "title", None),
+
+        "startingPrice": getattr(venue, "startingPrice", None),
+        "approved": getattr(venue, "approved", False),
+        "isPremium": getattr(venue, "isPremium", False),
+        "inquiryCount": getattr(venue, "inquiryCount", 0),
+
+        #  FLATTENED GEO FIELDS (for ranking engine)
+        "locality": locality,
+        "city": city,
+        "state": state,
+        "pincode": pincode,
+
+        # NESTED LOCATION (UI compatible)
+        "location": {
+            "locality": locality,
+            "city": city,
+            "state": state,
+            "pincode": pincode,
+            "cityId": safe_str(location.get("city")),
+            "stateId": safe_str(location.get("state")),
+        },
+
+        #SAFE DATETIME (prevents JSON crash)
+        "createdAt": safe_datetime(getattr(venue, "createdAt", None)),
+        "updatedAt": safe_datetime(getattr(venue, "updatedAt", None)),
+    }
+
+
+def _pincode_values(pincode: Any) -> List[Any]:
+    # Pincodes are stored as string or int depending on the writer
+    values = [str(pincode)]
+    if str(pincode).isdigit():
+        values.append(int(pincode))
+    return values
 
-        results: List[Dict[str, Any]] = []
 
-        for venue in queryset:
-            location = getattr(venue, "location", {}) or {}
+# HARD FILTER FOR VENDORS (DB → Clean Dicts)
+def vendor_retrieval(
+    structured_query: Dict[str, Any],
+    fields: Optional[List[str]] = None,
+) -> Tuple[Any, List[Tuple[Dict[str, Any], int]]]:
+    """
+    Candidate queryset (filters, projection, order) + progressive tiers.
+    Shared by the in-process path and shard workers.
+    """
+    filters = {
+        # "status": "active"  # business rule: exclude pending vendors
+    }
 
-            # Your DB stores ObjectId in city/state → must sanitize
-            locality = safe_str(location.get("locality"))
-            city = safe_str(location.get("city"))
-            state = safe_str(location.get("state"))
-            pincode = safe_str(location.get("pincode"))
 
-            results.append({
-                "_id": str(venue.id),
+    min_experience = structured_query.get("min_experience")
+    working_since = structured_query.get("working_since")
+    city = structured_query.get("city")
+    state = structured_query.get("state")
+    pincode = structured_query.get("pincode")
+    entity_name = structured_query.get("entity_name")
+    
+    # FORCE TYPE CAST (CRITICAL FIX)
+    
+    if min_experience is not None:
+        min_experience = int(min_experience)
+        filters["experience__gte"] = min_experience
+    
 
-                #  IMPORTANT: ranker expects venueName
-                "venueName": getattr(venue, "title", None),
+    if working_since is not None:
+        working_since = int(working_since)  
+        filters["workingSince__lte"] = working_since
+
+    if entity_name:
+        filters["vendorName__icontains"] = entity_name
+     
+    if pincode:
+        filters["pincode"] = str(pincode)
+
+
+    if working_since is None and min_experience is None and entity_name is None and pincode is None :  
+        if state:
+            filters["state__iexact"] = state
+        elif city:
+            filters["city__iexact"] = city  
+
+
+    queryset = (
+        search_objects(Vendor)(**filters)
+        .only(*db_projection("vendor", fields))
+        # Same order as the ranker tie-break (lastActive desc)
+        .order_by("-lastActive", "-id")
+    )
+
+    locality = structured_query.get("locality")
+    signals = []
+    if locality:
+        signals.append(("locality", {"locality__icontains": locality}, {"locality__not__icontains": locality}))
+    if city and "city__iexact" not in filters:
+        signals.append(("city", {"city__iexact": city}, {"city__not__iexact": city}))
+    if state and "state__iexact" not in filters:
+        signals.append(("state", {"state__iexact": state}, {"state__not__iexact": state}))
+
+    tiers = _geo_tiers(max_score_components(structured_query, "vendor"), signals)
+
+    # maxTimeMS from the request deadline (fixed here; the fetch loop re-checks per batch)
+    return with_max_time(queryset), tiers
+
+
+async def hard_filter_vendors(
+    structured_query: Dict[str, Any],
+    top_n: int = 10,
+    max_depth: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+    threshold_ratio: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    try:
+        queryset, tiers = vendor_retrieval(structured_query, fields)
 
-                "startingPrice": getattr(venue, "startingPrice", None),
-                "approved": getattr(venue, "approved", False),
-                "isPremium": getattr(venue, "isPremium", False),
-                "inquiryCount": getattr(venue, "inquiryCount", 0),
+        # pymongo round-trips + hydration run off the event loop
+        return await run_blocking(
+            progressive_fetch, queryset, tiers, _vendor_to_dict, structured_query, "vendor", top_n, max_depth,
+            None, True, threshold_ratio,
+        )
 
-                #  FLATTENED GEO FIELDS (for ranking engine)
-                "locality": locality,
-                "city": city,
-                "state": state,
-                "pincode": pincode,
+    # Out of time → the request fails (504), not an empty result
+    except DeadlineExceeded:
+        raise
+    except ExecutionTimeout:
+        raise deadline_exceeded("mongo.vendor")
+    except Exception as e:
+        print("HARD FILTER VENDOR ERROR:", str(e))
+        return []
 
-                # NESTED LOCATION (UI compatible)
-                "location": {
-                    "locality": locality,
-                    "city": city,
-                    "state": state,
-                    "pincode": pincode,
-                },
 
-                #SAFE DATETIME (prevents JSON crash)
-                "createdAt": safe_datetime(getattr(venue, "createdAt", None)),
-                "updatedAt": safe_datetime(getattr(venue, "updatedAt", None)),
-            })
+# HARD FILTER FOR VENUES
+def venue_retrieval(
+    structured_query: Dict[str, Any],
+    fields: Optional[List[str]] = None,
+) -> Tuple[Any, List[Tuple[Dict[str, Any], int]]]:
+    """
+    Candidate queryset (filters, projection, order) + progressive tiers.
+    Shared by the in-process path and shard workers.
+    """
+    filters = {
+        "visibility": "public"
+        # NOTE: Do NOT force approved=True unless all DB docs are approved
+    }
+
+    budget_max = structured_query.get("budget_max")
+
+    # provide a hard search on budget as no other field is available for venues.
+    if budget_max is not  None:
+        filters["startingPrice__lte"] = budget_max
+
+
+    city = structured_query.get("city")
+    state = structured_query.get("state")
+    pincode = structured_query.get("pincode")
+    entity_name = structured_query.get("entity_name")
+
+    if entity_name:
+        filters["title__icontains"] = entity_name
+
+
+    #  ########     FOR FUTURE ENCHANCEMENT
+    # if pincode:
+    #     filters["pincode"] = str(pincode)
+
+    # location.city / location.state hold ObjectIds → names resolved via cache
+    city_ids = resolve_geo_ids("city", city) if city else []
+    state_ids = resolve_geo_ids("state", state) if state else []
+
+    if budget_max is None and entity_name is None and pincode is None :  
+        if state_ids:
+            filters["location__state__in"] = state_ids
+        elif city_ids:
+            filters["location__city__in"] = city_ids
+
+    # Candidate Pool Query (Optimized Projection)
+
+    queryset = (
+        search_objects(VenuePackage)(**filters)
+        .only(*db_projection("venue", fields))
+        .order_by("-createdAt", "-id")
+    )
+
+    locality = structured_query.get("locality")
+    signals = []
+    if pincode:
+        values = _pincode_values(pincode)
+        signals.append(("pincode", {"location__pincode__in": values}, {"location__pincode__nin": values}))
+    if locality:
+        signals.append((
+            "locality",
+            {"location__locality__icontains": locality},
+            {"location__locality__not__icontains": locality},
+        ))
+    if city_ids and "location__city__in" not in filters:
+        signals.append(("city", {"location__city__in": city_ids}, {"location__city__nin": city_ids}))
+    if state_ids and "location__state__in" not in filters:
+        signals.append(("state", {"location__state__in": state_ids}, {"location__state__nin": state_ids}))
+
+    tiers = _geo_tiers(max_score_components(structured_query, "venue"), signals)
+
+    # maxTimeMS from the request deadline (fixed here; the fetch loop re-checks per batch)
+    return with_max_time(queryset), tiers
+
+
+async def hard_filter_venues(
+    structured_query: Dict[str, Any],
+    top_n: int = 10,
+    max_depth: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+    threshold_ratio: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    try:
+        queryset, tiers = venue_retrieval(structured_query, fields)
 
-        return results
+        # pymongo round-trips + hydration run off the event loop
+        return await run_blocking(
+            progressive_fetch, queryset, tiers, _venue_to_dict, structured_query, "venue", top_n, max_depth,
+            None, True, threshold_ratio,
+        )
 
+    # Out of time → the request fails (504), not an empty result
+    except DeadlineExceeded:
+        raise
+    except ExecutionTimeout:
+        raise deadline_exceeded("mongo.venue")
     except Exception as e:
         print("HARD FILTER VENUE ERROR:", str(e))
         return []
+
+
+def fetch_page(kind: str, ids: List[str], fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    One batched fetch of already-ranked _ids (materialized lists, shards),
+    same filters / projection / conversion as candidate retrieval.
+    Returned in ids order; docs gone since ranking are missing.
+    """
+    retrieval, to_dict = (vendor_retrieval, _vendor_to_dict) if kind == "vendor" else (venue_retrieval, _venue_to_dict)
+    queryset, _ = retrieval({}, fields)
+    docs = {item["_id"]: item for item in (to_dict(doc) for doc in queryset.filter(id__in=ids))}
+    return [docs[_id] for _id in ids if _id in docs]
@@ -1,35 +1,55 @@
 import os
 import json
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
 
-from openai import AsyncOpenAI
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
 
+from app.utils.metrics import incr, observe
+from app.utils.warmup import record_import
 
-def get_openai_client() -> Optional[AsyncOpenAI]:
+
+_client: Optional["AsyncOpenAI"] = None
+
+# Upper bound for calls without a request deadline (cache warming, batches);
+# /search calls are also cut at the request's remaining budget
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "20"))
+
+
+def get_openai_client() -> Optional["AsyncOpenAI"]:
     """
     Lazy client initialization to prevent startup crashes
     if OPENAI_API_KEY is missing.
+
+    - openai is imported on first use only (not when ENABLE_LLM=false)
+    - one client (and its HTTP connection pool) is reused across requests
     """
+    global _client
+
+    if _client is not None:
+        return _client
+
     api_key = os.getenv("OPENAI_API_KEY")
 
     if not api_key:
         print("OPENAI_API_KEY not found. LLM enrichment disabled.")
         return None
 
-    return AsyncOpenAI(api_key=api_key)
+    start = time.perf_counter()
+    from openai import AsyncOpenAI
+    record_import("openai", (time.perf_counter() - start) * 1000)
 
+    _client = AsyncOpenAI(api_key=api_key, timeout=LLM_TIMEOUT_SECONDS)
+    return _client
 
-def _build_prompt(query: str, extracted_filters: Dict[str, Any]) -> str:
-    return f"""
-You are an AI search enrichment engine for a wedding marketplace (vendors & venues).
 
-USER QUERY:
-"{query}"
+LLM_MODEL = "gpt-4o-mini"
 
-REGEX-EXTRACTED FILTERS 
-{json.dumps(extracted_filters, indent=2)}
+SYSTEM_PROMPT = "You are a strict JSON generator for NLP search enrichment."
 
-YOUR TASK:
+# Shared by the single-query and batched prompts
+ENRICHMENT_RULES = """YOUR TASK:
 1. Verify regex extractor (like budget, experience, working_since, pincode) and if regex extractor have filled wrong values then correct them or is missed them. For example, if regex extracted working since from query as it may in different form like in market from 2000 then extract it.
 2. Enrich  missing fields (city, state, locality, semantic_tags) and if city,state are not present  in the query then fill them with null instead of wrong extraction.
 GEO EXTRACTION PRIORITY:
@@ -64,7 +84,20 @@ Query: "vendor in 245368"
 Query: "vendors in NH2"
 → locality = "NH2"
 
-OUTPUT STRICT JSON FORMAT:
+"""
+
+
+def _build_prompt(query: str, extracted_filters: Dict[str, Any]) -> str:
+    return f"""
+You are an AI search enrichment engine for a wedding marketplace (vendors & venues).
+
+USER QUERY:
+"{query}"
+
+REGEX-EXTRACTED FILTERS 
+{json.dumps(extracted_filters, indent=2)}
+
+{ENRICHMENT_RULES}OUTPUT STRICT JSON FORMAT:
 {{
     "raw_query": "{query}",
     "entity_name": null,
@@ -86,65 +119,117 @@ NO EXPLANATION.
 
 
 
+# COMPACT PROMPT MODE: static system prompt (cacheable prefix) + tiny user turn
+COMPACT_SYSTEM_PROMPT = """Wedding marketplace search enrichment. Return ONLY a JSON object:
+{"entity_name":str|null,"min_experience":int|null,"budget_max":int|null,"working_since":int|null,"city":str|null,"state":str|null,"locality":str|null,"pincode":str|null,"semantic_tags":[str]}
+Input: {"q": user query, "f": regex-extracted filters}.
+Rules:
+- Fix wrong/missed f values (budget in rupees: 50k=50000, 2 lakh=200000; experience years; working_since year, e.g. "in market from 2000").
+- city/state/locality only if explicitly in q (fix spelling), else null. Both city and state if both appear. Pincode = 6 digits.
+- Locality examples: NH2, Sector 62, MG Road, Raj Nagar. Priority locality > city > state.
+- entity_name = business/venue name in q (fix clear misspellings, never invent).
+- semantic_tags = short descriptive keywords (service/style/amenity).
+- If unsure keep null. No explanation."""
+
+TOKEN_BUCKETS = (50, 100, 200, 400, 800, 1600, 3200)
+
+
+def get_prompt_mode() -> str:
+    return os.getenv("LLM_PROMPT_MODE", "full").lower()
+
+
+def _build_compact_user_content(query: str, extracted_filters: Dict[str, Any]) -> str:
+    filters = {
+        key: extracted_filters.get(key)
+        for key in ("min_experience", "budget_max", "working_since", "pincode")
+        if extracted_filters.get(key) is not None
+    }
+    return json.dumps({"q": query, "f": filters}, separators=(",", ":"), ensure_ascii=False)
+
+
+def build_messages(query: str, extracted_filters: Dict[str, Any], mode: Optional[str] = None) -> List[Dict[str, str]]:
+    if (mode or get_prompt_mode()) == "compact":
+        return [
+            {"role": "system", "content": COMPACT_SYSTEM_PROMPT},
+            {"role": "user", "content": _build_compact_user_content(query, extracted_filters)},
+        ]
+
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": _build_prompt(query, extracted_filters)},
+    ]
+
+
+def record_usage(response: Any, call_type: str = "single") -> None:
+    """
+    Token accounting from the OpenAI `usage` block → metrics.
+    """
+    usage = getattr(response, "usage", None)
+    incr(f"llm.calls.{call_type}")
+    if usage is None:
+        return
+
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    incr("llm.prompt_tokens", prompt_tokens)
+    incr("llm.completion_tokens", completion_tokens)
+    observe(f"llm.prompt_tokens.{call_type}", prompt_tokens, buckets=TOKEN_BUCKETS)
+    observe(f"llm.completion_tokens.{call_type}", completion_tokens, buckets=TOKEN_BUCKETS)
+
+
+def fallback_enrichment() -> Dict[str, Any]:
+    return {
+        "entity_name": None,
+        "category": None,
+        "style": None,
+        "semantic_tags": [],
+        "confidence": 0.0,
+    }
+
+
+def normalize_enrichment(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "raw_query": parsed.get("raw_query"),
+        "flag": parsed.get("flag"),
+        "city": parsed.get("city"),
+        "state": parsed.get("state"),
+        "locality": parsed.get("locality"),
+        "pincode": parsed.get("pincode"),
+        "min_experience": parsed.get("min_experience"),
+        "budget_max": parsed.get("budget_max"),
+        "working_since": parsed.get("working_since"),
+        "entity_name": parsed.get("entity_name"),
+        "category": parsed.get("category"),
+        "style": parsed.get("style"),
+        "semantic_tags": parsed.get("semantic_tags", []),
+        "confidence": parsed.get("confidence", 0.5),
+    }
+
+
 async def enrich_with_llm(query: str, extracted_filters: Dict[str, Any]) -> Dict[str, Any]:
     try:
         client = get_openai_client()
 
         # CRITICAL: Safe fallback if no API key
         if client is None:
-            return {
-                "entity_name": None,
-                "category": None,
-                "style": None,
-                "semantic_tags": [],
-                "confidence": 0.0,
-            }
+            return fallback_enrichment()
 
-        prompt = _build_prompt(query, extracted_filters)
-        # print(f"🔍 LLM Prompt:\n{prompt}")
+        messages = build_messages(query, extracted_filters)
+        # print(f"🔍 LLM Prompt:\n{messages}")
 
         response = await client.chat.completions.create(
-            model="gpt-4o-mini",
+            model=LLM_MODEL,
             temperature=0.1,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a strict JSON generator for NLP search enrichment."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
+            messages=messages,
             response_format={"type": "json_object"},
         )
+        record_usage(response, "single")
 
         content = response.choices[0].message.content
         parsed = json.loads(content)
         # print(f"LLM Enrichment Output: {parsed}")
         # print(f"LLM Enrichment Output (raw): {content}")
-        return {
-            "raw_query": parsed.get("raw_query"),
-            "flag": parsed.get("flag"),
-            "city": parsed.get("city"),
-            "state": parsed.get("state"),
-            "locality": parsed.get("locality"),
-            "pincode": parsed.get("pincode"),
-            "min_experience": parsed.get("min_experience"),
-            "budget_max": parsed.get("budget_max"),
-            "working_since": parsed.get("working_since"),
-            "entity_name": parsed.get("entity_name"),
-            "category": parsed.get("category"),
-            "style": parsed.get("style"),
-            "semantic_tags": parsed.get("semantic_tags", []),
-            "confidence": parsed.get("confidence", 0.5),
-        }
+        return normalize_enrichment(parsed)
     except Exception as e:
         print("LLM ENRICHMENT FAILED:", str(e))
-        return {
-            "entity_name": None,
-            "category": None,
-            "style": None,
-            "semantic_tags": [],
-            "confidence": 0.0,
-        }
\ No newline at end of file
+        return fallback_enrichment()
\ No newline at end of file
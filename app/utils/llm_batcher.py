@@ -0,0 +1,206 @@
+import os
+import json
+import asyncio
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from app.utils.llm import (
+    COMPACT_SYSTEM_PROMPT,
+    ENRICHMENT_RULES,
+    LLM_MODEL,
+    SYSTEM_PROMPT,
+    enrich_with_llm,
+    fallback_enrichment,
+    get_openai_client,
+    get_prompt_mode,
+    normalize_enrichment,
+    record_usage,
+    _build_compact_user_content,
+)
+from app.utils.metrics import incr, observe
+
+
+LLM_BATCH_WINDOW_MS = float(os.getenv("LLM_BATCH_WINDOW_MS", "5"))
+LLM_BATCH_MAX = int(os.getenv("LLM_BATCH_MAX", "8"))
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32)
+
+
+def is_llm_batching_enabled() -> bool:
+    return os.getenv("ENABLE_LLM_BATCHING", "false").lower() == "true"
+
+
+BATCH_COMPACT_SUFFIX = """
+Batch input: {"items": [{"id", "q", "f"}, ...]}, each independent.
+Return {"results": [{"id": same id, ...fields above}]} with exactly one result per id."""
+
+
+def _build_batch_prompt(items: List[Tuple[str, Dict[str, Any]]]) -> str:
+    queries = [
+        {"id": i, "query": query, "regex_filters": filters}
+        for i, (query, filters) in enumerate(items)
+    ]
+    return f"""
+You are an AI search enrichment engine for a wedding marketplace (vendors & venues).
+You receive {len(items)} INDEPENDENT user queries. Apply the task and rules below to EACH query separately.
+
+USER QUERIES (with their regex-extracted filters):
+{json.dumps(queries, separators=(",", ":"), default=str)}
+
+{ENRICHMENT_RULES}
+OUTPUT STRICT JSON FORMAT:
+{{
+    "results": [
+        {{
+            "id": number (same id as the input query),
+            "raw_query": string,
+            "entity_name": string or null,
+            "min_experience": number or null,
+            "budget_max": number or null,
+            "working_since": number or null,
+            "city": string or null,
+            "state": string or null,
+            "locality": string or null,
+            "pincode": string or null,
+            "semantic_tags": [string]
+        }}
+    ]
+}}
+
+Exactly one result per input id.
+RETURN ONLY VALID JSON.
+NO EXPLANATION.
+"""
+
+
+def _build_batch_messages(items: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, str]]:
+    if get_prompt_mode() == "compact":
+        inputs = [json.loads(_build_compact_user_content(query, filters)) for query, filters in items]
+        for i, item in enumerate(inputs):
+            item["id"] = i
+        return [
+            {"role": "system", "content": COMPACT_SYSTEM_PROMPT + BATCH_COMPACT_SUFFIX},
+            {"role": "user", "content": json.dumps({"items": inputs}, separators=(",", ":"), ensure_ascii=False)},
+        ]
+
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": _build_batch_prompt(items)},
+    ]
+
+
+async def enrich_batch(items: List[Tuple[str, Dict[str, Any]]]) -> Dict[int, Dict[str, Any]]:
+    """
+    One LLM call for several queries.
+    Returns {index: enrichment}; ids missing or malformed in the
+    response are simply absent (callers fall back per item).
+    """
+    client = get_openai_client()
+    if client is None:
+        return {i: fallback_enrichment() for i in range(len(items))}
+
+    response = await client.chat.completions.create(
+        model=LLM_MODEL,
+        temperature=0.1,
+        messages=_build_batch_messages(items),
+        response_format={"type": "json_object"},
+    )
+    record_usage(response, "batch")
+
+    parsed = json.loads(response.choices[0].message.content)
+    results: Dict[int, Dict[str, Any]] = {}
+
+    for entry in parsed.get("results") or []:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            index = int(entry.get("id"))
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < len(items) and index not in results:
+            results[index] = normalize_enrichment(entry)
+
+    return results
+
+
+class LLMBatcher:
+    """
+    Micro-batcher for concurrent enrich_with_llm calls.
+
+    Requests arriving within LLM_BATCH_WINDOW_MS (or until LLM_BATCH_MAX
+    are queued) share one prompt; parsed results are fanned back to each
+    waiter. Items the batch response misses fall back to a single call;
+    a failed batch call resolves every waiter as llm_skipped.
+    """
+
+    def __init__(self, window_ms: float = LLM_BATCH_WINDOW_MS, max_batch: int = LLM_BATCH_MAX):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.pending: List[Tuple[str, Dict[str, Any], asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        # The loop only keeps weak references to tasks: hold running batches here
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, query: str, extracted_filters: Dict[str, Any]) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((query, dict(extracted_filters), future))
+
+        if len(self.pending) >= self.max_batch:
+            self._flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        batch, self.pending = self.pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, Dict[str, Any], asyncio.Future]]) -> None:
+        observe("llm.batch.size", len(batch), buckets=BATCH_SIZE_BUCKETS)
+
+        results: Dict[int, Dict[str, Any]] = {}
+        if len(batch) > 1:
+            incr("llm.batch.calls")
+            try:
+                results = await enrich_batch([(query, filters) for query, filters, _ in batch])
+            except Exception as e:
+                # No retry storm of N single calls against a failing LLM:
+                # every waiter gets the hard-filter-only (degraded) answer
+                print("LLM BATCH ENRICHMENT FAILED:", str(e))
+                incr("llm.batch.failures")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_result(dict(fallback_enrichment(), llm_skipped=True))
+                return
+
+        async def resolve(index: int, query: str, filters: Dict[str, Any], future: asyncio.Future):
+            result = results.get(index)
+            if result is None:
+                if len(batch) > 1:
+                    incr("llm.batch.fallbacks")
+                result = await enrich_with_llm(query=query, extracted_filters=filters)
+            if not future.done():
+                future.set_result(result)
+
+        await asyncio.gather(*(
+            resolve(i, query, filters, future)
+            for i, (query, filters, future) in enumerate(batch)
+            if not future.done()
+        ))
+
+
+_BATCHER: Optional[LLMBatcher] = None
+
+
+async def enrich_with_llm_batched(query: str, extracted_filters: Dict[str, Any]) -> Dict[str, Any]:
+    global _BATCHER
+    if _BATCHER is None:
+        _BATCHER = LLMBatcher()
+    return await _BATCHER.submit(query, extracted_filters)
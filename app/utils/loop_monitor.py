@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+import traceback
+from typing import Optional
+
+from app.utils.metrics import incr, observe, set_gauge
+
+
+LOOP_LAG_INTERVAL_MS = float(os.getenv("LOOP_LAG_INTERVAL_MS", "50"))
+# A stall longer than this logs the event-loop thread's stack
+LOOP_LAG_THRESHOLD_MS = float(os.getenv("LOOP_LAG_THRESHOLD_MS", "100"))
+LOOP_LAG_STACK_DEPTH = int(os.getenv("LOOP_LAG_STACK_DEPTH", "15"))
+LAG_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+def is_loop_monitor_enabled() -> bool:
+    return os.getenv("ENABLE_LOOP_MONITOR", "true").lower() == "true"
+
+
+class LoopLagMonitor:
+    """
+    Event-loop lag monitor.
+
+    - a coroutine sleeps LOOP_LAG_INTERVAL_MS and records how late it woke
+      (histogram event_loop.lag_ms)
+    - a watchdog thread watches the coroutine's heartbeat; when the loop
+      has been stuck past LOOP_LAG_THRESHOLD_MS it samples the loop
+      thread's stack *while it is still blocked* and logs it once per stall
+    """
+
+    def __init__(self, interval_ms: float = LOOP_LAG_INTERVAL_MS, threshold_ms: float = LOOP_LAG_THRESHOLD_MS):
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.heartbeat = time.perf_counter()
+        self.loop_thread_id: Optional[int] = None
+        self._reported = False
+        self._stop = threading.Event()
+
+    async def run(self) -> None:
+        self.loop_thread_id = threading.get_ident()
+        self.heartbeat = time.perf_counter()
+        watchdog = threading.Thread(target=self._watchdog, name="loop-watchdog", daemon=True)
+        watchdog.start()
+
+        try:
+            while True:
+                before = time.perf_counter()
+                await asyncio.sleep(self.interval)
+                now = time.perf_counter()
+                lag_ms = max(0.0, (now - before - self.interval) * 1000)
+
+                observe("event_loop.lag_ms", lag_ms, buckets=LAG_BUCKETS)
+                set_gauge("event_loop.lag_ms.last", round(lag_ms, 3))
+                self.heartbeat = now
+                self._reported = False
+        finally:
+            self._stop.set()
+
+    def _watchdog(self) -> None:
+        while not self._stop.wait(self.interval):
+            stalled = time.perf_counter() - self.heartbeat - self.interval
+            if stalled < self.threshold or self._reported:
+                continue
+
+            self._reported = True
+            incr("event_loop.stalls")
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)[-LOOP_LAG_STACK_DEPTH:]) if frame else "<no frame>"
+            print(f"EVENT LOOP BLOCKED > {round(stalled * 1000)} ms, loop thread stack:\n{stack}")
+
+
+async def monitor_event_loop() -> None:
+    if not is_loop_monitor_enabled():
+        return
+    await LoopLagMonitor().run()
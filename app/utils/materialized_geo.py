@@ -0,0 +1,251 @@
+import os
+import threading
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from pymongo.errors import ExecutionTimeout
+
+from app.utils.bm25 import is_bm25_enabled, query_terms
+from app.utils.data_version import sync_changed_documents
+from app.utils.deadline import deadline_exceeded
+from app.utils.geo_resolver import geo_name
+from app.utils.hard_filter import fetch_page, safe_datetime, text_margin
+from app.utils.metrics import incr, set_gauge
+from app.utils.offload import run_blocking
+from app.utils.ranker import compute_score, text_relevance_bonus
+
+
+GEO_FIELDS = ("city", "state", "locality")
+
+# Any of these present → not a pure geo query
+NON_GEO_SIGNALS = ("entity_name", "pincode", "min_experience", "working_since", "budget_max", "semantic_tags")
+
+
+def is_materialized_geo_enabled() -> bool:
+    return os.getenv("ENABLE_MATERIALIZED_GEO", "false").lower() == "true"
+
+
+class GeoRankedLists:
+    """
+    Ranked _id lists per (geo field, value) for one kind.
+
+    For a query whose only signal is that value, compute_score gives
+    every member the same points, so the ranking is fixed between data
+    updates: base score + BM25 bonus for the value's words, then the
+    usual recency / _id tie-break (ranker.rank_key). Lists hold
+    (score, _id) in that order; the documents themselves are fetched per page.
+    """
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.docs: Dict[str, Tuple[Any, Dict[str, str]]] = {}  # _id → (recency, {field: label})
+        self.members: Dict[Tuple[str, str], Set[str]] = {}
+        self.labels: Dict[Tuple[str, str], str] = {}
+        self.lists: Dict[Tuple[str, str], List[Tuple[int, str]]] = {}
+        self.synced_at = None  # latest updatedAt applied
+        self.dirty: Set[Tuple[str, str]] = set()
+        self.with_bm25 = None  # ENABLE_BM25 the lists were ranked with
+
+    def upsert(self, doc_id: str, recency: Any, geo: Dict[str, Any]) -> None:
+        labels = {field: str(value) for field, value in geo.items() if value}
+        if self.docs.get(doc_id) == (recency, labels):
+            return  # nothing that affects ranking changed
+        self.remove(doc_id)
+        self.docs[doc_id] = (recency, labels)
+        for field, label in labels.items():
+            key = (field, label.lower())
+            self.members.setdefault(key, set()).add(doc_id)
+            self.labels.setdefault(key, label)
+            self.dirty.add(key)
+
+    def remove(self, doc_id: str) -> None:
+        old = self.docs.pop(doc_id, None)
+        if old is None:
+            return
+        for field, label in old[1].items():
+            key = (field, label.lower())
+            members = self.members.get(key)
+            if members is not None:
+                members.discard(doc_id)
+                if not members:
+                    del self.members[key]
+                    self.labels.pop(key, None)
+            self.dirty.add(key)
+
+    def rebuild_dirty(self) -> int:
+        # Only lists whose membership changed are re-ranked; readers keep
+        # using the previous dict until the swap
+        with_bm25 = is_bm25_enabled()
+        if with_bm25 != self.with_bm25:
+            # Bonus switched on / off: every list's scores change
+            self.dirty |= set(self.members)
+            self.with_bm25 = with_bm25
+        lists = dict(self.lists)
+        for key in self.dirty:
+            ids = self.members.get(key)
+            if not ids:
+                lists.pop(key, None)
+                continue
+            field, _ = key
+            label = self.labels[key]
+            base = compute_score({field: label}, {field: label})
+            bonus = text_relevance_bonus(self.kind, {"raw_query": label}, list(ids))
+            ranked = sorted(((base + bonus.get(_id, 0), self.docs[_id][0] or "", _id) for _id in ids), reverse=True)
+            lists[key] = [(score, _id) for score, _, _id in ranked]
+        rebuilt = len(self.dirty)
+        self.lists = lists
+        self.dirty = set()
+        return rebuilt
+
+    def lookup(self, field: str, value: Any) -> Optional[Tuple[str, List[Tuple[int, str]]]]:
+        """
+        (label, ranked list) for a query value. Locality matches by
+        substring like the ranker; served only when one stored value matches.
+        """
+        lists = self.lists
+        needle = str(value).lower()
+        if field != "locality":
+            ranked = lists.get((field, needle))
+            return (self.labels.get((field, needle), str(value)), ranked) if ranked else None
+
+        keys = [key for key in list(lists) if key[0] == "locality" and needle in key[1]]
+        if len(keys) != 1:
+            return None
+        return self.labels.get(keys[0], keys[0][1]), lists[keys[0]]
+
+
+def _vendor_source():
+    from app.models.vendor_model import Vendor
+    return Vendor.objects
+
+
+def _venue_source():
+    from app.models.venue_model import VenuePackage
+    return VenuePackage.objects
+
+
+def _vendor_row(row: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+    return safe_datetime(row.get("lastActive")), {
+        "city": row.get("city"),
+        "state": row.get("state"),
+        "locality": row.get("locality"),
+    }
+
+
+def _venue_row(row: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+    location = row.get("location") or {}
+    return safe_datetime(row.get("createdAt")), {
+        "city": geo_name("city", location.get("city")),
+        "state": geo_name("state", location.get("state")),
+        "locality": location.get("locality"),
+    }
+
+
+# kind → (queryset source, projection, row parser, visible filter)
+_SOURCES = {
+    "vendor": (_vendor_source, ("id", "city", "state", "locality", "lastActive"), _vendor_row, {}),
+    "venue": (_venue_source, ("id", "location", "createdAt"), _venue_row, {"visibility": "public"}),
+}
+
+_INDEXES: Dict[str, GeoRankedLists] = {}
+_lock = threading.Lock()
+
+
+def _sync(index: GeoRankedLists) -> int:
+    source, fields, parse, visible = _SOURCES[index.kind]
+    index.synced_at = sync_changed_documents(
+        source(), fields, visible, index.synced_at,
+        upsert=lambda row: index.upsert(row["_id"], *parse(row)),
+        remove=index.remove,
+        held_ids=lambda: list(index.docs),
+    )
+    return index.rebuild_dirty()
+
+
+def sync_geo_lists() -> Any:
+    """
+    Build (first call) or incrementally update the ranked geo lists.
+    Runs after the BM25 indexes (bonus) and geo names (venue labels).
+    """
+    if not is_materialized_geo_enabled():
+        return "disabled"
+
+    stats = {}
+    with _lock:
+        for kind in _SOURCES:
+            index = _INDEXES.get(kind) or GeoRankedLists(kind)
+            rebuilt = _sync(index)
+            _INDEXES[kind] = index
+            set_gauge(f"materialized_geo.lists.{kind}", len(index.lists))
+            stats[kind] = {"lists": len(index.lists), "rebuilt": rebuilt}
+    return stats
+
+
+def geo_only_query(structured_query: Dict[str, Any]) -> Optional[Tuple[str, Any]]:
+    # (field, value) when exactly one geo field is the whole query
+    for signal in NON_GEO_SIGNALS:
+        value = structured_query.get(signal)
+        if value is not None and value != "" and value != []:
+            return None
+    geo = [(field, structured_query[field]) for field in GEO_FIELDS if structured_query.get(field)]
+    return geo[0] if len(geo) == 1 else None
+
+
+async def materialized_search(
+    kind: str,
+    structured_query: Dict[str, Any],
+    top_n: int,
+    threshold_ratio: Optional[float],
+    fields: Optional[List[str]] = None,
+) -> Optional[Tuple[List[Dict[str, Any]], int, List[str]]]:
+    """
+    (top_n ranked items, total, all result _ids) for a pure geo query, or
+    None when the query must go through retrieval + ranking.
+    Page and total cover every doc with the value: the set retrieval
+    reads too, unless it hits its depth cap.
+    """
+    geo = geo_only_query(structured_query)
+    index = _INDEXES.get(kind)
+    if geo is None or index is None:
+        return None
+
+    found = index.lookup(*geo)
+    if found is None:
+        incr(f"materialized_geo.miss.no_list.{kind}")
+        return None
+    label, ranked = found
+    field = geo[0]
+
+    # Locality is a soft tier: retrieval also reads the docs without it
+    # (BM25 can lift them over the threshold) unless the tier cut skips them
+    base = compute_score({field: label}, {field: label})
+    if field == "locality" and text_margin(kind, structured_query) >= base * (threshold_ratio or 0):
+        incr(f"materialized_geo.miss.soft_tier.{kind}")
+        return None
+
+    if is_bm25_enabled() != index.with_bm25:
+        incr(f"materialized_geo.miss.bm25.{kind}")
+        return None
+    # BM25 bonus was computed for the value's own words
+    if is_bm25_enabled() and set(query_terms(structured_query)) != set(query_terms({"raw_query": label})):
+        incr(f"materialized_geo.miss.terms.{kind}")
+        return None
+
+    # apply_strict_filter on a score-descending list = a prefix
+    threshold = ranked[0][0] * (threshold_ratio or 0)
+    total = bisect_right(ranked, -threshold, key=lambda entry: -entry[0])
+
+    page = ranked[:min(top_n, total)]
+    try:
+        items = await run_blocking(fetch_page, kind, [_id for _, _id in page], fields)
+    except ExecutionTimeout:
+        raise deadline_exceeded(f"mongo.{kind}")
+    if len(items) != len(page):
+        # Deleted since the last sync
+        incr(f"materialized_geo.miss.stale.{kind}")
+        return None
+
+    for item, (score, _) in zip(items, page):
+        item["_score"] = score
+    incr(f"materialized_geo.hit.{kind}")
+    return items, total, [_id for _, _id in ranked[:total]]
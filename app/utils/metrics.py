@@ -0,0 +1,63 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, Any, Tuple
+
+
+# Default latency buckets (ms)
+DEFAULT_BUCKETS: Tuple[float, ...] = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = {}
+_gauges: Dict[str, float] = {}
+_histograms: Dict[str, Dict[str, Any]] = {}
+
+
+def incr(name: str, value: float = 1) -> None:
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def set_gauge(name: str, value: float) -> None:
+    _gauges[name] = value
+
+
+def observe(name: str, value: float, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+    """
+    Cumulative-bucket histogram (Prometheus style, last bucket = +Inf).
+    """
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = {"buckets": buckets, "counts": [0] * (len(buckets) + 1), "count": 0, "sum": 0.0, "max": 0.0}
+            _histograms[name] = hist
+        hist["counts"][bisect_left(hist["buckets"], value)] += 1
+        hist["count"] += 1
+        hist["sum"] += value
+        hist["max"] = max(hist["max"], value)
+
+
+def get_counter(name: str) -> float:
+    return _counters.get(name, 0)
+
+
+def snapshot() -> Dict[str, Any]:
+    with _lock:
+        histograms = {}
+        for name, hist in _histograms.items():
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(list(hist["buckets"]) + ["+Inf"], hist["counts"]):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            histograms[name] = {
+                "count": hist["count"],
+                "sum": round(hist["sum"], 3),
+                "max": round(hist["max"], 3),
+                "buckets": buckets,
+            }
+
+        return {
+            "counters": dict(_counters),
+            "gauges": dict(_gauges),
+            "histograms": histograms,
+        }
@@ -0,0 +1,114 @@
+from typing import Any, Dict, List
+
+from app.models.request import SearchRequest
+from app.utils.offload import optional_import, process_safe
+
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+# Request = msgpack array in this order; trailing entries may be omitted
+REQUEST_FIELDS = ("query", "flag", "page", "limit", "threshold_ratio", "facets", "fields", "include_structured_query")
+
+RESULT_KEYS = ("vendors", "venues")
+
+_REQUEST_DEFAULTS = {
+    name: field.default for name, field in SearchRequest.model_fields.items() if not field.is_required()
+}
+
+def _get_msgpack():
+    return optional_import("msgpack")
+
+
+def is_msgpack_available() -> bool:
+    # Optional dependency: without it the binary endpoint answers 415
+    return _get_msgpack() is not None
+
+
+def _check(condition: bool, message: str) -> None:
+    if not condition:
+        raise ValueError(message)
+
+
+def decode_request(body: bytes) -> SearchRequest:
+    """
+    msgpack array → SearchRequest without Pydantic validation; the
+    checks mirror SearchRequest's constraints. ValueError → 400.
+    """
+    try:
+        values = _get_msgpack().unpackb(body, raw=False)
+    except Exception as e:
+        raise ValueError(f"invalid msgpack: {e}")
+    _check(isinstance(values, (list, tuple)) and 2 <= len(values) <= len(REQUEST_FIELDS),
+           f"expected an array of 2-{len(REQUEST_FIELDS)} values: {', '.join(REQUEST_FIELDS)}")
+
+    data = {name: value for name, value in zip(REQUEST_FIELDS, values) if value is not None}
+    _check(isinstance(data.get("query"), str), "query must be a string")
+    _check(isinstance(data.get("flag"), str), "flag must be a string")
+    for name, low, high in (("page", 1, None), ("limit", 1, 50)):
+        value = data.get(name)
+        if value is not None:
+            _check(isinstance(value, int) and not isinstance(value, bool), f"{name} must be an integer")
+            _check(value >= low and (high is None or value <= high), f"{name} out of range")
+    if "threshold_ratio" in data:
+        _check(isinstance(data["threshold_ratio"], (int, float)) and not isinstance(data["threshold_ratio"], bool),
+               "threshold_ratio must be a number")
+        data["threshold_ratio"] = float(data["threshold_ratio"])
+    for name in ("facets", "include_structured_query"):
+        if name in data:
+            _check(isinstance(data[name], bool), f"{name} must be a boolean")
+    if "fields" in data:
+        _check(isinstance(data["fields"], list) and all(isinstance(f, str) for f in data["fields"]),
+               "fields must be a list of strings")
+
+    return SearchRequest.model_construct(**{**_REQUEST_DEFAULTS, **data})
+
+
+def encode_request(payload: Dict[str, Any]) -> bytes:
+    # Client side: same dict as the JSON body → positional array
+    values = [payload.get(name) for name in REQUEST_FIELDS]
+    while len(values) > 2 and values[-1] is None:
+        values.pop()
+    return _get_msgpack().packb(values, use_bin_type=True)
+
+
+def _to_table(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # Column names once per response, rows as arrays; _id as 12 raw bytes
+    columns = list(dict.fromkeys(name for row in rows for name in row))
+    table = []
+    for row in rows:
+        values = [row.get(name) for name in columns]
+        if "_id" in row:
+            _id = row["_id"]
+            values[columns.index("_id")] = bytes.fromhex(_id) if isinstance(_id, str) and len(_id) == 24 else _id
+        table.append(values)
+    return {"columns": columns, "rows": table}
+
+
+def _from_table(table: Dict[str, Any]) -> List[Dict[str, Any]]:
+    columns = table["columns"]
+    rows = []
+    for values in table["rows"]:
+        row = dict(zip(columns, values))
+        if isinstance(row.get("_id"), bytes):
+            row["_id"] = row["_id"].hex()
+        rows.append(row)
+    return rows
+
+
+@process_safe
+def encode_msgpack_response(response_data: Dict[str, Any]) -> bytes:
+    body = dict(response_data)
+    for key in RESULT_KEYS:
+        body[key] = _to_table(response_data[key])
+    return _get_msgpack().packb(body, use_bin_type=True, default=str)
+
+
+def decode_response(body: bytes) -> Dict[str, Any]:
+    """
+    Client side: binary body → the same dict the JSON endpoint returns.
+    """
+    data = _get_msgpack().unpackb(body, raw=False)
+    for key in RESULT_KEYS:
+        if isinstance(data.get(key), dict):
+            data[key] = _from_table(data[key])
+    return data
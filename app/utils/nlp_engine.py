@@ -1,13 +1,19 @@
 import os
+import asyncio
 from app.utils.extractor import extract_hard_filters
 from app.utils.llm import enrich_with_llm  # your existing LLM utility
+from app.utils.llm_batcher import enrich_with_llm_batched, is_llm_batching_enabled
+from app.utils.admission import get_stage_limiter, is_admission_control_enabled
+from app.utils.capture import note, stage_timer
+from app.utils.deadline import LLM_MIN_BUDGET_MS, llm_timeout_s
+from app.utils.metrics import incr
 
 
 def is_llm_enabled() -> bool:
     return os.getenv("ENABLE_LLM", "false").lower() == "true"
 
 
-async def run_nlp_engine(query: str, flag: str) -> dict:
+async def run_nlp_engine(query: str, flag: str, skip_llm: bool = False) -> dict:
 
     if not query:
         return {
@@ -52,12 +58,31 @@ async def run_nlp_engine(query: str, flag: str) -> dict:
     }
     # print("Structured Query after HARD filter extraction:", structured_query)
     # LLM ENRICHMENT (NOW GEO CAN BE ADDED)
-    if is_llm_enabled():
+    # Admission control: bounded in-flight LLM calls, degrade instead of queueing
+    llm_limiter = get_stage_limiter("llm") if is_admission_control_enabled() else None
+    # Request deadline: the LLM gets what is left minus the retrieval reserve
+    llm_timeout = llm_timeout_s()
+
+    if is_llm_enabled() and skip_llm:
+        print("LLM SKIPPED (overload degradation) → Using HARD FILTER EXTRACTION ONLY")
+    elif is_llm_enabled() and llm_timeout is not None and llm_timeout * 1000 < LLM_MIN_BUDGET_MS:
+        print("LLM SKIPPED (request deadline) → Using HARD FILTER EXTRACTION ONLY")
+        incr("cancelled.deadline")
+        incr("cancelled.deadline.llm_skipped")
+        structured_query["llm_skipped"] = True
+    elif is_llm_enabled() and llm_limiter is not None and not await llm_limiter.try_acquire():
+        print("LLM SATURATED → Using HARD FILTER EXTRACTION ONLY")
+        structured_query["llm_skipped"] = True
+    elif is_llm_enabled():
         try:
-            enriched_data = await enrich_with_llm(
-                query=query,
-                extracted_filters=structured_query
-            )
+            # Optional micro-batching: concurrent queries share one LLM call
+            enrich = enrich_with_llm_batched if is_llm_batching_enabled() else enrich_with_llm
+            with stage_timer("llm"):
+                enriched_data = await asyncio.wait_for(
+                    enrich(query=query, extracted_filters=structured_query),
+                    timeout=llm_timeout,
+                )
+            note("llm_enrichment", enriched_data)
             # print(f" LLM Enrichment Output: {enriched_data}")
             if enriched_data:
                 # Safe merge: LLM enriches, but DOES NOT override hard filters
@@ -68,8 +93,18 @@ async def run_nlp_engine(query: str, flag: str) -> dict:
                     structured_query[key] = value
 
 
+        except asyncio.TimeoutError:
+            # Call cancelled at the deadline; the hard filters still answer
+            print("LLM TIMED OUT (request deadline) → Continuing with HARD FILTER ONLY")
+            incr("cancelled.deadline")
+            incr("cancelled.deadline.llm")
+            # Degraded (tier >= 1): not cached as the full answer
+            structured_query["llm_skipped"] = True
         except Exception as e:
             print("LLM FAILED → Continuing with HARD FILTER ONLY:", str(e))
+        finally:
+            if llm_limiter is not None:
+                llm_limiter.release()
     else:
         print("LLM DISABLED → Using HARD FILTER EXTRACTION ONLY")
    
@@ -0,0 +1,128 @@
+import os
+import time
+import asyncio
+import importlib
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+
+from app.utils.metrics import incr, observe
+from app.utils.profiling import active_profile
+
+
+# none | thread | process
+OFFLOAD_EXECUTOR = os.getenv("OFFLOAD_EXECUTOR", "thread").lower()
+OFFLOAD_WORKERS = int(os.getenv("OFFLOAD_WORKERS", str(min(8, (os.cpu_count() or 1) + 2))))
+
+# Size thresholds (number of result dicts, bytes for compress): smaller
+# work stays inline, a pool hop costs more than ranking a few dozen items
+OFFLOAD_THRESHOLDS: Dict[str, int] = {
+    "rank": int(os.getenv("OFFLOAD_RANK_MIN_ITEMS", "500")),
+    "serialize": int(os.getenv("OFFLOAD_SERIALIZE_MIN_ITEMS", "200")),
+    "compress": int(os.getenv("OFFLOAD_COMPRESS_MIN_BYTES", "65536")),
+}
+
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+_optional_modules: Dict[str, Any] = {}
+
+
+def process_safe(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Marks a module-level function that only reads its arguments (and
+    imports what it needs lazily), so run_cpu_stage may send it to the
+    process pool. Ranking reads the in-process BM25 indexes: not marked.
+    """
+    fn.process_safe = True
+    return fn
+
+
+def spawn_pool(max_workers: int, **kwargs: Any) -> ProcessPoolExecutor:
+    # spawn: forking a process that already runs pymongo threads is unsafe
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"), **kwargs)
+
+
+def optional_import(name: str) -> Any:
+    """
+    Optional dependency module, or None when it isn't installed. Imported
+    on first use (also inside pool workers) and cached.
+    """
+    if name not in _optional_modules:
+        try:
+            _optional_modules[name] = importlib.import_module(name)
+        except ImportError:
+            _optional_modules[name] = None
+    return _optional_modules[name]
+
+
+def _get_executor(fn: Callable[..., Any]) -> Optional[Executor]:
+    global _thread_pool, _process_pool
+
+    if OFFLOAD_EXECUTOR == "none":
+        return None
+
+    if OFFLOAD_EXECUTOR == "process" and getattr(fn, "process_safe", False):
+        if _process_pool is None:
+            _process_pool = spawn_pool(OFFLOAD_WORKERS)
+        return _process_pool
+
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(max_workers=OFFLOAD_WORKERS, thread_name_prefix="offload")
+    return _thread_pool
+
+
+async def run_cpu_stage(stage: str, size: int, fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a CPU-heavy stage inline or on a worker pool.
+
+    Threads don't add CPU parallelism (GIL) but the interpreter switches
+    every few ms, so other coroutines keep running while a large ranking
+    or encode is in progress. Processes give real parallelism for
+    picklable, index-free stages.
+    """
+    start = time.perf_counter()
+    executor = None
+    if size >= OFFLOAD_THRESHOLDS.get(stage, 0):
+        executor = _get_executor(fn)
+
+    if executor is None:
+        incr(f"offload.{stage}.inline")
+        result = fn(*args)
+    else:
+        incr(f"offload.{stage}.offloaded")
+        profile = active_profile()
+        if profile is not None and isinstance(executor, ThreadPoolExecutor):
+            fn = profile.wrap(fn)
+        result = await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+    observe(f"offload.{stage}.ms", (time.perf_counter() - start) * 1000)
+    return result
+
+
+async def run_blocking(fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Blocking I/O (pymongo queries + document hydration) always leaves
+    the event loop unless offloading is switched off.
+    """
+    if OFFLOAD_EXECUTOR == "none":
+        return fn(*args)
+    profile = active_profile()
+    if profile is not None:
+        fn = profile.wrap(fn)
+    return await asyncio.to_thread(fn, *args)
+
+
+@process_safe
+def encode_response(response_data: Dict[str, Any]) -> bytes:
+    return JSONResponse(content=jsonable_encoder(response_data)).body
+
+
+def shutdown_offload_pools() -> None:
+    global _thread_pool, _process_pool
+    for pool in (_thread_pool, _process_pool):
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    _thread_pool = _process_pool = None
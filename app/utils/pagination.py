@@ -1,10 +1,11 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 
 def paginate_results(
     results: List[Dict[str, Any]],
     page: int = 1,
-    limit: int = 10
+    limit: int = 10,
+    total_results: Optional[int] = None
 ) -> Dict[str, Any]:
     """
     Pagination applied AFTER ranking (final layer).
@@ -17,6 +18,8 @@ def paginate_results(
         results: Ranked list of results
         page: Page number (1-based)
         limit: Items per page
+        total_results: Total when results holds only the top of the
+            list (sharded search); defaults to len(results)
 
     Returns:
         {
@@ -42,7 +45,8 @@ def paginate_results(
     if limit > 50:  # hard cap to prevent abuse
         limit = 50
 
-    total_results = len(results)
+    if total_results is None:
+        total_results = len(results)
 
     # If no results
     if total_results == 0:
@@ -0,0 +1,287 @@
+import os
+import sys
+import hmac
+import json
+import time
+import uuid
+import random
+import asyncio
+import threading
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.utils.metrics import incr
+
+
+# Admin-only trigger: "X-Profile: <PROFILE_ADMIN_TOKEN>" (disabled when unset)
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "1"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+# Optional: also write <id>.speedscope.json here
+PROFILE_DIR = os.getenv("PROFILE_DIR", "")
+
+Frame = Tuple[str, str, int]  # (function, file, first line)
+
+_active: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+_store: "OrderedDict[str, RequestProfile]" = OrderedDict()
+_store_lock = threading.Lock()
+
+
+def _frame_key(frame) -> Frame:
+    code = frame.f_code
+    return (code.co_name, code.co_filename, code.co_firstlineno)
+
+
+def _thread_stack(frame) -> List[Frame]:
+    # Innermost → outermost walk, returned outermost first
+    stack = []
+    while frame is not None:
+        stack.append(_frame_key(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _await_chain(coro) -> Tuple[List[Frame], Any]:
+    """
+    Frames of a suspended coroutine chain (outermost first) and the
+    object at the bottom of the chain (usually a Future).
+    """
+    stack = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        stack.append(_frame_key(frame))
+        nxt = getattr(coro, "cr_await", None)
+        if nxt is None:
+            nxt = getattr(coro, "gi_yieldfrom", None)
+        if nxt is None:
+            break
+        coro = nxt
+    return stack, coro
+
+
+class RequestProfile:
+    """
+    Wall-clock stack sampler scoped to one request.
+
+    A sampler thread wakes every PROFILE_INTERVAL_MS and records:
+    - the event-loop thread's stack when the request's task is running
+      (trimmed to the task's own coroutine frames)
+    - otherwise the task's await chain, continued into the worker thread
+      running offloaded work for it (DB fetch, ranking), or ending in an
+      "[await ...]" leaf for network / timer waits
+    Other requests interleaved on the loop are not attributed.
+    """
+
+    def __init__(self, label: str, trigger: str):
+        self.id = uuid.uuid4().hex[:16]
+        self.label = label
+        self.trigger = trigger
+        self.created = time.time()
+        self.duration_ms = 0.0
+        self.samples: List[Tuple[Tuple[Frame, ...], float]] = []
+        self.workers: Dict[int, str] = {}  # thread ident → wrapper name to trim at
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start = 0.0
+        self._root: Optional[Frame] = None
+
+    def start(self, root_frame=None) -> None:
+        # root_frame: the endpoint's frame; stacks are trimmed to start there
+        self._root = _frame_key(root_frame) if root_frame is not None else None
+        self._task = asyncio.current_task()
+        self._loop = asyncio.get_running_loop()
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name=f"profile-{self.id}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+
+    def wrap(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+        # Marks the executing worker thread as working for this request
+        def profiled_call(*args: Any, **kwargs: Any) -> Any:
+            ident = threading.get_ident()
+            self.workers[ident] = profiled_call.__name__
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.workers.pop(ident, None)
+        return profiled_call
+
+    def _run(self) -> None:
+        interval = PROFILE_INTERVAL_MS / 1000
+        last = time.perf_counter()
+        while not self._stop.wait(interval):
+            now = time.perf_counter()
+            try:
+                stack = self._sample()
+            except Exception:
+                stack = None
+            if stack:
+                self.samples.append((stack, (now - last) * 1000))
+            last = now
+
+    def _sample(self) -> Optional[Tuple[Frame, ...]]:
+        task = self._task
+        if task is None or task.done():
+            return None
+
+        frames = sys._current_frames()
+        coro = task.get_coro()
+
+        if asyncio.current_task(self._loop) is task:
+            # Running on the loop: the real stack of the loop thread
+            return self._trim(_thread_stack(frames.get(self._loop_thread)))
+
+        stack, bottom = _await_chain(coro)
+        for ident, wrapper in list(self.workers.items()):
+            frame = frames.get(ident)
+            if frame is not None:
+                worker = _thread_stack(frame)
+                names = [f[0] for f in worker]
+                if wrapper in names:
+                    worker = worker[names.index(wrapper) + 1:]
+                return self._trim(stack + [("[thread]", "", 0)] + worker)
+
+        waiting_on = type(bottom).__name__.replace("FutureIter", "Future") if bottom is not None else ""
+        leaf = f"[await {waiting_on}]".replace(" ]", "]")
+        return self._trim(stack + [(leaf, "", 0)])
+
+    def _trim(self, stack: List[Frame]) -> Tuple[Frame, ...]:
+        # Drop server / event-loop frames above the endpoint
+        if self._root is not None and self._root in stack:
+            stack = stack[stack.index(self._root):]
+        return tuple(stack)
+
+    # EXPORT
+
+    def collapsed(self) -> str:
+        # Brendan Gregg collapsed stacks, weights in microseconds
+        totals: Counter = Counter()
+        for stack, weight in self.samples:
+            totals[";".join(_label(f) for f in stack)] += weight
+        return "\n".join(f"{stack} {round(weight * 1000)}" for stack, weight in totals.most_common()) + "\n"
+
+    def speedscope(self) -> Dict[str, Any]:
+        index: Dict[Frame, int] = {}
+        frames = []
+        samples = []
+        weights = []
+        for stack, weight in self.samples:
+            ids = []
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    entry = {"name": frame[0]}
+                    if frame[1]:
+                        entry.update(file=frame[1], line=frame[2])
+                    frames.append(entry)
+                ids.append(index[frame])
+            samples.append(ids)
+            weights.append(round(weight, 3))
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": self.label,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 3),
+                "samples": samples,
+                "weights": weights,
+            }],
+            "name": f"search {self.id}",
+            "exporter": "wedplanners-search",
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "label": self.label,
+            "trigger": self.trigger,
+            "created": self.created,
+            "duration_ms": round(self.duration_ms, 2),
+            "samples": len(self.samples),
+        }
+
+
+def _label(frame: Frame) -> str:
+    name, filename, line = frame
+    if not filename:
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def is_admin_token(value: Optional[str]) -> bool:
+    # Constant-time comparison: no timing hint about the token's prefix
+    if not PROFILE_ADMIN_TOKEN or value is None:
+        return False
+    return hmac.compare_digest(value.encode(), PROFILE_ADMIN_TOKEN.encode())
+
+
+def start_profile(header_value: Optional[str], label: str) -> Optional[RequestProfile]:
+    """
+    Starts a profile when the admin header matches or the request is
+    sampled. The common path is one comparison and one random().
+    """
+    if header_value is not None and is_admin_token(header_value):
+        trigger = "header"
+    elif PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        trigger = "sample"
+    else:
+        return None
+
+    profile = RequestProfile(label, trigger)
+    profile.start(root_frame=sys._getframe(1))
+    _active.set(profile)
+    incr(f"profile.started.{trigger}")
+    return profile
+
+
+def _store_profile(profile: RequestProfile) -> None:
+    # Blocking part: sampler thread join + optional speedscope file
+    profile.stop()
+
+    with _store_lock:
+        _store[profile.id] = profile
+        while len(_store) > PROFILE_KEEP:
+            _store.popitem(last=False)
+
+    if PROFILE_DIR:
+        try:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            with open(os.path.join(PROFILE_DIR, f"{profile.id}.speedscope.json"), "w") as f:
+                json.dump(profile.speedscope(), f)
+        except Exception as e:
+            print("PROFILE WRITE FAILED:", str(e))
+
+
+async def finish_profile(profile: RequestProfile) -> None:
+    _active.set(None)
+    await asyncio.to_thread(_store_profile, profile)
+
+
+def active_profile() -> Optional[RequestProfile]:
+    return _active.get()
+
+
+def get_profile(profile_id: str) -> Optional[RequestProfile]:
+    return _store.get(profile_id)
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    with _store_lock:
+        return [profile.summary() for profile in reversed(_store.values())]
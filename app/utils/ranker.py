@@ -1,5 +1,14 @@
 
+import os
 from typing import List, Dict, Any
+
+from app.utils.bm25 import bm25_scores, is_bm25_enabled, query_terms
+
+
+# Max points BM25 text relevance can add on top of compute_score
+BM25_WEIGHT = float(os.getenv("BM25_WEIGHT", "30"))
+
+
 def apply_strict_filter(
     results: List[Dict[str, Any]],
     threshold_ratio
@@ -130,6 +139,77 @@ def compute_score(
     return score
 
 
+def max_score_components(
+    structured_query: Dict[str, Any],
+    kind: str
+) -> Dict[str, int]:
+    """
+    Best case points per signal that compute_score can award for this query.
+    Used as an upper bound for documents not fetched yet.
+    Venue city/state ObjectIds are resolved to names before ranking.
+    """
+    components = {}
+
+    if structured_query.get("entity_name"):
+        components["entity_name"] = 100
+    if structured_query.get("pincode"):
+        components["pincode"] = 100
+    if structured_query.get("locality"):
+        components["locality"] = 50
+    if structured_query.get("city"):
+        components["city"] = 50
+    if structured_query.get("state"):
+        components["state"] = 50
+    if kind == "vendor":
+        if structured_query.get("min_experience") is not None:
+            components["min_experience"] = 10
+        if structured_query.get("working_since") is not None:
+            components["working_since"] = 10
+    elif structured_query.get("budget_max") is not None:
+        components["budget_max"] = 10
+
+    tags = structured_query.get("semantic_tags") or []
+    if tags:
+        components["semantic_tags"] = 28 * len(tags)
+
+    return components
+
+
+def rank_key(item: Dict[str, Any]) -> tuple:
+    """
+    Sort key (descending): score, then recency, then _id.
+    Recency follows the retrieval order (vendors lastActive, venues
+    createdAt) so progressively fetched pools and merged shard results
+    order ties the same way.
+    """
+    recency = item.get("lastActive") if "vendorName" in item else item.get("createdAt")
+    return (item.get("_score", 0), recency or "", str(item.get("_id") or ""))
+
+
+def text_relevance_bonus(
+    kind: str,
+    structured_query: Dict[str, Any],
+    ids: List[Any]
+) -> Dict[Any, int]:
+    """
+    BM25 points per _id, normalized against the best text match among ids.
+    Empty when BM25 is disabled or no index is loaded.
+    """
+    if not is_bm25_enabled():
+        return {}
+
+    text_scores = bm25_scores(kind, query_terms(structured_query), ids)
+    top_text_score = max(text_scores.values(), default=0.0)
+    if top_text_score <= 0:
+        return {}
+
+    return {
+        _id: round(BM25_WEIGHT * text_score / top_text_score)
+        for _id, text_score in text_scores.items()
+        if text_score > 0
+    }
+
+
 def rank_results(
     results: List[Dict[str, Any]],
     structured_query: Dict[str, Any]
@@ -138,6 +218,7 @@ def rank_results(
     FINAL SOFT RANKING LAYER
     - Uses LLM enriched structured_query
     - Ranker does NOT perform NLP
+    - BM25 text relevance (if index loaded) is blended into _score
     """
 
     if not results:
@@ -146,19 +227,16 @@ def rank_results(
     # raw_query = structured_query.get("raw_query", "")
     # tokens = tokenize_query(raw_query)
 
+    # BM25 TEXT RELEVANCE (title/description, vendorName/locality)
+    kind = "vendor" if "vendorName" in results[0] else "venue"
+    text_bonus = text_relevance_bonus(kind, structured_query, [item.get("_id") for item in results])
+
     for item in results:
         # score = compute_score(item, tokens, structured_query)
         score = compute_score(item, structured_query)
+        score += text_bonus.get(item.get("_id"), 0)
+
         item["_score"] = score  
 
     # Sort by relevance score + recency fallback
-    ranked = sorted(
-        results,
-        key=lambda x: (
-            x.get("_score", 0),
-            x.get("lastActive", "")
-        ),
-        reverse=True
-    )
-
-    return ranked
\ No newline at end of file
+    return sorted(results, key=rank_key, reverse=True)
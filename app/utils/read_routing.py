@@ -0,0 +1,190 @@
+import os
+import time
+import threading
+from typing import Any, Dict, Optional
+
+from mongoengine import connect, get_db
+from pymongo.monitoring import ConnectionPoolListener
+
+from app.utils.data_version import data_version_age
+from app.utils.metrics import incr, observe, set_gauge
+
+
+# Query-time search reads (Vendor / VenuePackage retrieval) use this alias
+SEARCH_DB_ALIAS = os.getenv("SEARCH_DB_ALIAS", "search")
+# Defaults to MONGODB_URI: same replica set, separate pool + read preference
+SEARCH_MONGODB_URI = os.getenv("SEARCH_MONGODB_URI") or os.getenv("MONGODB_URI")
+SEARCH_READ_PREFERENCE = os.getenv("SEARCH_READ_PREFERENCE", "secondaryPreferred")
+# Secondaries lagging more than this are not read from (Mongo minimum 90, -1 = no limit).
+# Also how long after a data version change responses are not cached.
+SEARCH_MAX_STALENESS_SECONDS = int(os.getenv("SEARCH_MAX_STALENESS_SECONDS", "120"))
+SEARCH_MAX_POOL_SIZE = int(os.getenv("SEARCH_MAX_POOL_SIZE", "50"))
+SEARCH_MIN_POOL_SIZE = int(os.getenv("SEARCH_MIN_POOL_SIZE", "5"))
+# A request waiting longer than this for a connection fails instead of queueing
+SEARCH_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("SEARCH_WAIT_QUEUE_TIMEOUT_MS", "2000"))
+
+# pymongo's staleness estimate can be one heartbeat (10 s default) behind
+STALENESS_HEARTBEAT_SECONDS = 10
+
+WAIT_BUCKETS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+
+_search_alias_connected = False
+_search_collections: Dict[Any, Any] = {}  # model → pymongo collection on SEARCH_DB_ALIAS
+
+
+def is_search_read_routing_enabled() -> bool:
+    return os.getenv("ENABLE_SEARCH_READ_ROUTING", "false").lower() == "true"
+
+
+class PoolMetrics(ConnectionPoolListener):
+    """
+    Checkout wait time and pool occupancy for one connection alias.
+    pymongo publishes check-out events on the thread that asks for the
+    connection, so started → checked_out is that request's wait.
+    Checkouts are also counted per server (host:port), which shows where
+    reads actually went (primary vs secondaries).
+    """
+
+    def __init__(self, alias: str):
+        self.alias = alias
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.open = 0
+
+    def _gauges(self) -> None:
+        set_gauge(f"mongo.pool.{self.alias}.in_use", self.in_use)
+        set_gauge(f"mongo.pool.{self.alias}.open", self.open)
+
+    def _waited(self) -> None:
+        start = getattr(self._local, "start", None)
+        if start is not None:
+            self._local.start = None
+            observe(f"mongo.pool.{self.alias}.wait_ms", (time.perf_counter() - start) * 1000, buckets=WAIT_BUCKETS)
+
+    def connection_check_out_started(self, event) -> None:
+        self._local.start = time.perf_counter()
+
+    def connection_checked_out(self, event) -> None:
+        self._waited()
+        host, port = event.address
+        incr(f"mongo.pool.{self.alias}.checkouts")
+        incr(f"mongo.pool.{self.alias}.checkouts.{host}:{port}")
+        with self._lock:
+            self.in_use += 1
+            self._gauges()
+
+    def connection_check_out_failed(self, event) -> None:
+        # reason: timeout (pool exhausted) | connectionError | poolClosed
+        self._waited()
+        incr(f"mongo.pool.{self.alias}.checkout_failed.{event.reason}")
+
+    def connection_checked_in(self, event) -> None:
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+            self._gauges()
+
+    def connection_created(self, event) -> None:
+        with self._lock:
+            self.open += 1
+            self._gauges()
+
+    def connection_closed(self, event) -> None:
+        with self._lock:
+            self.open = max(0, self.open - 1)
+            self._gauges()
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        incr(f"mongo.pool.{self.alias}.cleared")
+
+    def pool_closed(self, event) -> None:
+        pass
+
+
+def search_client_options() -> Dict[str, Any]:
+    options = {
+        "readPreference": SEARCH_READ_PREFERENCE,
+        "maxPoolSize": SEARCH_MAX_POOL_SIZE,
+        "minPoolSize": SEARCH_MIN_POOL_SIZE,
+        "waitQueueTimeoutMS": SEARCH_WAIT_QUEUE_TIMEOUT_MS,
+    }
+    # maxStalenessSeconds is rejected together with readPreference=primary
+    if SEARCH_READ_PREFERENCE != "primary" and SEARCH_MAX_STALENESS_SECONDS > 0:
+        options["maxStalenessSeconds"] = SEARCH_MAX_STALENESS_SECONDS
+    return options
+
+
+def connect_search_pool(db: str, host: str = None, **overrides: Any) -> str:
+    """
+    Registers SEARCH_DB_ALIAS (own MongoClient → own pool, read
+    preference, max staleness). Called after the default connect(), in
+    the API process and in each shard worker.
+    """
+    global _search_alias_connected
+    if not is_search_read_routing_enabled():
+        return "disabled"
+    options = {**search_client_options(), **overrides}
+    connect(
+        db=db,
+        host=host or SEARCH_MONGODB_URI,
+        alias=SEARCH_DB_ALIAS,
+        event_listeners=[PoolMetrics(SEARCH_DB_ALIAS)],
+        **options,
+    )
+    _search_alias_connected = True
+    return f"alias={SEARCH_DB_ALIAS} readPreference={options['readPreference']} maxPoolSize={options['maxPoolSize']}"
+
+
+def warm_search_pool() -> str:
+    # Warm-up step: server selection with the search read preference
+    if not _search_alias_connected:
+        return "disabled"
+    db = get_db(SEARCH_DB_ALIAS)
+    db.command("ping", read_preference=db.client.read_preference)
+    return f"ping ok ({SEARCH_READ_PREFERENCE})"
+
+
+def search_reads_settle_in() -> Optional[float]:
+    """
+    Seconds until secondary search reads are known to include the current
+    data version: maxStaleness (+ one heartbeat) after it changed. 0 when
+    reads go to the primary, None when there is no staleness limit.
+    """
+    if not _search_alias_connected or SEARCH_READ_PREFERENCE == "primary":
+        return 0.0
+    if SEARCH_MAX_STALENESS_SECONDS <= 0:
+        return None
+    return max(0.0, SEARCH_MAX_STALENESS_SECONDS + STALENESS_HEARTBEAT_SECONDS - data_version_age())
+
+
+def search_reads_settled() -> bool:
+    # Responses computed before this are served but not cached under the version
+    return search_reads_settle_in() == 0
+
+
+def search_objects(model):
+    """
+    Queryset for query-time search reads: the search alias once it is
+    connected, else the default connection. Index builds and data-version
+    polling stay on the default connection (they must see the primary's
+    latest writes to match the version they are tagged with).
+
+    Not QuerySet.using(): that swaps the alias on the Document class
+    (switch_db) and would race with reads on other threads.
+    """
+    if not _search_alias_connected:
+        return model.objects
+    collection = _search_collections.get(model)
+    if collection is None:
+        collection = get_db(SEARCH_DB_ALIAS)[model._get_collection_name()]
+        _search_collections[model] = collection
+    return type(model.objects)(model, collection)
@@ -0,0 +1,217 @@
+import os
+import time
+import asyncio
+import re
+import hashlib
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from app.utils.data_version import get_data_version
+from app.utils.deadline import DeadlineExceeded
+from app.utils.metrics import get_counter, incr, set_gauge
+from app.utils.read_routing import search_reads_settled
+
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1000"))
+
+_ENCODING_SUFFIX = re.compile(r'-(?:gzip|br)"$')
+
+
+def is_response_cache_enabled() -> bool:
+    return os.getenv("ENABLE_RESPONSE_CACHE", "true").lower() == "true"
+
+
+def normalize_query(query: str) -> str:
+    return " ".join((query or "").lower().split())
+
+
+def cache_key(payload) -> Tuple:
+    """
+    Normalized SearchRequest → cache key.
+    Whitespace/case differences in the query share one entry.
+    """
+    return (
+        normalize_query(payload.query),
+        (payload.flag or "").lower(),
+        payload.page,
+        payload.limit,
+        round(float(payload.threshold_ratio or 0), 4),
+        bool(payload.facets),
+        tuple(sorted(set(payload.fields))) if payload.fields else None,
+        payload.include_structured_query is not False,
+    )
+
+
+def _update_hit_ratio() -> None:
+    served = get_counter("response_cache.hits") + get_counter("response_cache.coalesced")
+    total = served + get_counter("response_cache.misses")
+    set_gauge("response_cache.hit_ratio", round(served / total, 4) if total else 0.0)
+    # Share of lookups answered by an entry the cache warmer computed
+    set_gauge("cache_warming.hit_ratio", round(get_counter("cache_warming.hits") / total, 4) if total else 0.0)
+
+
+class CachedResponse:
+    __slots__ = ("body", "etag", "version", "compute_ms", "tier", "warmed", "variants")
+
+    def __init__(self, body: bytes, version: str, compute_ms: float, tier: int = 0, warmed: bool = False):
+        self.body = body
+        self.version = version
+        self.compute_ms = compute_ms
+        self.tier = tier
+        self.warmed = warmed
+        self.variants: Dict[str, bytes] = {}  # Content-Encoding → compressed body, built on first use
+        self.etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+
+class ResponseCache:
+    """
+    LRU of encoded /search responses.
+
+    - Entries are tagged with the catalog data version; a version change
+      invalidates everything (no blind TTL)
+    - clear() is a data version listener registered after the index
+      rebuild; it bumps a generation so computations that started against
+      the old indexes are not stored
+    - nothing is stored while secondary search reads may lag the version
+    - Singleflight: concurrent misses for one key await a single computation
+    """
+
+    def __init__(self, max_size: int = RESPONSE_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries: "OrderedDict[Tuple, CachedResponse]" = OrderedDict()
+        self.inflight: Dict[Tuple, asyncio.Future] = {}
+        self.generation = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None  # loop owning entries/inflight
+
+    def get(self, key: Tuple) -> Optional[CachedResponse]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry.version != get_data_version():
+            self.entries.pop(key, None)
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Tuple, entry: CachedResponse) -> None:
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def _clear(self) -> None:
+        self.generation += 1
+        self.entries.clear()
+
+    def clear(self, *_args) -> None:
+        # Listeners run in a worker thread: mutate only on the owning loop
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            try:
+                on_loop = asyncio.get_running_loop() is loop
+            except RuntimeError:
+                on_loop = False
+            if not on_loop:
+                loop.call_soon_threadsafe(self._clear)
+                return
+        self._clear()
+
+    async def peek(self, key: Tuple) -> Optional[Tuple[CachedResponse, str]]:
+        """
+        Cache-only lookup (no computation): a stored entry or an
+        in-flight computation to join. None when neither exists.
+        """
+        self._loop = asyncio.get_running_loop()
+        entry = self.get(key)
+        if entry is not None:
+            incr("response_cache.hits")
+            if entry.warmed:
+                incr("cache_warming.hits")
+            _update_hit_ratio()
+            incr("response_cache.saved_ms", entry.compute_ms)
+            return entry, "HIT"
+
+        pending = self.inflight.get(key)
+        if pending is not None:
+            try:
+                entry = await asyncio.shield(pending)
+            except (asyncio.CancelledError, DeadlineExceeded):
+                if asyncio.current_task().cancelling():
+                    raise  # this request itself is being cancelled
+                # Leader's client left / its deadline passed: join whoever
+                # took over, else compute ourselves
+                incr("response_cache.leader_aborted")
+                return await self.peek(key)
+            incr("response_cache.coalesced")
+            _update_hit_ratio()
+            incr("response_cache.saved_ms", entry.compute_ms)
+            return entry, "COALESCED"
+
+        return None
+
+    async def get_or_compute(
+        self,
+        key: Tuple,
+        compute: Callable[[], Awaitable[Tuple[bytes, int]]],
+        warmed: bool = False,
+    ) -> Tuple[CachedResponse, str]:
+        """
+        Returns (entry, status) where status is HIT | COALESCED | MISS.
+        compute() returns (body, degradation_tier); degraded bodies are
+        shared with concurrent waiters but never stored.
+        warmed: computed by the cache warmer, not a user request.
+        """
+        found = await self.peek(key)
+        if found is not None:
+            return found
+
+        incr("response_cache.misses")
+        _update_hit_ratio()
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        version = get_data_version()
+        generation = self.generation
+        # Secondary reads may lag the version for a while after it changed
+        settled = search_reads_settled()
+        start = time.perf_counter()
+        try:
+            body, tier = await compute()
+            entry = CachedResponse(body, version, (time.perf_counter() - start) * 1000, tier, warmed)
+            # Don't store results computed against a version (or indexes) that changed meanwhile
+            if tier == 0 and version == get_data_version() and generation == self.generation:
+                if settled:
+                    self.put(key, entry)
+                else:
+                    incr("response_cache.skipped.stale_reads")
+            future.set_result(entry)
+            return entry, "MISS"
+        except BaseException as e:
+            future.set_exception(e)
+            # Avoid "exception was never retrieved" when nobody was waiting
+            future.exception()
+            raise
+        finally:
+            if self.inflight.get(key) is future:
+                del self.inflight[key]
+
+
+_CACHE = ResponseCache()
+
+
+def get_response_cache() -> ResponseCache:
+    return _CACHE
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Compressed representations carry the encoding as an ETag suffix
+    candidates = [_ENCODING_SUFFIX.sub('"', tag.strip().removeprefix("W/")) for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+def encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    return etag if encoding is None else f'{etag[:-1]}-{encoding}"'
+
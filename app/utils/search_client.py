@@ -0,0 +1,93 @@
+import json
+import threading
+import http.client
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from app.utils.msgpack_codec import MSGPACK_MEDIA_TYPE, decode_response, encode_request
+
+
+class SearchClientError(Exception):
+    def __init__(self, status: int, detail: Any):
+        super().__init__(f"search failed ({status}): {detail}")
+        self.status = status
+        self.detail = detail
+
+
+class SearchClient:
+    """
+    Small blocking client for service-to-service search.
+
+        client = SearchClient("http://search:8050")
+        body = client.search("photographers in delhi", flag="vendor", limit=20)
+
+    binary=True → /api/v1/internal/search (msgpack), else /api/v1/search
+    (JSON). Either way the returned dict has the JSON endpoint's shape.
+    One keep-alive connection per thread, reopened once if the server
+    closed it and dropped after any other error; bodies are sent
+    uncompressed (same network, no CPU spent).
+    """
+
+    def __init__(self, base_url: str, binary: bool = True, timeout: float = 30.0, deadline_ms: Optional[float] = None):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or "http"
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port
+        self.prefix = parts.path.rstrip("/")
+        self.binary = binary
+        self.timeout = timeout
+        self.deadline_ms = deadline_ms  # sent as X-Request-Timeout-Ms
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            conn = cls(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _post(self, path: str, body: bytes, content_type: str) -> Tuple[int, str, bytes]:
+        headers = {"Content-Type": content_type, "Accept-Encoding": "identity"}
+        if self.deadline_ms is not None:
+            headers["X-Request-Timeout-Ms"] = str(int(self.deadline_ms))
+
+        for attempt in (1, 2):
+            conn = self._connection()
+            try:
+                conn.request("POST", self.prefix + path, body=body, headers=headers)
+                response = conn.getresponse()
+                return response.status, response.getheader("Content-Type", ""), response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # Idle keep-alive connection closed by the server: retry on a new one
+                self.close()
+                if attempt == 2:
+                    raise
+            except BaseException:
+                # Timeout / interrupted read: the connection state is unknown, don't reuse it
+                self.close()
+                raise
+
+    def search(self, query: str, flag: str = "all", **options: Any) -> Dict[str, Any]:
+        payload = {"query": query, "flag": flag, **options}
+        if self.binary:
+            status, content_type, body = self._post("/api/v1/internal/search", encode_request(payload), MSGPACK_MEDIA_TYPE)
+        else:
+            status, content_type, body = self._post("/api/v1/search", json.dumps(payload).encode(), "application/json")
+
+        # Errors are always JSON ({"detail": ...})
+        if status != 200:
+            try:
+                detail = json.loads(body).get("detail")
+            except ValueError:
+                detail = body[:200]
+            raise SearchClientError(status, detail)
+        if content_type.startswith(MSGPACK_MEDIA_TYPE):
+            return decode_response(body)
+        return json.loads(body)
@@ -0,0 +1,314 @@
+import os
+import math
+import time
+import asyncio
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from mongoengine import connect
+from pymongo.errors import ExecutionTimeout
+
+from app.models.vendor_model import Vendor
+from app.models.venue_model import VenuePackage
+from app.utils.data_version import get_data_version
+from app.utils.deadline import check_deadline, deadline_exceeded, end_deadline, remaining_ms, start_deadline
+from app.utils.geo_resolver import ensure_geo_names_fresh
+from app.utils.hard_filter import (
+    CANDIDATE_MAX_DEPTH,
+    DEPTH_BUCKETS,
+    _ORDER_FIELDS,
+    _vendor_to_dict,
+    _venue_to_dict,
+    fetch_page,
+    keyset_after,
+    text_margin,
+    vendor_retrieval,
+    venue_retrieval,
+)
+from app.utils.metrics import incr, observe
+from app.utils.offload import run_blocking, spawn_pool
+from app.utils.read_routing import connect_search_pool
+from app.utils.ranker import compute_score, text_relevance_bonus
+
+
+SEARCH_SHARDS = int(os.getenv("SEARCH_SHARDS", str(os.cpu_count() or 1)))
+# id: balanced _id ranges | state: crc32(state) % shards
+SHARD_BY = os.getenv("SHARD_BY", "id").lower()
+
+_RETRIEVAL = {
+    "vendor": (Vendor, vendor_retrieval, _vendor_to_dict, "state"),
+    "venue": (VenuePackage, venue_retrieval, _venue_to_dict, "location.state"),
+}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_partitions: Dict[str, Tuple[str, List[Dict[str, Any]]]] = {}
+
+
+def is_sharded_search_enabled() -> bool:
+    return os.getenv("ENABLE_SHARDED_SEARCH", "false").lower() == "true"
+
+
+# WORKER SIDE
+
+def _init_worker(db: str, host: str) -> None:
+    # Spawned process: own Mongo client, no state inherited from the API
+    connect(db=db, host=host)
+    connect_search_pool(db)
+
+
+def run_shard(
+    kind: str,
+    structured_query: Dict[str, Any],
+    partition: Dict[str, Any],
+    budget: int,
+    threshold_ratio: Optional[float],
+    margin: int,
+    cursor: Optional[Tuple[int, Dict[str, Any]]] = None,
+    best: Optional[int] = None,
+    deadline_ms: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Hard filter + compute_score over one partition, in retrieval order.
+
+    Reads at most budget docs, skipping tiers that can't reach the
+    strict-filter threshold of the best local score (the global best is
+    at least as high). Returns (tier, order value, _id, base score) rows,
+    the local best and a cursor to continue from (None when done).
+    deadline_ms: what is left of the request budget (maxTimeMS + checks).
+    """
+    token = start_deadline(str(deadline_ms)) if deadline_ms is not None else None
+    try:
+        return _read_shard(kind, structured_query, partition, budget, threshold_ratio or 0, margin, cursor, best)
+    except ExecutionTimeout:
+        raise deadline_exceeded(f"mongo.{kind}")
+    finally:
+        end_deadline(token)
+
+
+def _read_shard(kind, structured_query, partition, budget, ratio, margin, cursor, best) -> Dict[str, Any]:
+    _, retrieval, to_dict, _ = _RETRIEVAL[kind]
+    if kind == "venue":
+        ensure_geo_names_fresh()
+    # Ranking inputs only: the coordinator fetches the page itself
+    queryset, tiers = retrieval(structured_query, ["_id"])
+    queryset = queryset.filter(**partition)
+    order_field = _ORDER_FIELDS[kind]
+
+    first_tier, after = cursor if cursor is not None else (0, None)
+    rows: List[Tuple[int, Any, str, int]] = []
+    for tier in range(first_tier, len(tiers)):
+        extra_filters, bound = tiers[tier]
+        if best is not None and bound + margin < best * ratio:
+            break
+
+        check_deadline(f"shard.{kind}")
+        tier_queryset = queryset.filter(**extra_filters)
+        if after is not None and tier == first_tier:
+            tier_queryset = tier_queryset.filter(keyset_after(kind, after))
+
+        for doc in tier_queryset.limit(budget - len(rows)):
+            item = to_dict(doc)
+            score = compute_score(item, structured_query)
+            best = score if best is None else max(best, score)
+            rows.append((tier, item.get(order_field), item["_id"], score))
+
+        if len(rows) >= budget:
+            last = rows[-1]
+            return {"rows": rows, "best": best, "cursor": (last[0], {order_field: last[1], "_id": last[2]})}
+
+    return {"rows": rows, "best": best, "cursor": None}
+
+
+# COORDINATOR SIDE
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = spawn_pool(
+            SEARCH_SHARDS,
+            initializer=_init_worker,
+            initargs=(os.getenv("DATABASE_NAME"), os.getenv("MONGODB_URI")),
+        )
+    return _pool
+
+
+def compute_partitions(kind: str, shards: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Disjoint filters that together cover the collection.
+    """
+    shards = shards or SEARCH_SHARDS
+    model, _, _, state_field = _RETRIEVAL[kind]
+
+    if SHARD_BY == "state":
+        groups: List[List[Any]] = [[] for _ in range(shards)]
+        for value in model.objects.distinct(state_field):
+            groups[zlib.crc32(str(value).lower().encode()) % shards].append(value)
+        groups[0].append(None)  # docs without a state
+        key = state_field.replace(".", "__") + "__in"
+        return [{key: values} for values in groups if values]
+
+    # Balanced _id ranges (boundaries from the _id index)
+    total = model.objects.count()
+    bounds = []
+    for i in range(1, shards):
+        doc = model.objects.order_by("id").only("id").skip(i * total // shards).first()
+        if doc is not None and (not bounds or doc.id > bounds[-1]):
+            bounds.append(doc.id)
+
+    partitions = []
+    for i in range(len(bounds) + 1):
+        partition = {}
+        if i > 0:
+            partition["id__gte"] = bounds[i - 1]
+        if i < len(bounds):
+            partition["id__lt"] = bounds[i]
+        partitions.append(partition)
+    return partitions
+
+
+async def get_partitions(kind: str) -> List[Dict[str, Any]]:
+    # Recomputed when the catalog data version changes
+    version = get_data_version()
+    cached = _partitions.get(kind)
+    if cached is None or cached[0] != version:
+        cached = _partitions[kind] = (version, await asyncio.to_thread(compute_partitions, kind))
+    return cached[1]
+
+
+def _retrieval_order(row: Tuple[int, Any, str, int]) -> tuple:
+    # Descending = single-process read order: tier, then order value (missing last), then _id
+    tier, value, _id, _ = row
+    return (-tier, value is not None, value or "", _id)
+
+
+def _settle(
+    rows: List[Tuple[int, Any, str, int]],
+    frontier: Optional[tuple],
+    bounds: List[int],
+    ratio: float,
+    max_depth: int,
+) -> Tuple[List[Tuple[int, Any, str, int]], bool]:
+    """
+    The candidates progressive_fetch would read, replayed over the merged
+    rows: same tier skipping and depth cap. frontier: retrieval order of
+    the earliest last row among shards that have more docs; past it the
+    merged order isn't known yet. Returns (candidates, settled).
+    """
+    rows.sort(key=_retrieval_order, reverse=True)
+    selected: List[Tuple[int, Any, str, int]] = []
+    best, current_tier = None, None
+    for row in rows:
+        if frontier is not None and _retrieval_order(row) < frontier:
+            return selected, False
+        if row[0] != current_tier:
+            current_tier = row[0]
+            if best is not None and bounds[current_tier] < best * ratio:
+                return selected, True
+        selected.append(row)
+        best = row[3] if best is None else max(best, row[3])
+        if len(selected) >= max_depth:
+            return selected, True
+    return selected, frontier is None
+
+
+async def sharded_search(
+    kind: str,
+    structured_query: Dict[str, Any],
+    top_n: int,
+    max_depth: Optional[int],
+    threshold_ratio: float,
+    fields: Optional[List[str]] = None,
+) -> Tuple[List[Dict[str, Any]], int, List[str]]:
+    """
+    Scatter to shard workers, rebuild the single-process candidate set,
+    then apply BM25 blending and the strict filter globally — same rules
+    as progressive_fetch + rank_results + apply_strict_filter.
+
+    The depth budget is split across shards; a shard that spends its share
+    is asked for more only while the merged prefix can't be settled
+    without it. BM25 is normalized over the merged candidates and only
+    the page is fetched in full.
+
+    Returns (ranked items covering the top top_n, total results,
+    _ids of every result passing the strict filter).
+    """
+    start = time.perf_counter()
+    partitions = await get_partitions(kind)
+    max_depth = max_depth or CANDIDATE_MAX_DEPTH
+    ratio = threshold_ratio or 0
+    margin = text_margin(kind, structured_query)
+    _, retrieval, _, _ = _RETRIEVAL[kind]
+    _, tiers = retrieval(structured_query)
+    bounds = [bound + margin for _, bound in tiers]
+
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    rows: List[Tuple[int, Any, str, int]] = []
+    selected: List[Tuple[int, Any, str, int]] = []
+    active: Dict[int, Tuple[Any, Optional[int]]] = {i: (None, None) for i in range(len(partitions))}
+    last_rows: Dict[int, Tuple[int, Any, str, int]] = {}
+    rounds = 0
+
+    while active:
+        check_deadline(f"shard.{kind}")
+        share = max(1, math.ceil((max_depth - len(selected)) / len(active)))
+        shard_ids = list(active)
+        results = await asyncio.gather(*(
+            loop.run_in_executor(
+                pool, run_shard, kind, structured_query, partitions[i], share, ratio, margin,
+                active[i][0], active[i][1], remaining_ms(),
+            )
+            for i in shard_ids
+        ))
+        rounds += 1
+
+        for i, result in zip(shard_ids, results):
+            rows.extend(result["rows"])
+            if result["cursor"] is None:
+                del active[i]
+                last_rows.pop(i, None)
+            else:
+                active[i] = (result["cursor"], result["best"])
+                last_rows[i] = result["rows"][-1]
+
+        frontier = max((_retrieval_order(row) for row in last_rows.values()), default=None)
+        selected, settled = _settle(rows, frontier, bounds, ratio, max_depth)
+        if settled:
+            break
+
+    observe(f"shard.gather_ms.{kind}", (time.perf_counter() - start) * 1000)
+    observe(f"retrieval.depth.{kind}", len(selected), buckets=DEPTH_BUCKETS)
+    incr(f"shard.requests.{kind}")
+    incr(f"shard.rounds.{kind}", rounds)
+
+    if not selected:
+        return [], 0, []
+
+    bonus = text_relevance_bonus(kind, structured_query, [row[2] for row in selected])
+    # rank_key order: score, recency (= retrieval order value), _id
+    ranked = sorted(((score + bonus.get(_id, 0), value or "", _id) for _, value, _id, score in selected), reverse=True)
+
+    # STRICT FILTER (global threshold)
+    if ranked[0][0] <= 0:
+        return [], 0, []
+    threshold = ranked[0][0] * ratio
+    passing = [entry for entry in ranked if entry[0] >= threshold] or ranked[:5]
+
+    page = passing[:top_n]
+    try:
+        items = await run_blocking(fetch_page, kind, [_id for _, _, _id in page], fields)
+    except ExecutionTimeout:
+        raise deadline_exceeded(f"mongo.{kind}")
+    scores = {_id: score for score, _, _id in page}
+    for item in items:
+        item["_score"] = scores[item["_id"]]
+
+    return items, len(passing), [_id for _, _, _id in passing]
+
+
+def shutdown_shard_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,211 @@
+import os
+import re
+import time
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo.errors import ExecutionTimeout
+
+from app.utils.admission import stage_slot
+from app.utils.deadline import DeadlineExceeded, deadline_exceeded
+from app.utils.extractor import extract_hard_filters
+from app.utils.geo_resolver import detect_geo_names
+from app.utils.hard_filter import (
+    _vendor_to_dict,
+    _venue_to_dict,
+    can_match_in_memory,
+    matches_filters,
+    progressive_fetch,
+    vendor_retrieval,
+    venue_retrieval,
+)
+from app.utils.metrics import get_counter, incr, observe, set_gauge
+from app.utils.offload import run_blocking
+
+
+# Docs fetched per speculation; tiers running past them continue with a follow-up query
+SPECULATIVE_MAX_DEPTH = int(os.getenv("SPECULATIVE_MAX_DEPTH", "300"))
+
+_RETRIEVAL = {
+    "vendor": (vendor_retrieval, _vendor_to_dict),
+    "venue": (venue_retrieval, _venue_to_dict),
+}
+
+
+def is_speculative_retrieval_enabled() -> bool:
+    return os.getenv("ENABLE_SPECULATIVE_RETRIEVAL", "false").lower() == "true"
+
+
+def predict_structured_query(query: str, flag: str) -> Dict[str, Any]:
+    """
+    What the NLP engine is likely to return, without the LLM: regex hard
+    filters plus city/state names found by dictionary lookup.
+    """
+    hard_filters = extract_hard_filters(query)
+    geo = detect_geo_names(query)
+    return {
+        "raw_query": query,
+        "entity_name": None,
+        "flag": flag,
+        "min_experience": hard_filters.get("min_experience"),
+        "budget_max": hard_filters.get("budget_max"),
+        "working_since": hard_filters.get("working_since"),
+        "city": geo.get("city"),
+        "state": geo.get("state"),
+        "locality": None,
+        "pincode": hard_filters.get("pincode"),
+        "semantic_tags": [],
+    }
+
+
+def _normalize_query(value: Any) -> Any:
+    # iexact/icontains compile to case-insensitive regexes → compare lowercased
+    if isinstance(value, re.Pattern):
+        return ("regex", value.pattern.lower() if value.flags & re.IGNORECASE else value.pattern, value.flags)
+    if isinstance(value, dict):
+        return {key: _normalize_query(v) for key, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize_query(v) for v in value]
+    return value
+
+
+def _filter_kwargs(queryset) -> Dict[str, Any]:
+    # The retrieval filters as passed to objects(**filters)
+    return dict(queryset._query_obj.query)
+
+
+def _same_value(key: str, a: Any, b: Any) -> bool:
+    if key.endswith(("__iexact", "__icontains")):
+        return str(a).lower() == str(b).lower()
+    return a == b
+
+
+def _extra_filters(looser: Dict[str, Any], stricter: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Filters stricter adds on top of looser, or None when stricter is not
+    a narrowing of looser (a filter dropped or changed).
+    """
+    for key, value in looser.items():
+        if key not in stricter or not _same_value(key, value, stricter[key]):
+            return None
+    return {key: value for key, value in stricter.items() if key not in looser}
+
+
+def _fetch_pool(queryset, to_dict, limit: int) -> Tuple[List[Dict[str, Any]], bool]:
+    # Queryset prefix in retrieval order + whether it is the whole result
+    items = [to_dict(doc) for doc in queryset.limit(limit + 1).batch_size(limit + 1)]
+    return items[:limit], len(items) <= limit
+
+
+class Speculation:
+    """
+    Candidate pool fetched for the predicted query while the LLM runs.
+    """
+
+    def __init__(self, kind: str, predicted: Dict[str, Any]):
+        self.kind = kind
+        retrieval, to_dict = _RETRIEVAL[kind]
+        queryset, _ = retrieval(predicted)
+        self.query = _normalize_query(queryset._query)
+        self.filters = _filter_kwargs(queryset)
+        self.duration_ms = 0.0
+        self.task = asyncio.create_task(self._run(queryset, to_dict))
+
+    async def _run(self, queryset, to_dict) -> Tuple[List[Dict[str, Any]], bool]:
+        start = time.perf_counter()
+        async with stage_slot("db"):
+            pool = await run_blocking(_fetch_pool, queryset, to_dict, SPECULATIVE_MAX_DEPTH)
+        self.duration_ms = (time.perf_counter() - start) * 1000
+        return pool
+
+    def cancel(self) -> None:
+        self.task.cancel()
+
+    async def resolve(
+        self,
+        structured_query: Dict[str, Any],
+        top_n: int,
+        max_depth: Optional[int],
+        threshold_ratio: Optional[float] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Candidates for the enriched query from the speculative pool, or
+        None when the caller must query (filters changed).
+
+        - same filters: the pool is the enriched query's prefix
+        - stricter filters (e.g. the LLM added a city): the pool filtered
+          in memory is the enriched query's prefix
+        - either way, if a tier runs past that prefix, only that tier's
+          docs after the prefix are queried
+        Gives exactly what progressive_fetch would have fetched.
+        """
+        retrieval, to_dict = _RETRIEVAL[self.kind]
+        queryset, tiers = retrieval(structured_query)
+
+        extra: Dict[str, Any] = {}
+        if _normalize_query(queryset._query) != self.query:
+            extra = _extra_filters(self.filters, _filter_kwargs(queryset))
+            if not extra or not can_match_in_memory(extra):
+                self.cancel()
+                return self._miss("filters")
+
+        wait_start = time.perf_counter()
+        try:
+            pool, complete = await self.task
+        except Exception as e:
+            print("SPECULATIVE RETRIEVAL FAILED:", str(e))
+            return self._miss("error")
+        waited_ms = (time.perf_counter() - wait_start) * 1000
+
+        if extra:
+            pool = [item for item in pool if matches_filters(item, extra)]
+            incr(f"speculative.narrowed.{self.kind}")
+
+        if complete:
+            results = progressive_fetch(
+                queryset, tiers, to_dict, structured_query, self.kind, top_n, max_depth, pool=pool,
+                threshold_ratio=threshold_ratio,
+            )
+        else:
+            # A tier may need docs past the prefix: follow-up queries fetch only those
+            try:
+                async with stage_slot("db"):
+                    results = await run_blocking(
+                        progressive_fetch, queryset, tiers, to_dict, structured_query, self.kind, top_n, max_depth,
+                        pool, False, threshold_ratio,
+                    )
+            except DeadlineExceeded:
+                raise
+            except ExecutionTimeout:
+                raise deadline_exceeded(f"mongo.{self.kind}")
+            except Exception as e:
+                print("SPECULATIVE FOLLOW-UP FAILED:", str(e))
+                return self._miss("error")
+
+        # DB time hidden behind the LLM call
+        incr(f"speculative.reuse.{self.kind}")
+        observe("speculative.saved_ms", max(0.0, self.duration_ms - waited_ms))
+        _publish_reuse_ratio()
+        return results
+
+    def _miss(self, reason: str) -> None:
+        # Caller falls back to the normal (progressive, narrower) query
+        incr(f"speculative.miss.{reason}.{self.kind}")
+        incr(f"speculative.miss.{self.kind}")
+        _publish_reuse_ratio()
+        return None
+
+
+def _publish_reuse_ratio() -> None:
+    reused = sum(get_counter(f"speculative.reuse.{kind}") for kind in _RETRIEVAL)
+    missed = sum(get_counter(f"speculative.miss.{kind}") for kind in _RETRIEVAL)
+    if reused + missed:
+        set_gauge("speculative.reuse_ratio", round(reused / (reused + missed), 4))
+
+
+def start_speculation(query: str, flag: str) -> Dict[str, Speculation]:
+    # Same kinds as the intent run_nlp_engine derives from the flag
+    flag_lower = (flag or "").lower()
+    kinds = [flag_lower] if flag_lower in _RETRIEVAL else list(_RETRIEVAL)
+    predicted = predict_structured_query(query, flag)
+    return {kind: Speculation(kind, predicted) for kind in kinds}
@@ -0,0 +1,300 @@
+import os
+import re
+import heapq
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+from app.utils.data_version import sync_changed_documents
+from app.utils.geo_resolver import geo_name
+
+
+# Suggestions kept per trie node and type (answer size upper bound,
+# also the /suggest limit cap)
+SUGGEST_TOP_K = int(os.getenv("SUGGEST_TOP_K", "20"))
+
+# Only the first few words of a phrase are indexed as prefix starts
+MAX_WORD_STARTS = 4
+
+OBJECT_ID_RE = re.compile(r"^[0-9a-f]{24}$")
+SPACE_RE = re.compile(r"\s+")
+
+
+def normalize(text: Any) -> str:
+    return SPACE_RE.sub(" ", str(text or "").lower()).strip()
+
+
+class _Node:
+    __slots__ = ("children", "entries", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.entries: set = set()   # entry keys terminating here
+        # type → top-k (rank key, ...) so type filters never see a list cut by other types
+        self.top: Dict[str, List[Tuple[float, str, Tuple[str, str]]]] = {}
+
+
+class SuggestIndex:
+    """
+    Prefix trie with popularity-weighted top-k per type cached on every node.
+
+    - Lookup: walk len(prefix) nodes, merge the cached per-type lists
+      → O(prefix + limit · types)
+    - Update: recompute cached lists bottom-up along touched paths only
+    - Entry key = (type, normalized text), e.g. ("city", "noida")
+    """
+
+    def __init__(self, top_k: int = SUGGEST_TOP_K):
+        self.top_k = top_k
+        self.root = _Node()
+        self.weights: Dict[Tuple[str, str], float] = {}
+        self.labels: Dict[Tuple[str, str], str] = {}
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    def _paths(self, text: str) -> List[str]:
+        words = text.split(" ")
+        return [" ".join(words[i:]) for i in range(min(len(words), MAX_WORD_STARTS))]
+
+    def _rank_key(self, key: Tuple[str, str]) -> Tuple[float, str, Tuple[str, str]]:
+        return (-self.weights[key], key[1], key)
+
+    def _recompute(self, node: _Node) -> None:
+        # A child's per-type top-k contains everything the parent's can need
+        merged = {key: self._rank_key(key) for key in node.entries}
+        for child in node.children.values():
+            for items in child.top.values():
+                for item in items:
+                    merged[item[2]] = item
+        top: Dict[str, list] = {}
+        for item in sorted(merged.values()):
+            bucket = top.setdefault(item[2][0], [])
+            if len(bucket) < self.top_k:
+                bucket.append(item)
+        node.top = top
+
+    def _refresh_path(self, path: str) -> None:
+        # Collect nodes root → leaf, then recompute caches leaf → root
+        nodes = [self.root]
+        node = self.root
+        for ch in path:
+            node = node.children.get(ch)
+            if node is None:
+                break
+            nodes.append(node)
+
+        for i in range(len(nodes) - 1, -1, -1):
+            node = nodes[i]
+            self._recompute(node)
+
+            # Prune dead branches so removed terms don't leave garbage behind
+            if i > 0 and not node.entries and not node.children:
+                del nodes[i - 1].children[path[i - 1]]
+
+    def upsert(self, type_: str, label: str, weight: float) -> None:
+        text = normalize(label)
+        if not text:
+            return
+        key = (type_, text)
+
+        with self.lock:
+            is_new = key not in self.weights
+            self.weights[key] = weight
+            self.labels.setdefault(key, str(label).strip())
+
+            for path in self._paths(text):
+                if is_new:
+                    node = self.root
+                    for ch in path:
+                        node = node.children.setdefault(ch, _Node())
+                    node.entries.add(key)
+                self._refresh_path(path)
+
+    def bulk_load(self, items: List[Tuple[str, str, float]]) -> None:
+        """
+        Initial build: insert everything, then compute caches in one
+        post-order pass instead of refreshing paths per insert.
+        """
+        with self.lock:
+            for type_, label, weight in items:
+                text = normalize(label)
+                if not text:
+                    continue
+                key = (type_, text)
+                self.weights[key] = weight
+                self.labels.setdefault(key, str(label).strip())
+                for path in self._paths(text):
+                    node = self.root
+                    for ch in path:
+                        node = node.children.setdefault(ch, _Node())
+                    node.entries.add(key)
+
+            stack = [(self.root, False)]
+            while stack:
+                node, expanded = stack.pop()
+                if not expanded:
+                    stack.append((node, True))
+                    stack.extend((child, False) for child in node.children.values())
+                    continue
+                self._recompute(node)
+
+    def remove(self, type_: str, label: str) -> None:
+        key = (type_, normalize(label))
+
+        with self.lock:
+            if key not in self.weights:
+                return
+            for path in self._paths(key[1]):
+                node = self.root
+                for ch in path:
+                    node = node.children.get(ch)
+                    if node is None:
+                        break
+                if node is not None:
+                    node.entries.discard(key)
+            del self.weights[key]
+            self.labels.pop(key, None)
+            for path in self._paths(key[1]):
+                self._refresh_path(path)
+
+    def suggest(self, prefix: str, limit: int = 10, types: Optional[set] = None) -> List[Dict[str, Any]]:
+        # At most top_k results (per node and type)
+        node = self.root
+        for ch in normalize(prefix):
+            node = node.children.get(ch)
+            if node is None:
+                return []
+
+        lists = [items for type_, items in node.top.items() if not types or type_ in types]
+        results = []
+        for neg_weight, _, key in heapq.merge(*lists):
+            results.append({
+                "text": self.labels.get(key, key[1]),
+                "type": key[0],
+                "score": -neg_weight,
+            })
+            if len(results) >= limit:
+                break
+        return results
+
+
+# GLOBAL SUGGEST INDEX + per-document contributions (for incremental updates)
+_INDEX = SuggestIndex()
+_DOC_TERMS: Dict[str, List[Tuple[str, str, float]]] = {}
+_TERM_COUNTS: Dict[Tuple[str, str], float] = {}
+_LABELS: Dict[Tuple[str, str], str] = {}
+_SYNCED_AT: Dict[str, Any] = {}  # kind → latest updatedAt applied
+
+
+def get_suggest_index() -> SuggestIndex:
+    return _INDEX
+
+
+def _readable(value: Any) -> Optional[str]:
+    # Unresolved venue city/state ObjectIds → not suggestible text
+    text = str(value or "").strip()
+    if not text or OBJECT_ID_RE.match(text.lower()):
+        return None
+    return text
+
+
+def _vendor_terms(vendor: Dict[str, Any]) -> List[Tuple[str, str, float]]:
+    popularity = 1.0 + (2.0 if vendor.get("featured") else 0.0) + (1.0 if vendor.get("verifiedBadge") else 0.0)
+    terms = [("vendor", _readable(vendor.get("vendorName")), popularity)]
+    for type_ in ("city", "state", "locality"):
+        terms.append((type_, _readable(vendor.get(type_)), 1.0))
+    return [t for t in terms if t[1]]
+
+
+def _venue_terms(venue: Dict[str, Any]) -> List[Tuple[str, str, float]]:
+    popularity = 1.0 + (2.0 if venue.get("isPremium") else 0.0) + min(int(venue.get("inquiryCount") or 0), 100) / 20
+    location = venue.get("location") or {}
+    terms = [("venue", _readable(venue.get("title")), popularity)]
+    for type_ in ("city", "state"):
+        terms.append((type_, _readable(geo_name(type_, location.get(type_))), 1.0))
+    terms.append(("locality", _readable(location.get("locality")), 1.0))
+    return [t for t in terms if t[1]]
+
+
+def _apply(type_: str, label: str, delta: float) -> None:
+    key = (type_, normalize(label))
+    total = _TERM_COUNTS.get(key, 0.0) + delta
+    if total <= 1e-9:
+        _TERM_COUNTS.pop(key, None)
+        _INDEX.remove(type_, label)
+    else:
+        _TERM_COUNTS[key] = total
+        _INDEX.upsert(type_, label, total)
+
+
+def upsert_document(kind: str, doc: Dict[str, Any]) -> None:
+    """
+    Incrementally (re)index one vendor/venue document.
+    Geo terms are weighted by how many documents reference them.
+    """
+    doc_id = f"{kind}:{doc.get('_id') or doc.get('id')}"
+    terms = _vendor_terms(doc) if kind == "vendor" else _venue_terms(doc)
+
+    old = _DOC_TERMS.get(doc_id)
+    if old == terms:
+        return
+    if old:
+        for type_, label, weight in old:
+            _apply(type_, label, -weight)
+    for type_, label, weight in terms:
+        _apply(type_, label, weight)
+    _DOC_TERMS[doc_id] = terms
+
+
+def remove_document(kind: str, doc_id: str) -> None:
+    old = _DOC_TERMS.pop(f"{kind}:{doc_id}", None)
+    for type_, label, weight in old or []:
+        _apply(type_, label, -weight)
+
+
+def _load_document(kind: str, doc: Dict[str, Any], initial: bool) -> None:
+    if not initial:
+        upsert_document(kind, doc)
+        return
+
+    # Initial load only accumulates weights; the trie is bulk-built after
+    terms = _vendor_terms(doc) if kind == "vendor" else _venue_terms(doc)
+    for type_, label, weight in terms:
+        key = (type_, normalize(label))
+        _TERM_COUNTS[key] = _TERM_COUNTS.get(key, 0.0) + weight
+        _LABELS.setdefault(key, label)
+    _DOC_TERMS[f"{kind}:{doc['_id']}"] = terms
+
+
+def _sync_kind(kind: str, objects, fields: Tuple[str, ...], visible: Dict[str, Any], initial: bool) -> None:
+    prefix = f"{kind}:"
+    _SYNCED_AT[kind] = sync_changed_documents(
+        objects, fields, visible, _SYNCED_AT.get(kind),
+        upsert=lambda doc: _load_document(kind, doc, initial),
+        remove=lambda doc_id: remove_document(kind, doc_id),
+        held_ids=lambda: [key[len(prefix):] for key in _DOC_TERMS if key.startswith(prefix)],
+    )
+
+
+def sync_suggest_index() -> Dict[str, int]:
+    """
+    Apply vendors/venues changed since the last sync (updatedAt) to the
+    in-memory index (first call = full build).
+    """
+    from app.models.vendor_model import Vendor
+    from app.models.venue_model import VenuePackage
+
+    initial = not _DOC_TERMS
+
+    vendor_fields = ("id", "vendorName", "city", "state", "locality", "featured", "verifiedBadge")
+    _sync_kind("vendor", Vendor.objects, vendor_fields, {}, initial)
+
+    venue_fields = ("id", "title", "location", "isPremium", "inquiryCount")
+    _sync_kind("venue", VenuePackage.objects, venue_fields, {"visibility": "public"}, initial)
+
+    if initial:
+        _INDEX.bulk_load([(key[0], _LABELS[key], weight) for key, weight in _TERM_COUNTS.items()])
+        _LABELS.clear()
+
+    return {"documents": len(_DOC_TERMS), "suggestions": len(_INDEX)}
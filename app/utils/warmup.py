@@ -0,0 +1,66 @@
+import time
+import asyncio
+from typing import Any, Callable, Dict, List, Tuple
+
+
+# Process start reference (first import of this module)
+PROCESS_START = time.perf_counter()
+
+_state: Dict[str, Any] = {
+    "ready": False,
+    "startup_ms": None,
+    "steps": {},
+    "errors": {},
+    "import_ms": {},
+}
+
+
+def record_import(name: str, ms: float) -> None:
+    _state["import_ms"][name] = round(ms, 2)
+
+
+def is_ready() -> bool:
+    return _state["ready"]
+
+
+def readiness() -> Dict[str, Any]:
+    return {
+        "ready": _state["ready"],
+        "startup_ms": _state["startup_ms"],
+        "steps_ms": dict(_state["steps"]),
+        "errors": dict(_state["errors"]),
+        "import_ms": dict(_state["import_ms"]),
+    }
+
+
+async def run_warmup(
+    steps: List[Tuple[str, Callable[[], Any], bool]],
+    retry_seconds: float = 5.0,
+) -> None:
+    """
+    Run blocking warm-up steps off the event loop, in order.
+
+    steps: [(name, fn, required)]
+    - required steps are retried until they succeed (e.g. Mongo ping)
+    - optional steps log and continue (search works without them)
+    Readiness flips to True once every step has run.
+    """
+    for name, fn, required in steps:
+        while True:
+            start = time.perf_counter()
+            try:
+                result = await asyncio.to_thread(fn)
+                _state["steps"][name] = round((time.perf_counter() - start) * 1000, 2)
+                _state["errors"].pop(name, None)
+                print(f"WARMUP {name}: {result if result is not None else 'ok'}")
+                break
+            except Exception as e:
+                _state["errors"][name] = str(e)
+                print(f"WARMUP {name} FAILED:", str(e))
+                if not required:
+                    break
+                await asyncio.sleep(retry_seconds)
+
+    _state["startup_ms"] = round((time.perf_counter() - PROCESS_START) * 1000, 2)
+    _state["ready"] = True
+    print("WARMUP COMPLETE:", readiness())
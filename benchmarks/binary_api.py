@@ -0,0 +1,95 @@
+"""
+End-to-end throughput of the JSON /search endpoint vs the msgpack
+internal endpoint, through app/utils/search_client.SearchClient.
+
+    uvicorn main:app --port 8050 &
+    python -m benchmarks.binary_api --url http://localhost:8050 --concurrency 8 --rounds 5
+
+Every labeled query (benchmarks/data/labeled_queries.jsonl) is sent
+--rounds times per mode from --concurrency threads (one keep-alive
+connection each). Client time includes encoding the request and decoding
+the response into dicts. Start the server with ENABLE_RESPONSE_CACHE=false
+to measure the pipeline + codec rather than cache hits.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * q))], 2)
+
+
+def run_mode(args, rows, binary: bool) -> dict:
+    from app.utils.search_client import SearchClient
+
+    client = SearchClient(args.url, binary=binary)
+    requests = [row for _ in range(args.rounds) for row in rows]
+
+    def one(row):
+        start = time.perf_counter()
+        body = client.search(row["query"], flag=row.get("flag") or "all", limit=args.limit)
+        return (time.perf_counter() - start) * 1000, len(body["vendors"]) + len(body["venues"])
+
+    # Warm the connections (and the server's caches if enabled)
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        list(pool.map(one, rows[:args.concurrency]))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        results = list(pool.map(one, requests))
+    elapsed = time.perf_counter() - start
+
+    latencies = [ms for ms, _ in results]
+    return {
+        "requests": len(results),
+        "rps": round(len(results) / elapsed, 1),
+        "p50_ms": percentile(latencies, 0.5),
+        "p95_ms": percentile(latencies, 0.95),
+        "rows": sum(count for _, count in results),
+    }
+
+
+def payload_sizes(args, rows) -> dict:
+    # Response bytes per mode for the same requests (uncompressed)
+    from app.utils.msgpack_codec import MSGPACK_MEDIA_TYPE, encode_request
+    from app.utils.search_client import SearchClient
+
+    sizes = {}
+    for mode, binary in (("json", False), ("msgpack", True)):
+        client = SearchClient(args.url, binary=binary)
+        total = 0
+        for row in rows:
+            payload = {"query": row["query"], "flag": row.get("flag") or "all", "limit": args.limit}
+            if binary:
+                _, _, body = client._post("/api/v1/internal/search", encode_request(payload), MSGPACK_MEDIA_TYPE)
+            else:
+                _, _, body = client._post("/api/v1/search", json.dumps(payload).encode(), "application/json")
+            total += len(body)
+        sizes[mode] = round(total / len(rows))
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8050")
+    parser.add_argument("--data", default=os.path.join(os.path.dirname(__file__), "data", "labeled_queries.jsonl"))
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20, help="results per page")
+    args = parser.parse_args()
+
+    with open(args.data) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+
+    print(f"{len(rows)} queries x {args.rounds} rounds, concurrency={args.concurrency}, limit={args.limit}")
+    print("mean response bytes:", payload_sizes(args, rows))
+    for mode, binary in (("json", False), ("msgpack", True)):
+        print(f"  {mode:8}", run_mode(args, rows, binary))
+
+
+if __name__ == "__main__":
+    main()
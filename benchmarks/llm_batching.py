@@ -0,0 +1,135 @@
+"""
+Micro-batching benchmark against a local fake OpenAI-compatible server.
+
+    python -m benchmarks.llm_batching --requests 200 --concurrency 50
+
+The fake server sleeps base + per-KB-of-prompt + per-output-item latency
+(rough gpt-4o-mini shape) and counts upstream calls. The same workload is
+run with ENABLE_LLM_BATCHING off and on; throughput, client latency and
+upstream call counts are printed for both.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+
+BATCH_MARKER = "USER QUERIES (with their regex-extracted filters):\n"
+
+
+def build_fake_llm(base_ms: float, per_kb_ms: float, per_item_ms: float) -> FastAPI:
+    app = FastAPI()
+    app.state.calls = 0
+
+    def enrich(query: str) -> dict:
+        return {"raw_query": query, "city": "Delhi", "semantic_tags": query.split()[:2]}
+
+    @app.post("/v1/chat/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        prompt = body["messages"][-1]["content"]
+        app.state.calls += 1
+
+        if BATCH_MARKER in prompt:
+            line = prompt.split(BATCH_MARKER, 1)[1].split("\n", 1)[0]
+            items = json.loads(line)
+            content = {"results": [dict(enrich(item["query"]), id=item["id"]) for item in items]}
+        else:
+            items = [None]
+            query = prompt.split('USER QUERY:\n"', 1)[1].split('"', 1)[0]
+            content = enrich(query)
+
+        delay = base_ms + per_kb_ms * len(prompt) / 1024 + per_item_ms * len(items)
+        await asyncio.sleep(delay / 1000)
+
+        return {
+            "id": "fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model"),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": json.dumps(content)},
+            }],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": 20 * len(items), "total_tokens": 0},
+        }
+
+    return app
+
+
+def start_server(app: FastAPI) -> int:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return port
+
+
+async def run_workload(batching: bool, requests: int, concurrency: int) -> dict:
+    from app.utils import llm, llm_batcher
+    from app.utils.nlp_engine import run_nlp_engine
+
+    os.environ["ENABLE_LLM_BATCHING"] = "true" if batching else "false"
+    # Fresh client/batcher per run: each asyncio.run() has its own loop
+    llm._client = None
+    llm_batcher._BATCHER = None
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await run_nlp_engine(f"photographers in delhi under {i}k", "vendor")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--base-ms", type=float, default=300)
+    parser.add_argument("--per-kb-ms", type=float, default=20)
+    parser.add_argument("--per-item-ms", type=float, default=40)
+    args = parser.parse_args()
+
+    fake = build_fake_llm(args.base_ms, args.per_kb_ms, args.per_item_ms)
+    port = start_server(fake)
+
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{port}/v1"
+    os.environ["OPENAI_API_KEY"] = "fake"
+    os.environ["ENABLE_LLM"] = "true"
+
+    for batching in (False, True):
+        fake.state.calls = 0
+        stats = asyncio.run(run_workload(batching, args.requests, args.concurrency))
+        stats["upstream_calls"] = fake.state.calls
+        print("batching" if batching else "single  ", stats)
+
+
+if __name__ == "__main__":
+    main()
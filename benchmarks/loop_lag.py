@@ -0,0 +1,137 @@
+"""
+Event-loop lag under CPU-heavy searches, inline vs offloaded.
+
+    python -m benchmarks.loop_lag --candidates 5000 --requests 40
+
+Runs the real /search route in-process (ASGI) with the DB stage replaced
+by a fake returning --candidates vendor dicts, so ranking and encoding
+dominate. While --concurrency big searches run, a probe hits /ready every
+10 ms. Each OFFLOAD_EXECUTOR mode runs in a fresh process and reports
+event_loop.lag_ms (from the built-in monitor), probe latency and search
+latency.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * q))], 1)
+
+
+async def run(args) -> dict:
+    import httpx
+    from fastapi import FastAPI
+
+    import app.routes.search as search
+    from app.utils.loop_monitor import LoopLagMonitor
+    from app.utils.metrics import snapshot
+
+    candidates = [
+        {
+            "_id": str(i),
+            "vendorName": f"Vendor {i} photography studio",
+            "city": "Delhi" if i % 3 else "Noida",
+            "state": "Delhi",
+            "locality": f"Sector {i % 60}",
+            "experience": i % 15,
+            "lastActive": f"2024-01-{i % 28 + 1:02d}",
+        }
+        for i in range(args.candidates)
+    ]
+
+    async def fake_db(structured_query, top_n=10, max_depth=None):
+        return [dict(c) for c in candidates]
+
+    search.hard_filter_vendors = fake_db
+
+    api = FastAPI()
+    api.include_router(search.router, prefix="/api/v1")
+
+    monitor = asyncio.create_task(LoopLagMonitor(interval_ms=5, threshold_ms=10_000).run())
+    probe_latencies, search_latencies = [], []
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api), base_url="http://bench", timeout=120) as client:
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/api/v1/ready")
+                probe_latencies.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(0.01)
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def one(i: int):
+            async with semaphore:
+                start = time.perf_counter()
+                await client.post("/api/v1/search", json={
+                    "query": f"photographers in delhi {i}", "flag": "vendor", "limit": args.limit,
+                })
+                search_latencies.append((time.perf_counter() - start) * 1000)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    monitor.cancel()
+    lag = snapshot()["histograms"].get("event_loop.lag_ms", {})
+    return {
+        "throughput_rps": round(args.requests / elapsed, 1),
+        "search_p50_ms": percentile(search_latencies, 0.5),
+        "probe_p50_ms": percentile(probe_latencies, 0.5),
+        "probe_p99_ms": percentile(probe_latencies, 0.99),
+        "loop_lag_max_ms": lag.get("max"),
+        "loop_lag_avg_ms": round(lag["sum"] / lag["count"], 2) if lag.get("count") else None,
+    }
+
+
+def child(args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = asyncio.run(run(args))
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--child", action="store_true")
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    for executor in ("none", "thread"):
+        env = dict(
+            os.environ,
+            OFFLOAD_EXECUTOR=executor,
+            ENABLE_RESPONSE_CACHE="false",
+            ENABLE_ADMISSION_CONTROL="false",
+            ENABLE_LLM="false",
+            ENABLE_BM25="false",
+        )
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.loop_lag", "--child", *sys.argv[1:]],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout.strip().splitlines()[-1]
+        print(f"offload={executor:6}", output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Open-loop overload test for /api/v1/search admission control.
+
+    python -m benchmarks.overload --rate 150 --duration 10
+
+Runs the real route in-process (ASGI) with the slow stages replaced by
+fakes: an LLM provider that serves at most --llm-capacity calls at once
+(--llm-ms each) and a DB stage of --db-ms. Every request is a unique
+query, so the response cache never helps. The workload is run with
+ENABLE_ADMISSION_CONTROL=false and =true (fresh process each) and
+reports latency percentiles, 503 rate and degradation tiers.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * q))], 1)
+
+
+async def run(args) -> dict:
+    import httpx
+    from fastapi import FastAPI
+
+    import app.routes.search as search
+    import app.utils.nlp_engine as nlp_engine
+
+    provider = asyncio.Semaphore(args.llm_capacity)
+
+    async def fake_llm(query, extracted_filters):
+        async with provider:
+            await asyncio.sleep(args.llm_ms / 1000)
+        return {"city": "Delhi", "semantic_tags": ["photographer"]}
+
+    async def fake_db(structured_query, top_n=10, max_depth=None):
+        await asyncio.sleep(args.db_ms / 1000)
+        return [{"_id": str(i), "vendorName": f"Vendor {i}", "city": "Delhi"} for i in range(max_depth or 50)][:50]
+
+    nlp_engine.enrich_with_llm = fake_llm
+    search.hard_filter_vendors = fake_db
+
+    api = FastAPI()
+    api.include_router(search.router, prefix="/api/v1")
+
+    latencies, statuses, tiers = [], Counter(), Counter()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api), base_url="http://bench", timeout=120) as client:
+        async def one(i: int):
+            start = time.perf_counter()
+            response = await client.post("/api/v1/search", json={"query": f"photographers in delhi {i}", "flag": "vendor"})
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[response.status_code] += 1
+            tiers[response.headers.get("x-degradation-tier", "-")] += 1
+
+        tasks = []
+        interval = 1 / args.rate
+        start = time.perf_counter()
+        for i in range(int(args.rate * args.duration)):
+            # Open loop: arrivals don't wait for earlier responses
+            delay = start + i * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(i)))
+        await asyncio.gather(*tasks)
+
+    return {
+        "requests": len(latencies),
+        "status": dict(statuses),
+        "tiers": dict(tiers),
+        "p50_ms": percentile(latencies, 0.50),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": percentile(latencies, 1.0),
+    }
+
+
+def child(args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = asyncio.run(run(args))
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rate", type=float, default=150, help="arrivals per second")
+    parser.add_argument("--duration", type=float, default=10, help="seconds")
+    parser.add_argument("--llm-ms", type=float, default=200)
+    parser.add_argument("--llm-capacity", type=int, default=8)
+    parser.add_argument("--db-ms", type=float, default=10)
+    parser.add_argument("--child", action="store_true")
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    for admission in ("false", "true"):
+        env = dict(
+            os.environ,
+            ENABLE_ADMISSION_CONTROL=admission,
+            ENABLE_RESPONSE_CACHE="false",
+            ENABLE_LLM="true",
+            ENABLE_BM25="false",
+        )
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.overload", "--child", *sys.argv[1:]],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout.strip().splitlines()[-1]
+        print(f"admission={admission:5}", output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+/search payload size and encode time per response shape and encoding.
+
+    MONGODB_URI=... DATABASE_NAME=... python -m benchmarks.payload_size --limit 20
+
+Every labeled query (benchmarks/data/labeled_queries.jsonl, regex
+extraction only, no LLM) runs once per shape; each response is then
+JSON-encoded and compressed with every available encoding. Reports mean
+bytes and mean encode / compress time per combination.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import time
+from collections import defaultdict
+
+from dotenv import load_dotenv
+from mongoengine import connect
+
+
+SHAPES = {
+    "full": {},
+    "no_structured_query": {"include_structured_query": False},
+    "card_fields": {
+        "include_structured_query": False,
+        "fields": ["vendorName", "venueName", "city", "locality", "startingPrice", "experience"],
+    },
+}
+
+
+async def run(args, rows) -> None:
+    from app.models.request import SearchRequest
+    from app.routes.search import run_search_pipeline
+    from app.utils import compression
+    from app.utils.offload import encode_response, optional_import
+
+    encodings = ["identity", "gzip"] + (["br"] if optional_import("brotli") is not None else [])
+    sizes = defaultdict(list)
+    times = defaultdict(list)
+
+    for shape, options in SHAPES.items():
+        for row in rows:
+            payload = SearchRequest(query=row["query"], flag=row.get("flag") or "all", limit=args.limit, **options)
+            with contextlib.redirect_stdout(io.StringIO()):
+                response_data = await run_search_pipeline(payload)
+
+            start = time.perf_counter()
+            body = encode_response(response_data)
+            times[(shape, "encode")].append((time.perf_counter() - start) * 1000)
+
+            for encoding in encodings:
+                start = time.perf_counter()
+                sent = body if encoding == "identity" else compression.compress(body, encoding)
+                times[(shape, encoding)].append((time.perf_counter() - start) * 1000)
+                sizes[(shape, encoding)].append(len(sent))
+
+    def mean(values):
+        return round(sum(values) / len(values), 2) if values else None
+
+    print(f"{len(rows)} queries, limit={args.limit}")
+    for shape in SHAPES:
+        print(f"  {shape:20} encode_ms={mean(times[(shape, 'encode')])}")
+        for encoding in encodings:
+            print(f"    {encoding:9} bytes={mean(sizes[(shape, encoding)]):>10}  compress_ms={mean(times[(shape, encoding)])}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default=os.path.join(os.path.dirname(__file__), "data", "labeled_queries.jsonl"))
+    parser.add_argument("--limit", type=int, default=20, help="results per page")
+    args = parser.parse_args()
+
+    os.environ.setdefault("ENABLE_LLM", "false")
+    load_dotenv()
+    connect(db=os.getenv("DATABASE_NAME"), host=os.getenv("MONGODB_URI"))
+
+    from app.utils.bm25 import build_search_indexes
+    from app.utils.geo_resolver import load_geo_names
+    load_geo_names()
+    build_search_indexes()
+
+    with open(args.data) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+
+    asyncio.run(run(args, rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Offline evaluation: full vs compact enrichment prompt.
+
+    OPENAI_API_KEY=... python -m benchmarks.prompt_eval [--data benchmarks/data/labeled_queries.jsonl]
+
+Each labeled query goes through regex extraction + enrich_with_llm in both
+LLM_PROMPT_MODE=full and =compact. Reports per-field accuracy against the
+labels, full/compact agreement on the structured fields and average
+prompt/completion tokens per call (from the response `usage`).
+"""
+import argparse
+import asyncio
+import json
+import os
+from typing import Any, Dict, List
+
+from app.utils.extractor import extract_hard_filters
+from app.utils.metrics import get_counter
+
+
+FIELDS = ("city", "state", "locality", "pincode", "entity_name", "min_experience", "budget_max", "working_since")
+NUMERIC_FIELDS = {"min_experience", "budget_max", "working_since"}
+
+
+def normalize_value(field: str, value: Any) -> Any:
+    if value is None or value == "":
+        return None
+    if field in NUMERIC_FIELDS:
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return None
+    return str(value).strip().lower()
+
+
+def structured_fields(query: str, enriched: Dict[str, Any]) -> Dict[str, Any]:
+    # Same merge rule as run_nlp_engine: LLM values override when not None
+    merged = dict(extract_hard_filters(query))
+    for key, value in enriched.items():
+        if value is not None:
+            merged[key] = value
+    return {field: normalize_value(field, merged.get(field)) for field in FIELDS}
+
+
+async def run_mode(mode: str, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    from app.utils import llm
+
+    os.environ["LLM_PROMPT_MODE"] = mode
+    llm._client = None
+
+    calls_before = get_counter("llm.calls.single")
+    prompt_before = get_counter("llm.prompt_tokens")
+    completion_before = get_counter("llm.completion_tokens")
+
+    outputs = []
+    for row in rows:
+        filters = {"raw_query": row["query"], **extract_hard_filters(row["query"])}
+        enriched = await llm.enrich_with_llm(row["query"], filters)
+        outputs.append(structured_fields(row["query"], enriched))
+
+    calls = max(get_counter("llm.calls.single") - calls_before, 1)
+    return {
+        "outputs": outputs,
+        "avg_prompt_tokens": round((get_counter("llm.prompt_tokens") - prompt_before) / calls, 1),
+        "avg_completion_tokens": round((get_counter("llm.completion_tokens") - completion_before) / calls, 1),
+    }
+
+
+def accuracy(outputs: List[Dict[str, Any]], rows: List[Dict[str, Any]]) -> Dict[str, float]:
+    scores = {}
+    for field in FIELDS:
+        hits = sum(
+            1 for out, row in zip(outputs, rows)
+            if out[field] == normalize_value(field, row["expected"].get(field))
+        )
+        scores[field] = round(hits / len(rows), 3)
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default=os.path.join(os.path.dirname(__file__), "data", "labeled_queries.jsonl"))
+    args = parser.parse_args()
+
+    with open(args.data) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+
+    os.environ["ENABLE_LLM"] = "true"
+    results = {mode: asyncio.run(run_mode(mode, rows)) for mode in ("full", "compact")}
+
+    for mode, result in results.items():
+        print(f"{mode:8}", {
+            "accuracy": accuracy(result["outputs"], rows),
+            "avg_prompt_tokens": result["avg_prompt_tokens"],
+            "avg_completion_tokens": result["avg_completion_tokens"],
+        })
+
+    agree = 0
+    mismatches = []
+    for row, full, compact in zip(rows, results["full"]["outputs"], results["compact"]["outputs"]):
+        if full == compact:
+            agree += 1
+        else:
+            diff = {f: (full[f], compact[f]) for f in FIELDS if full[f] != compact[f]}
+            mismatches.append((row["query"], diff))
+
+    print(f"agreement: {agree}/{len(rows)}")
+    for query, diff in mismatches:
+        print("  MISMATCH", query, diff)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Where search reads go, and how long they wait for a pooled connection.
+
+Local three-member replica set:
+
+    for port in 27017 27018 27019; do
+        mkdir -p /tmp/rs0-$port
+        mongod --replSet rs0 --port $port --dbpath /tmp/rs0-$port --fork --logpath /tmp/rs0-$port.log
+    done
+    mongosh --port 27017 --eval 'rs.initiate({_id: "rs0", members: [
+        {_id: 0, host: "localhost:27017"}, {_id: 1, host: "localhost:27018"}, {_id: 2, host: "localhost:27019"}]})'
+    mongorestore --uri "mongodb://localhost:27017/?replicaSet=rs0" <dump>
+
+    MONGODB_URI="mongodb://localhost:27017,localhost:27018,localhost:27019/?replicaSet=rs0" \\
+    DATABASE_NAME=... ENABLE_SEARCH_READ_ROUTING=true SEARCH_READ_PREFERENCE=secondaryPreferred \\
+        python -m benchmarks.read_routing --concurrency 16 --rounds 5
+
+Runs the labeled queries (benchmarks/data/labeled_queries.jsonl, no LLM)
+through the search pipeline, then prints checkouts per server with the
+server's current role for the default and search pools, plus pool wait
+times. With secondaryPreferred / secondary no search checkout should hit
+the primary; stop a secondary (or both) to watch reads move.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import time
+
+from dotenv import load_dotenv
+from mongoengine import connect
+from mongoengine.connection import get_connection
+
+
+async def run(args, rows) -> None:
+    from app.models.request import SearchRequest
+    from app.routes.search import run_search_pipeline
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(row):
+        async with semaphore:
+            payload = SearchRequest(query=row["query"], flag=row.get("flag") or "all", limit=args.limit)
+            await run_search_pipeline(payload)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        await asyncio.gather(*(one(row) for _ in range(args.rounds) for row in rows))
+    elapsed = time.perf_counter() - start
+    print(f"{len(rows) * args.rounds} searches in {elapsed:.1f}s, concurrency={args.concurrency}")
+
+
+def report(aliases) -> None:
+    from app.utils.metrics import snapshot
+
+    metrics = snapshot()
+    for alias in aliases:
+        prefix = f"mongo.pool.{alias}."
+        roles = {
+            f"{host}:{port}": description.server_type_name
+            for (host, port), description in get_connection(alias).topology_description.server_descriptions().items()
+        }
+        print(f"pool {alias}: read preference {get_connection(alias).read_preference.name}")
+        for name, count in sorted(metrics["counters"].items()):
+            if name.startswith(prefix + "checkouts."):
+                server = name[len(prefix + "checkouts."):]
+                print(f"  {server:22} {roles.get(server, '?'):16} checkouts={int(count)}")
+        for name, count in sorted(metrics["counters"].items()):
+            if name.startswith(prefix + "checkout_failed."):
+                print(f"  {name[len(prefix):]}={int(count)}")
+        wait = metrics["histograms"].get(prefix + "wait_ms")
+        if wait and wait["count"]:
+            print(f"  wait_ms mean={wait['sum'] / wait['count']:.3f} max={wait['max']} buckets={wait['buckets']}")
+        print(f"  open={metrics['gauges'].get(prefix + 'open')} in_use={metrics['gauges'].get(prefix + 'in_use')}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default=os.path.join(os.path.dirname(__file__), "data", "labeled_queries.jsonl"))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault("ENABLE_LLM", "false")
+    os.environ.setdefault("ENABLE_RESPONSE_CACHE", "false")
+    load_dotenv()
+
+    from app.utils.read_routing import SEARCH_DB_ALIAS, PoolMetrics, connect_search_pool
+    database = os.getenv("DATABASE_NAME")
+    connect(db=database, host=os.getenv("MONGODB_URI"), event_listeners=[PoolMetrics("default")])
+    routing = connect_search_pool(database)
+    print("search read routing:", routing)
+
+    from app.utils.bm25 import build_search_indexes
+    from app.utils.geo_resolver import load_geo_names
+    load_geo_names()
+    build_search_indexes()
+
+    with open(args.data) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+
+    asyncio.run(run(args, rows))
+    report(["default"] if routing == "disabled" else ["default", SEARCH_DB_ALIAS])
+
+
+if __name__ == "__main__":
+    main()
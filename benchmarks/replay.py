@@ -0,0 +1,218 @@
+"""
+Replay captured /search traffic and compare latency between builds.
+
+Capture in production (sampled, rotating JSONL):
+
+    ENABLE_QUERY_CAPTURE=true CAPTURE_SAMPLE_RATE=0.05 CAPTURE_PATH=captures/search.jsonl
+
+Replay against the checked-out build (LLM stubbed with the recorded
+enrichments, Mongo from MONGODB_URI / .env), then compare two runs:
+
+    python -m benchmarks.replay run captures/search.jsonl* --speed 4 --out build_a.json
+    git checkout other-build
+    python -m benchmarks.replay run captures/search.jsonl* --speed 4 --out build_b.json
+    python -m benchmarks.replay compare build_a.json build_b.json
+
+--speed 1 keeps the recorded inter-arrival times, N replays N times
+faster, 0 sends as fast as --concurrency allows. The response cache and
+admission control are off unless --with-cache / --with-admission.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List
+
+
+def percentile(values: List[float], q: float):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * q))], 2)
+
+
+def load_records(paths: List[str]) -> List[Dict[str, Any]]:
+    records = []
+    for path in paths:
+        with open(path) as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    records.sort(key=lambda r: r["ts"])
+    return records
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+async def replay(args, records: List[Dict[str, Any]], capture_path: str) -> Dict[str, Any]:
+    import httpx
+
+    import app.utils.nlp_engine as nlp_engine
+    from app.utils.capture import stop_capture
+    from app.utils.warmup import run_warmup
+    from main import WARMUP_STEPS, app
+
+    # LLM stub: the enrichment recorded for the same query text
+    enrichments = {r["payload"]["query"]: r.get("llm_enrichment") or {} for r in records}
+
+    async def recorded_enrichment(query, extracted_filters):
+        return dict(enrichments.get(query) or {})
+
+    nlp_engine.enrich_with_llm = recorded_enrichment
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        await run_warmup(WARMUP_STEPS)
+
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://replay", timeout=120) as client:
+        async def one(record):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post("/api/v1/search", json=record["payload"])
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[response.status_code] += 1
+
+        tasks = []
+        first_ts = records[0]["ts"]
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for record in records:
+                if args.speed > 0:
+                    delay = start + (record["ts"] - first_ts) / args.speed - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                tasks.append(asyncio.create_task(one(record)))
+            await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    stop_capture()
+
+    # Server-side per-stage timings come from the replay's own capture
+    stages: Dict[str, List[float]] = defaultdict(list)
+    with open(capture_path) as f:
+        for line in f:
+            captured = json.loads(line)
+            stages["server_total"].append(captured["total_ms"])
+            for name, ms in captured["stages_ms"].items():
+                stages[name].append(ms)
+
+    return {
+        "build": args.label or git_revision(),
+        "requests": len(records),
+        "elapsed_s": round(elapsed, 2),
+        "status": dict(statuses),
+        "latency_ms": {"client_total": latencies, **stages},
+    }
+
+
+def summarize(values: List[float]) -> Dict[str, Any]:
+    return {"n": len(values), "p50": percentile(values, 0.5), "p95": percentile(values, 0.95), "p99": percentile(values, 0.99)}
+
+
+def cmd_run(args) -> None:
+    records = load_records(args.captures)
+    if args.limit:
+        records = records[:args.limit]
+    if not records:
+        sys.exit("no captured requests")
+
+    capture_path = os.path.join(tempfile.mkdtemp(prefix="replay-"), "replay.jsonl")
+    os.environ.update(
+        ENABLE_QUERY_CAPTURE="true",
+        CAPTURE_SAMPLE_RATE="1",
+        CAPTURE_PATH=capture_path,
+        ENABLE_LLM="true",
+        ENABLE_LLM_BATCHING="false",
+        ENABLE_RESPONSE_CACHE="true" if args.with_cache else "false",
+        ENABLE_ADMISSION_CONTROL="true" if args.with_admission else "false",
+        ENABLE_LOOP_MONITOR="false",
+    )
+
+    from dotenv import load_dotenv
+    from mongoengine import connect
+
+    load_dotenv()
+    connect(db=os.getenv("DATABASE_NAME"), host=os.getenv("MONGODB_URI"))
+
+    result = asyncio.run(replay(args, records, capture_path))
+    with open(args.out, "w") as f:
+        json.dump(result, f)
+
+    print(f"build {result['build']}: {result['requests']} requests in {result['elapsed_s']} s, status {result['status']}")
+    for name, values in sorted(result["latency_ms"].items()):
+        print(f"  {name:22}", summarize(values))
+
+
+def cmd_compare(args) -> None:
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    print(f"baseline {baseline['build']}  vs  candidate {candidate['build']}")
+    regressions = 0
+    for name in sorted(set(baseline["latency_ms"]) | set(candidate["latency_ms"])):
+        before = summarize(baseline["latency_ms"].get(name, []))
+        after = summarize(candidate["latency_ms"].get(name, []))
+        cells = []
+        flagged = False
+        for q in ("p50", "p95", "p99"):
+            if before[q] is None or after[q] is None:
+                cells.append(f"{q} {before[q]} → {after[q]}")
+                continue
+            delta = (after[q] - before[q]) / before[q] * 100 if before[q] else 0.0
+            # Sub-millisecond stages are noise, not regressions
+            if q != "p99" and delta > args.threshold and after[q] - before[q] > args.min_ms:
+                flagged = True
+            cells.append(f"{q} {before[q]} → {after[q]} ({delta:+.1f}%)")
+        regressions += flagged
+        print(f"  {'REGRESSION ' if flagged else ''}{name:22}", " | ".join(cells))
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="replay captures against this build")
+    run.add_argument("captures", nargs="+", help="capture files (rotated backups included)")
+    run.add_argument("--out", required=True, help="result file for compare")
+    run.add_argument("--speed", type=float, default=1.0, help="1 = recorded rate, N = N× faster, 0 = unthrottled")
+    run.add_argument("--concurrency", type=int, default=64)
+    run.add_argument("--limit", type=int, default=0, help="replay only the first N requests")
+    run.add_argument("--label", default=None, help="build label (default: git short sha)")
+    run.add_argument("--with-cache", action="store_true")
+    run.add_argument("--with-admission", action="store_true")
+    run.set_defaults(func=cmd_run)
+
+    compare = commands.add_parser("compare", help="latency deltas between two replay results")
+    compare.add_argument("baseline")
+    compare.add_argument("candidate")
+    compare.add_argument("--threshold", type=float, default=10.0, help="%% slower at p50/p95 to flag")
+    compare.add_argument("--min-ms", type=float, default=1.0, help="ignore absolute deltas below this")
+    compare.add_argument("--fail-on-regression", action="store_true")
+    compare.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Sharded vs single-process retrieval + ranking against the real catalog.
+
+    MONGODB_URI=... DATABASE_NAME=... python -m benchmarks.sharded_search --shards 1,2,4,8
+
+Queries come from benchmarks/data/labeled_queries.jsonl (regex extraction
+only, no LLM). For each shard count every query runs through both paths;
+the script reports mean latency per path and any page whose _ids (or total) differ.
+Use --max-depth to widen the candidate pool, where sharding pays off.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import time
+
+from dotenv import load_dotenv
+from mongoengine import connect
+
+
+async def run(args, rows) -> None:
+    from app.routes.search import _rank
+    from app.utils import sharding
+    from app.utils.extractor import extract_hard_filters
+    from app.utils.hard_filter import hard_filter_vendors, hard_filter_venues
+    from app.utils.pagination import paginate_results
+
+    queries = [{"raw_query": row["query"], **extract_hard_filters(row["query"])} for row in rows]
+    top_n = args.page * args.limit
+
+    for shards in args.shards:
+        sharding.shutdown_shard_pool()
+        sharding.SEARCH_SHARDS = shards
+        sharding._partitions.clear()
+        # Spawn + connect the workers before timing
+        await sharding.sharded_search("vendor", queries[0], top_n, args.max_depth, args.threshold_ratio)
+
+        timings = {"single": 0.0, "sharded": 0.0}
+        mismatches = []
+        for query in queries:
+            for kind, hard_filter in (("vendor", hard_filter_vendors), ("venue", hard_filter_venues)):
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    single = _rank(
+                        await hard_filter(dict(query), top_n=top_n, max_depth=args.max_depth, threshold_ratio=args.threshold_ratio),
+                        dict(query), args.threshold_ratio,
+                    )
+                timings["single"] += time.perf_counter() - start
+
+                start = time.perf_counter()
+                items, total, _ = await sharding.sharded_search(kind, dict(query), top_n, args.max_depth, args.threshold_ratio)
+                timings["sharded"] += time.perf_counter() - start
+
+                expected = [item["_id"] for item in paginate_results(single, args.page, args.limit)["data"]]
+                got = [item["_id"] for item in paginate_results(items, args.page, args.limit, total_results=total)["data"]]
+                if expected != got or total != len(single):
+                    mismatches.append((kind, query["raw_query"]))
+
+        calls = 2 * len(queries)
+        print(f"shards={shards}", {
+            "single_ms": round(timings["single"] / calls * 1000, 1),
+            "sharded_ms": round(timings["sharded"] / calls * 1000, 1),
+            "mismatches": len(mismatches),
+        })
+        for kind, raw_query in mismatches:
+            print("  MISMATCH", kind, raw_query)
+
+    sharding.shutdown_shard_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default=os.path.join(os.path.dirname(__file__), "data", "labeled_queries.jsonl"))
+    parser.add_argument("--shards", default="1,2,4", type=lambda v: [int(x) for x in v.split(",")])
+    parser.add_argument("--page", type=int, default=1)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--max-depth", type=int, default=None)
+    parser.add_argument("--threshold-ratio", type=float, default=0.5)
+    args = parser.parse_args()
+
+    load_dotenv()
+    connect(db=os.getenv("DATABASE_NAME"), host=os.getenv("MONGODB_URI"))
+
+    from app.utils.bm25 import build_search_indexes
+    build_search_indexes()
+
+    with open(args.data) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+
+    asyncio.run(run(args, rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Search pipeline latency with and without speculative retrieval.
+
+    MONGODB_URI=... DATABASE_NAME=... python -m benchmarks.speculative --llm-ms 400
+
+The LLM is replaced by a fixed delay returning the labeled fields from
+benchmarks/data/labeled_queries.jsonl, so both runs see the same
+enrichment. Reports mean / p95 latency per mode, the reuse ratio, the DB
+time hidden behind the LLM, and any response whose page differs.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import time
+
+from dotenv import load_dotenv
+from mongoengine import connect
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * q))], 1)
+
+
+async def run(args, rows) -> None:
+    import app.utils.nlp_engine as nlp_engine
+    from app.models.request import SearchRequest
+    from app.routes.search import run_search_pipeline
+    from app.utils.metrics import snapshot
+
+    labeled = {row["query"]: row.get("expected") or {} for row in rows}
+
+    async def labeled_enrichment(query, extracted_filters):
+        await asyncio.sleep(args.llm_ms / 1000)
+        return {key: value for key, value in labeled.get(query, {}).items() if value is not None}
+
+    nlp_engine.enrich_with_llm = labeled_enrichment
+
+    pages = {}
+    for mode in ("off", "on"):
+        os.environ["ENABLE_SPECULATIVE_RETRIEVAL"] = "true" if mode == "on" else "false"
+        latencies = []
+        for row in rows:
+            payload = SearchRequest(query=row["query"], flag=row.get("flag") or "all", page=1, limit=args.limit)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                body = await run_search_pipeline(payload)
+            latencies.append((time.perf_counter() - start) * 1000)
+            pages.setdefault(row["query"], []).append(
+                [item["_id"] for key in ("vendors", "venues") for item in body[key]]
+            )
+        print(f"speculative={mode}", {
+            "mean_ms": round(sum(latencies) / len(latencies), 1),
+            "p95_ms": percentile(latencies, 0.95),
+        })
+
+    metrics = snapshot()
+    saved = metrics["histograms"].get("speculative.saved_ms", {})
+    print({
+        "reuse_ratio": metrics["gauges"].get("speculative.reuse_ratio"),
+        "saved_ms_mean": round(saved["sum"] / saved["count"], 1) if saved.get("count") else None,
+        **{name: count for name, count in sorted(metrics["counters"].items()) if name.startswith("speculative.")},
+    })
+    for query, (off, on) in pages.items():
+        if off != on:
+            print("  MISMATCH", query)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default=os.path.join(os.path.dirname(__file__), "data", "labeled_queries.jsonl"))
+    parser.add_argument("--llm-ms", type=float, default=400.0, help="simulated LLM latency")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ.update(ENABLE_LLM="true", ENABLE_LLM_BATCHING="false", ENABLE_SHARDED_SEARCH="false")
+    load_dotenv()
+    connect(db=os.getenv("DATABASE_NAME"), host=os.getenv("MONGODB_URI"))
+
+    from app.utils.bm25 import build_search_indexes
+    from app.utils.geo_resolver import load_geo_names
+    load_geo_names()
+    build_search_indexes()
+
+    with open(args.data) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+
+    asyncio.run(run(args, rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,169 @@
+import time
+from app.utils.warmup import record_import
+
+_import_start = time.perf_counter()
+
 import os
+import asyncio
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi import FastAPI
-from app.routes.search import router 
-from mongoengine import connect
+from app.routes.search import router, warm_search
+from mongoengine import connect, get_db
+from app.models.vendor_model import Vendor
+from app.models.venue_model import VenuePackage
+from app.utils.bm25 import build_search_indexes, is_bm25_enabled
+from app.utils.suggest import sync_suggest_index
+from app.utils.facets import build_facet_indexes
+from app.utils.data_version import compute_data_version, on_data_version_change, poll_data_version_loop, set_data_version
+from app.utils.extractor import warm_up_extractors
+from app.utils.llm import get_openai_client
+from app.utils.nlp_engine import is_llm_enabled
+from app.utils.warmup import run_warmup
+from app.utils.loop_monitor import monitor_event_loop
+from app.utils.offload import shutdown_offload_pools
+from app.utils.sharding import shutdown_shard_pool
+from app.utils.capture import stop_capture
+from app.utils.geo_resolver import GEO_REFRESH_SECONDS, load_geo_names
+from app.utils.materialized_geo import sync_geo_lists
+from app.utils.read_routing import PoolMetrics, connect_search_pool, warm_search_pool
+from app.utils.response_cache import get_response_cache
+from app.utils.cache_warming import cache_warming_loop, load_popular_queries, request_warming, save_popular_queries
+
+record_import("app", (time.perf_counter() - _import_start) * 1000)
 
 load_dotenv()
 
+DATABASE_NAME = os.getenv("DATABASE_NAME")
+MONGODB_URI = os.getenv("MONGODB_URI")
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "5"))
+SUGGEST_REFRESH_SECONDS = int(os.getenv("SUGGEST_REFRESH_SECONDS", "300"))
+
+
+def warm_mongo_pool():
+    # Ping forces client creation; minPoolSize keeps warm connections open
+    get_db().command("ping")
+    return f"ping ok (minPoolSize={MONGO_MIN_POOL_SIZE})"
+
+
+def ensure_mongo_indexes():
+    # Retrieval / sync indexes declared on the models (auto_create_index is off);
+    # no-op when they exist, skip with ENSURE_INDEXES=false on read-only users
+    if os.getenv("ENSURE_INDEXES", "true").lower() != "true":
+        return "disabled"
+    Vendor.ensure_indexes()
+    VenuePackage.ensure_indexes()
+    return "vendors, venuepackages"
+
+
+def load_bm25_indexes():
+    # BM25 text index is optional: ranking works without it
+    if not is_bm25_enabled():
+        return "disabled"
+    return build_search_indexes()
+
+
+def load_data_version():
+    set_data_version(compute_data_version())
+
+
+def warm_llm_client():
+    if not is_llm_enabled():
+        return "disabled (openai not imported)"
+    return "ready" if get_openai_client() is not None else "no api key"
+
+
+WARMUP_STEPS = [
+    # (name, fn, required)
+    ("mongo_pool", warm_mongo_pool, True),
+    ("mongo_indexes", ensure_mongo_indexes, False),
+    ("search_pool", warm_search_pool, False),
+    ("data_version", load_data_version, False),
+    # Before the indexes: venue city/state names come from it
+    ("geo_names", load_geo_names, False),
+    ("bm25_indexes", load_bm25_indexes, False),
+    ("facet_indexes", build_facet_indexes, False),
+    # After BM25 (text bonus) and geo names (venue labels)
+    ("geo_lists", sync_geo_lists, False),
+    ("suggest_index", sync_suggest_index, False),
+    ("extractors", warm_up_extractors, False),
+    ("llm_client", warm_llm_client, False),
+    ("popular_queries", load_popular_queries, False),
+]
+
+
+async def refresh_suggest_index_loop():
+    # Incremental: only changed documents touch the trie
+    while True:
+        await asyncio.sleep(SUGGEST_REFRESH_SECONDS)
+        try:
+            stats = await asyncio.to_thread(sync_suggest_index)
+            print("SUGGEST INDEX SYNCED:", stats)
+        except Exception as e:
+            print("SUGGEST INDEX SYNC FAILED:", str(e))
+
+
+async def refresh_geo_names_loop():
+    while True:
+        await asyncio.sleep(GEO_REFRESH_SECONDS)
+        try:
+            print("GEO NAMES REFRESHED:", await asyncio.to_thread(load_geo_names))
+        except Exception as e:
+            print("GEO NAMES REFRESH FAILED:", str(e))
+
+
+def rebuild_search_indexes(version: str):
+    if is_bm25_enabled():
+        print("BM25 INDEXES REBUILT:", build_search_indexes())
+    print("FACET INDEXES REBUILT:", build_facet_indexes())
+    print("GEO LISTS SYNCED:", sync_geo_lists())
+
+
+async def start_background_tasks():
+    await run_warmup(WARMUP_STEPS)
+
+    # Catalog changes rebuild BM25 / facets, then invalidate the response
+    # cache (cleared after the rebuild so nothing computed against the old
+    # indexes survives)
+    on_data_version_change(rebuild_search_indexes)
+    on_data_version_change(get_response_cache().clear)
+    # After the rebuild: re-warm popular queries against the new catalog
+    on_data_version_change(request_warming)
+    await asyncio.gather(
+        refresh_suggest_index_loop(),
+        refresh_geo_names_loop(),
+        poll_data_version_loop(),
+        cache_warming_loop(warm_search),
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    connect(db=DATABASE_NAME, host=MONGODB_URI, minPoolSize=MONGO_MIN_POOL_SIZE, event_listeners=[PoolMetrics("default")])
+    # Search reads on their own pool / read preference (ENABLE_SEARCH_READ_ROUTING)
+    print("SEARCH READ ROUTING:", connect_search_pool(DATABASE_NAME))
+
+    # Warm-up runs in the background: liveness is immediate,
+    # /api/v1/ready reports 200 only once every step has run
+    task = asyncio.create_task(start_background_tasks())
+    # Event-loop lag histogram + stack logs on stalls (watchdog thread)
+    monitor = asyncio.create_task(monitor_event_loop())
+    yield
+    task.cancel()
+    monitor.cancel()
+    shutdown_offload_pools()
+    shutdown_shard_pool()
+    stop_capture()
+    save_popular_queries()
+
+
 app = FastAPI(
     title="WedPlanners NLP Search API",
     version="1.0.0",
     description="LLM + Rule Based NLP Search (Vendor & Venue, Read-Only)",
-    docs_url="/docs"
+    docs_url="/docs",
+    lifespan=lifespan,
 )
-DATABASE_NAME = os.getenv("DATABASE_NAME")
-MONGODB_URI = os.getenv("MONGODB_URI")
-connect(db=DATABASE_NAME, host=MONGODB_URI)
 
 app.include_router(router, prefix="/api/v1")
 
@@ -22,4 +171,4 @@ app.include_router(router, prefix="/api/v1")
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8050)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8050)
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from app.utils.admission import (
+    TIER_CACHE_ONLY,
+    TIER_NORMAL,
+    TIER_SHRINK_POOL,
+    TIER_SKIP_LLM,
+    AdmissionController,
+    Overloaded,
+    StageLimiter,
+)
+
+
+@pytest.mark.parametrize("busy, tier", [
+    (0, TIER_NORMAL),
+    (2, TIER_NORMAL),
+    (3, TIER_SKIP_LLM),      # load 0.75
+    (4, TIER_SHRINK_POOL),   # load 1.0
+    (5, TIER_SHRINK_POOL),
+    (6, TIER_CACHE_ONLY),    # load 1.5
+    (9, TIER_CACHE_ONLY),
+])
+def test_tier_follows_load(busy, tier):
+    controller = AdmissionController(max_inflight=4, max_queue=8, queue_timeout_ms=100)
+    controller.inflight = min(busy, 4)
+    controller.queued = busy - controller.inflight
+    assert controller.tier() == tier
+
+
+def test_queued_requests_raise_the_tier():
+    async def run():
+        controller = AdmissionController(max_inflight=2, max_queue=4, queue_timeout_ms=1000)
+        release = asyncio.Event()
+        tiers = []
+
+        async def request():
+            tiers.append(controller.tier())
+            async with controller.admit():
+                await release.wait()
+
+        tasks = [asyncio.create_task(request()) for _ in range(4)]
+        await asyncio.sleep(0.01)
+        load = controller.load()
+        release.set()
+        await asyncio.gather(*tasks)
+        return tiers, load, controller.inflight, controller.queued
+
+    tiers, load, inflight, queued = asyncio.run(run())
+    # Arrivals see load 0, 0.5, 1.0 (both slots busy), 1.5 (one queued)
+    assert tiers == [TIER_NORMAL, TIER_NORMAL, TIER_SHRINK_POOL, TIER_CACHE_ONLY]
+    assert load == 2.0
+    assert (inflight, queued) == (0, 0)
+
+
+def test_full_queue_is_rejected():
+    async def run():
+        controller = AdmissionController(max_inflight=1, max_queue=1, queue_timeout_ms=1000)
+        release = asyncio.Event()
+
+        async def request():
+            async with controller.admit():
+                await release.wait()
+
+        running = asyncio.create_task(request())
+        waiting = asyncio.create_task(request())
+        await asyncio.sleep(0.01)
+        try:
+            with pytest.raises(Overloaded):
+                async with controller.admit():
+                    pass
+        finally:
+            release.set()
+            await asyncio.gather(running, waiting)
+
+    asyncio.run(run())
+
+
+def test_queue_wait_times_out():
+    async def run():
+        controller = AdmissionController(max_inflight=1, max_queue=4, queue_timeout_ms=20)
+        async with controller.admit():
+            with pytest.raises(Overloaded):
+                async with controller.admit():
+                    pass
+        return controller.queued
+
+    assert asyncio.run(run()) == 0
+
+
+def test_stage_limiter_does_not_queue():
+    async def run():
+        limiter = StageLimiter("test", 1)
+        first = await limiter.try_acquire()
+        second = await limiter.try_acquire()
+        limiter.release()
+        third = await limiter.try_acquire()
+        return first, second, third
+
+    assert asyncio.run(run()) == (True, False, True)
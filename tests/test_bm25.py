@@ -0,0 +1,44 @@
+import math
+
+from app.utils.bm25 import BM25Index, query_terms
+
+
+DOCS = [
+    ("a", "royal photography studio delhi"),
+    ("b", "dream decor and photography"),
+    ("c", "golden caterers"),
+    ("d", "photography photography candid"),
+    ("e", "lake banquet delhi"),
+]
+
+
+def brute_force(index, terms, doc_ids):
+    scores = {}
+    for ordinal, doc_id in enumerate(index.doc_ids):
+        if doc_id not in doc_ids:
+            continue
+        tokens = dict(DOCS)[doc_id].split()
+        score = sum(
+            index._term_score(index.idf[t], tokens.count(t), len(tokens))
+            for t in dict.fromkeys(terms) if t in index.idf and t in tokens
+        )
+        if score > 0:
+            scores[doc_id] = score
+    return scores
+
+
+def test_scores_every_matching_candidate():
+    index = BM25Index.build(DOCS)
+    terms = query_terms({"raw_query": "photography in delhi"})
+    everyone = {doc_id for doc_id, _ in DOCS}
+
+    for allowed in (everyone, {"a", "e"}, {"c"}):
+        got = index.score(terms, allowed=index.ordinals(allowed))
+        want = brute_force(index, terms, allowed)
+        assert got.keys() == want.keys()
+        assert all(math.isclose(got[d], want[d]) for d in want)
+
+
+def test_unknown_terms_score_nothing():
+    index = BM25Index.build(DOCS)
+    assert index.score(["zzz"]) == {}
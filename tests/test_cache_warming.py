@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from app.models.request import SearchRequest
+from app.utils.cache_warming import PopularQueries
+from app.utils.response_cache import cache_key
+
+
+T0 = 1_700_000_000.0
+HOUR = 3600.0
+
+
+def request(query, **fields):
+    payload = SearchRequest(query=query, flag="vendor", **fields)
+    return cache_key(payload), payload.model_dump()
+
+
+def test_counts_decay_by_half_life():
+    popular = PopularQueries(half_life=HOUR)
+    key, payload = request("photographers in delhi")
+    for _ in range(4):
+        popular.record(key, payload, now=T0)
+
+    assert popular.top(1, now=T0)[0][0] == pytest.approx(4.0)
+    assert popular.top(1, now=T0 + HOUR)[0][0] == pytest.approx(2.0)
+
+    # A new hit adds 1 on top of the decayed count
+    popular.record(key, payload, now=T0 + 2 * HOUR)
+    assert popular.top(1, now=T0 + 2 * HOUR)[0][0] == pytest.approx(2.0)
+    assert popular.top(1, min_score=2.5, now=T0 + 2 * HOUR) == []
+
+
+def test_prune_keeps_the_most_popular():
+    popular = PopularQueries(half_life=HOUR, max_tracked=10)
+    old_key, old_payload = request("old favourite")
+    for _ in range(5):
+        popular.record(old_key, old_payload, now=T0)
+
+    # One hit each, 10 half-lives later: the old entry decayed to ~0.005
+    later = T0 + 10 * HOUR
+    for i in range(10):
+        popular.record(*request(f"query {i}"), now=later)
+    assert len(popular.entries) == 11  # within the 10% slack
+
+    popular.record(*request("query 10"), now=later)
+    assert len(popular.entries) == 10
+    assert old_key not in popular.entries
+
+
+def test_dump_and_restore_round_trip():
+    popular = PopularQueries(half_life=HOUR)
+    keys = []
+    for i, hits in enumerate((3, 1, 2)):
+        key, payload = request(f"venues in city {i}", page=i + 1)
+        keys.append(key)
+        for _ in range(hits):
+            popular.record(key, payload, now=T0)
+
+    # Through JSON, as written to WARM_STATS_PATH
+    restored = PopularQueries(half_life=HOUR)
+    assert restored.restore(json.loads(json.dumps(popular.dump()))) == 3
+
+    assert set(restored.entries) == set(keys)
+    assert restored.top(3, now=T0 + HOUR) == popular.top(3, now=T0 + HOUR)
+
+    # Restored entries keep counting under the same key
+    restored.record(keys[1], popular.entries[keys[1]][2], now=T0)
+    assert len(restored.entries) == 3
+    assert restored.entries[keys[1]][0] == pytest.approx(2.0)
@@ -0,0 +1,46 @@
+import json
+
+from app.models.request import SearchRequest
+from app.utils import capture
+from app.utils.capture import begin_capture, end_capture, note, stage_timer, stop_capture
+from benchmarks.replay import load_records
+
+
+def test_capture_replay_round_trip(monkeypatch, tmp_path):
+    path = tmp_path / "search.jsonl"
+    monkeypatch.setenv("ENABLE_QUERY_CAPTURE", "true")
+    monkeypatch.setattr(capture, "CAPTURE_PATH", str(path))
+    monkeypatch.setattr(capture, "CAPTURE_SAMPLE_RATE", 1.0)
+
+    payloads = [
+        SearchRequest(query="photographers in noida", flag="vendor", page=2, fields=["vendorName", "city"]),
+        SearchRequest(query="banquet under 2 lakh", flag="venue", facets=True, threshold_ratio=0.5),
+    ]
+    for payload in payloads:
+        token = begin_capture(payload)
+        note("llm_enrichment", {"city": "Noida", "semantic_tags": ["photography"]})
+        with stage_timer("retrieve.vendor"):
+            pass
+        end_capture(token, status=200, cache="MISS")
+    stop_capture()
+
+    records = load_records([str(path)])
+    # Replay sends the captured payload as-is: it must rebuild the same request
+    assert [SearchRequest(**record["payload"]) for record in records] == payloads
+    assert records[0]["llm_enrichment"] == {"city": "Noida", "semantic_tags": ["photography"]}
+    assert set(records[0]["stages_ms"]) == {"retrieve.vendor"}
+    assert records[0]["status"] == 200 and records[0]["cache"] == "MISS"
+    assert "_start" not in records[0]
+    assert json.loads(path.read_text().splitlines()[1])["ts"] >= records[0]["ts"]
+
+
+def test_unsampled_requests_are_not_captured(monkeypatch, tmp_path):
+    monkeypatch.setenv("ENABLE_QUERY_CAPTURE", "true")
+    monkeypatch.setattr(capture, "CAPTURE_PATH", str(tmp_path / "search.jsonl"))
+    monkeypatch.setattr(capture, "CAPTURE_SAMPLE_RATE", 0.0)
+
+    token = begin_capture(SearchRequest(query="decor", flag="vendor"))
+    assert token is None
+    end_capture(token, status=200)
+    stop_capture()
+    assert not (tmp_path / "search.jsonl").exists()
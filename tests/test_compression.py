@@ -0,0 +1,48 @@
+import gzip
+
+import pytest
+
+from app.utils import compression, offload
+from app.utils.compression import choose_encoding, compress
+
+
+BIG = 1 << 16
+
+
+@pytest.fixture
+def with_brotli(monkeypatch):
+    # Only the presence matters for choose_encoding
+    monkeypatch.setitem(offload._optional_modules, "brotli", object())
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("br;q=0.1, gzip;q=1.0", "gzip"),
+    ("gzip;q=0.5, br", "br"),
+    ("gzip, br", "br"),            # tie → brotli
+    ("br;q=0, gzip;q=0.2", "gzip"),
+    ("br;q=0, gzip;q=0", None),
+    ("gzip;q=0, *", "br"),
+    ("br; q=0.3 , GZIP;level=1;q=0.9", "gzip"),
+    ("br;q=abc, gzip;q=0.1", "gzip"),  # malformed q → not acceptable
+    ("identity", None),
+])
+def test_highest_q_wins(with_brotli, header, expected):
+    assert choose_encoding(header, BIG) == expected
+
+
+def test_without_brotli(monkeypatch):
+    monkeypatch.setitem(offload._optional_modules, "brotli", None)
+    assert choose_encoding("br;q=1.0, gzip;q=0.1", BIG) == "gzip"
+    assert choose_encoding("br", BIG) is None
+
+
+def test_small_or_disabled(with_brotli, monkeypatch):
+    assert choose_encoding("gzip", compression.COMPRESS_MIN_BYTES - 1) is None
+    assert choose_encoding(None, BIG) is None
+    monkeypatch.setenv("ENABLE_COMPRESSION", "false")
+    assert choose_encoding("gzip", BIG) is None
+
+
+def test_gzip_round_trip():
+    body = b'{"vendors": []}' * 200
+    assert gzip.decompress(compress(body, "gzip")) == body
@@ -0,0 +1,55 @@
+import random
+from collections import Counter
+
+from app.utils.facets import EXPERIENCE_BANDS, VENDOR_FACETS, FacetIndex, band
+
+
+CITIES = ["Delhi", "Noida", "Gurgaon", "Pune", None]
+STATES = ["Delhi", "Uttar Pradesh", "Haryana", "Maharashtra", None]
+
+
+def make_docs(n=500, seed=7):
+    rng = random.Random(seed)
+    return [
+        (f"v{i:04d}", {
+            "city": rng.choice(CITIES),
+            "state": rng.choice(STATES),
+            "experience_band": band(rng.choice([None, 0, 2, 4, 7, 15]), EXPERIENCE_BANDS),
+        })
+        for i in range(n)
+    ]
+
+
+def brute_force(docs, ids):
+    # Straight count over the result docs, same labels / ordering as FacetIndex
+    wanted = set(ids)
+    facets = {}
+    for name in VENDOR_FACETS:
+        counts = Counter(values[name] for doc_id, values in docs if doc_id in wanted and values[name] is not None)
+        facets[name] = dict(sorted(counts.items(), key=lambda x: (-x[1], x[0])))
+    return facets
+
+
+def test_counts_match_brute_force():
+    docs = make_docs()
+    index = FacetIndex(VENDOR_FACETS)
+    for doc_id, values in docs:
+        index.add(doc_id, values)
+    index.finalize()
+
+    rng = random.Random(11)
+    all_ids = [doc_id for doc_id, _ in docs]
+    for size in (0, 1, 37, 250, len(all_ids)):
+        ids = rng.sample(all_ids, size)
+        assert index.counts(ids) == brute_force(docs, ids)
+
+
+def test_unknown_ids_are_ignored():
+    docs = make_docs(50)
+    index = FacetIndex(VENDOR_FACETS)
+    for doc_id, values in docs:
+        index.add(doc_id, values)
+    index.finalize()
+
+    ids = ["v0001", "v0002", "missing"]
+    assert index.counts(ids) == brute_force(docs, ids)
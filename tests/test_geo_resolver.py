@@ -0,0 +1,68 @@
+import asyncio
+import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.utils import geo_resolver
+from app.utils.geo_resolver import GeoResolver
+
+
+# Two cities named Aurangabad (Maharashtra / Bihar), stored with different spacing/case
+AURANGABAD_MH = ObjectId("65a000000000000000000011")
+AURANGABAD_BR = ObjectId("65a000000000000000000012")
+PUNE = ObjectId("65a000000000000000000013")
+CITY_ROWS = [
+    {"_id": AURANGABAD_MH, "name": "Aurangabad"},
+    {"_id": AURANGABAD_BR, "name": "aurangabad "},
+    {"_id": PUNE, "name": "Pune"},
+]
+
+
+def test_duplicate_city_names_resolve_to_every_id():
+    resolver = GeoResolver()
+    resolver.load("city", CITY_ROWS)
+
+    assert resolver.resolve("city", "AURANGABAD") == [AURANGABAD_MH, AURANGABAD_BR]
+    assert resolver.resolve("city", "  Aurangabad") == [AURANGABAD_MH, AURANGABAD_BR]
+    assert resolver.resolve("city", "Pune") == [PUNE]
+    assert resolver.resolve("city", "Nagpur") == []
+
+    # Each id keeps its own stored name
+    assert resolver.name_of("city", AURANGABAD_MH) == "Aurangabad"
+    assert resolver.name_of("city", str(AURANGABAD_BR)) == "aurangabad "
+    # Unknown ids fall back to their hex, plain names pass through
+    assert resolver.name_of("city", ObjectId("65a0000000000000000000ff")) == "65a0000000000000000000ff"
+    assert resolver.name_of("city", "Delhi") == "Delhi"
+
+
+def test_venue_city_filter_covers_duplicate_names(monkeypatch):
+    mongomock = pytest.importorskip("mongomock")
+    from mongoengine import connect, disconnect
+
+    from app.models.venue_model import VenuePackage
+    from app.utils.hard_filter import hard_filter_venues
+
+    monkeypatch.setenv("ENABLE_SEARCH_READ_ROUTING", "false")
+    monkeypatch.setenv("ENABLE_BM25", "false")
+    resolver = GeoResolver()
+    resolver.load("city", CITY_ROWS)
+    resolver.load("state", [])
+    monkeypatch.setattr(geo_resolver, "_RESOLVER", resolver)
+
+    disconnect()
+    connect("geo_resolver_test", host="mongodb://localhost", mongo_client_class=mongomock.MongoClient)
+    try:
+        created = datetime.datetime(2024, 1, 1)
+        VenuePackage._get_collection().insert_many([
+            {"title": "Lake Lawn", "visibility": "public", "location": {"city": AURANGABAD_MH}, "createdAt": created},
+            {"title": "Grand Hall", "visibility": "public", "location": {"city": AURANGABAD_BR}, "createdAt": created},
+            {"title": "Pune Resort", "visibility": "public", "location": {"city": PUNE}, "createdAt": created},
+        ])
+
+        results = asyncio.run(hard_filter_venues({"city": "aurangabad"}, threshold_ratio=0.2))
+    finally:
+        disconnect()
+
+    assert sorted(item["venueName"] for item in results) == ["Grand Hall", "Lake Lawn"]
+    assert {item["city"] for item in results} == {"Aurangabad", "aurangabad "}
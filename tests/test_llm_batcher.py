@@ -0,0 +1,47 @@
+import asyncio
+
+from app.utils import llm_batcher
+from app.utils.llm_batcher import LLMBatcher
+
+
+def test_failed_batch_call_does_not_fan_out(monkeypatch):
+    single_calls = []
+
+    async def failing_batch(items):
+        raise RuntimeError("rate limited")
+
+    async def single(query, extracted_filters):
+        single_calls.append(query)
+        return {"city": "Delhi"}
+
+    monkeypatch.setattr(llm_batcher, "enrich_batch", failing_batch)
+    monkeypatch.setattr(llm_batcher, "enrich_with_llm", single)
+
+    async def run():
+        batcher = LLMBatcher(window_ms=1, max_batch=4)
+        return await asyncio.gather(*(batcher.submit(f"query {i}", {}) for i in range(4)))
+
+    results = asyncio.run(run())
+    assert single_calls == []
+    assert all(result["llm_skipped"] is True for result in results)
+
+
+def test_ids_missing_from_the_batch_fall_back_to_single_calls(monkeypatch):
+    single_calls = []
+
+    async def partial_batch(items):
+        return {0: {"city": "Noida"}}
+
+    async def single(query, extracted_filters):
+        single_calls.append(query)
+        return {"city": "Delhi"}
+
+    monkeypatch.setattr(llm_batcher, "enrich_batch", partial_batch)
+    monkeypatch.setattr(llm_batcher, "enrich_with_llm", single)
+
+    async def run():
+        batcher = LLMBatcher(window_ms=1, max_batch=2)
+        return await asyncio.gather(batcher.submit("a", {}), batcher.submit("b", {}))
+
+    assert asyncio.run(run()) == [{"city": "Noida"}, {"city": "Delhi"}]
+    assert single_calls == ["b"]
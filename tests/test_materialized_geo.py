@@ -0,0 +1,129 @@
+import asyncio
+import datetime
+import random
+
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+from bson import ObjectId
+from mongoengine import connect, disconnect
+
+from app.models.vendor_model import Vendor
+from app.routes.search import _rank
+from app.utils import bm25, materialized_geo
+from app.utils.bm25 import build_search_indexes
+from app.utils.hard_filter import hard_filter_vendors
+from app.utils.materialized_geo import materialized_search, sync_geo_lists
+
+
+CITIES = {"Delhi": "Delhi", "Noida": "Uttar Pradesh", "Pune": "Maharashtra"}
+START = datetime.datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    monkeypatch.setenv("ENABLE_MATERIALIZED_GEO", "true")
+    monkeypatch.setenv("ENABLE_SEARCH_READ_ROUTING", "false")
+    disconnect()
+    connect("materialized_geo_test", host="mongodb://localhost", mongo_client_class=mongomock.MongoClient)
+
+    rng = random.Random(5)
+    docs = []
+    for i in range(300):
+        city = rng.choice(list(CITIES))
+        docs.append({
+            "_id": ObjectId(),
+            # Some names mention the city: BM25 splits the list's scores
+            "vendorName": f"{rng.choice(['Royal', 'Noida', 'Plain'])} studio {i}",
+            "city": city,
+            "state": CITIES[city],
+            "locality": f"Sector {rng.randint(1, 6)}",
+            "lastActive": START + datetime.timedelta(days=rng.randint(0, 15)),
+            "updatedAt": START,
+        })
+    Vendor._get_collection().insert_many(docs)
+
+    saved = dict(bm25._INDEXES)
+    build_search_indexes()
+    materialized_geo._INDEXES.clear()
+    sync_geo_lists()
+    yield
+    materialized_geo._INDEXES.clear()
+    bm25._INDEXES.clear()
+    bm25._INDEXES.update(saved)
+    disconnect()
+
+
+def both_paths(query, top_n, ratio):
+    async def run():
+        served = await materialized_search("vendor", dict(query), top_n, ratio)
+        ranked = _rank(await hard_filter_vendors(dict(query), top_n=top_n, threshold_ratio=ratio), dict(query), ratio)
+        return served, ranked
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("bm25_enabled", ["false", "true"])
+@pytest.mark.parametrize("query", [
+    {"raw_query": "vendors in Delhi", "city": "Delhi"},
+    {"raw_query": "Noida", "city": "Noida"},
+    {"raw_query": "Maharashtra", "state": "Maharashtra"},
+    {"raw_query": "sector 3", "locality": "Sector 3"},
+])
+def test_matches_retrieval_and_ranking(catalog, monkeypatch, bm25_enabled, query):
+    monkeypatch.setenv("ENABLE_BM25", bm25_enabled)
+    sync_geo_lists()
+    if bm25_enabled == "true" and query["raw_query"] == "vendors in Delhi":
+        query = dict(query, raw_query="Delhi")  # terms must be the value's own words
+
+    for top_n, ratio in ((10, 0.2), (30, 0.9)):
+        served, ranked = both_paths(query, top_n, ratio)
+        if served is None:
+            # Low threshold: retrieval also reads (and BM25 lifts) docs outside the locality
+            assert "locality" in query and bm25_enabled == "true" and ratio == 0.2
+            continue
+        items, total, ids = served
+
+        assert [item["_id"] for item in items] == [item["_id"] for item in ranked[:top_n]]
+        assert [item["_score"] for item in items] == [item["_score"] for item in ranked[:top_n]]
+        assert total == len(ranked)
+        assert ids == [item["_id"] for item in ranked]
+
+
+def test_not_served(catalog, monkeypatch):
+    monkeypatch.setenv("ENABLE_BM25", "true")
+    sync_geo_lists()
+    # Another signal besides geo, unknown value, extra query words
+    assert asyncio.run(materialized_search("vendor", {"city": "Delhi", "min_experience": 5}, 10, 0.2)) is None
+    assert asyncio.run(materialized_search("vendor", {"city": "Mumbai"}, 10, 0.2)) is None
+    assert asyncio.run(materialized_search("vendor", {"raw_query": "royal delhi", "city": "Delhi"}, 10, 0.2)) is None
+
+    # Lists ranked with the BM25 bonus, flag switched off since the last sync
+    monkeypatch.setenv("ENABLE_BM25", "false")
+    assert asyncio.run(materialized_search("vendor", {"city": "Delhi"}, 10, 0.2)) is None
+
+
+def test_incremental_sync(catalog, monkeypatch):
+    monkeypatch.setenv("ENABLE_BM25", "false")
+    sync_geo_lists()
+    collection = Vendor._get_collection()
+    moved = collection.find_one({"city": "Pune"})
+    deleted = collection.find_one({"city": "Delhi"})
+
+    # Moved to Noida and most recently active; another vendor deleted
+    collection.update_one({"_id": moved["_id"]}, {"$set": {
+        "city": "Noida", "state": "Uttar Pradesh",
+        "lastActive": START + datetime.timedelta(days=30),
+        "updatedAt": START + datetime.timedelta(days=1),
+    }})
+    collection.delete_one({"_id": deleted["_id"]})
+    stats = sync_geo_lists()
+    assert stats["vendor"]["rebuilt"] > 0
+
+    noida, _, _ = asyncio.run(materialized_search("vendor", {"city": "Noida"}, 10, 0.2))
+    _, pune_total, pune_ids = asyncio.run(materialized_search("vendor", {"city": "Pune"}, 10, 0.2))
+    _, delhi_total, delhi_ids = asyncio.run(materialized_search("vendor", {"city": "Delhi"}, 10, 0.2))
+
+    assert noida[0]["_id"] == str(moved["_id"])
+    assert str(moved["_id"]) not in pune_ids and pune_total == collection.count_documents({"city": "Pune"})
+    assert str(deleted["_id"]) not in delhi_ids and delhi_total == collection.count_documents({"city": "Delhi"})
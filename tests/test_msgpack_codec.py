@@ -0,0 +1,44 @@
+import pytest
+
+pytest.importorskip("msgpack")
+
+from app.utils.msgpack_codec import decode_request, decode_response, encode_msgpack_response, encode_request
+
+
+def test_request_round_trip():
+    payload = {"query": "photographers in delhi", "flag": "vendor", "page": 2, "limit": 20,
+               "fields": ["vendorName", "city"], "include_structured_query": False}
+    request = decode_request(encode_request(payload))
+
+    assert request.query == "photographers in delhi"
+    assert request.flag == "vendor"
+    assert (request.page, request.limit) == (2, 20)
+    assert request.fields == ["vendorName", "city"]
+    assert request.include_structured_query is False
+    assert request.facets is False  # omitted trailing value → model default
+
+
+@pytest.mark.parametrize("values", [
+    b"\xc1",                       # not msgpack
+    encode_request({"query": "x"}),  # flag missing
+])
+def test_invalid_request(values):
+    with pytest.raises(ValueError):
+        decode_request(values)
+
+
+def test_out_of_range_limit():
+    with pytest.raises(ValueError):
+        decode_request(encode_request({"query": "x", "flag": "all", "limit": 500}))
+
+
+def test_response_round_trip():
+    body = {
+        "vendors": [
+            {"_id": "65a000000000000000000001", "vendorName": "Royal Studio", "city": "Delhi", "_score": 80},
+            {"_id": "65a000000000000000000002", "vendorName": "Dream Decor", "city": None, "_score": 50},
+        ],
+        "venues": [],
+        "pagination": {"page": 1, "total_vendor_results": 2},
+    }
+    assert decode_response(encode_msgpack_response(body)) == body
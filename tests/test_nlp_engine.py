@@ -0,0 +1,30 @@
+import asyncio
+
+import pytest
+
+from app.utils import nlp_engine
+from app.utils.deadline import end_deadline, start_deadline
+
+
+@pytest.mark.parametrize("deadline_ms", ["600", "1000"])  # LLM skipped / LLM timed out
+def test_deadline_degraded_enrichment_is_flagged(monkeypatch, deadline_ms):
+    monkeypatch.setenv("ENABLE_LLM", "true")
+    monkeypatch.setenv("ENABLE_LLM_BATCHING", "false")
+
+    async def slow_enrichment(query, extracted_filters):
+        await asyncio.sleep(5)
+        return {"city": "Delhi"}
+
+    monkeypatch.setattr(nlp_engine, "enrich_with_llm", slow_enrichment)
+
+    async def run():
+        token = start_deadline(deadline_ms)
+        try:
+            return await nlp_engine.run_nlp_engine(query="photographers", flag="vendor")
+        finally:
+            end_deadline(token)
+
+    structured_query = asyncio.run(run())
+    # Raises the degradation tier → the response is not cached
+    assert structured_query["llm_skipped"] is True
+    assert structured_query.get("city") is None
@@ -0,0 +1,81 @@
+import copy
+
+import pytest
+
+from app.utils import bm25
+from app.utils.bm25 import BM25Index
+from app.utils.hard_filter import progressive_fetch, text_margin
+from app.utils.ranker import rank_results
+
+
+STRUCTURED_QUERY = {"raw_query": "royal", "city": "Delhi"}
+TIERS = [({}, 50)]  # single tier, every doc can score at most 50 (city)
+
+
+def vendor(i, name):
+    return {"_id": f"v{i:03d}", "vendorName": name, "city": "Delhi", "lastActive": f"2024-01-{99 - i:02d}"}
+
+
+POOL = [vendor(i, "Royal Studio" if i == 55 else f"Plain Decor {i}") for i in range(80)]
+
+
+def top_ids(items, top_n=10):
+    return [item["_id"] for item in rank_results(copy.deepcopy(items), STRUCTURED_QUERY)[:top_n]]
+
+
+# Locality split: matching docs can score 100, the rest at most 50
+LOCALITY_QUERY = {"raw_query": "royal", "city": "Delhi", "locality": "Sector 5"}
+LOCALITY_TIERS = [({"locality__icontains": "Sector 5"}, 100), ({"locality__not__icontains": "Sector 5"}, 50)]
+LOCALITY_POOL = [dict(vendor(i, f"Plain Decor {i}"), locality="Sector 5" if i % 4 == 0 else "Sector 9") for i in range(80)]
+
+
+def fetch(top_n=10, threshold_ratio=0.2):
+    return progressive_fetch(None, TIERS, None, STRUCTURED_QUERY, "vendor", top_n, pool=POOL, threshold_ratio=threshold_ratio)
+
+
+def test_results_do_not_depend_on_the_page(monkeypatch):
+    monkeypatch.setenv("ENABLE_BM25", "false")
+
+    # Same candidates (so same totals and facets) for page 1 and page 5
+    assert fetch(top_n=10) == fetch(top_n=50) == POOL
+
+
+def test_skips_tiers_below_the_threshold(monkeypatch):
+    monkeypatch.setenv("ENABLE_BM25", "false")
+    fetch_tiers = lambda ratio: progressive_fetch(
+        None, LOCALITY_TIERS, None, LOCALITY_QUERY, "vendor", 10, pool=LOCALITY_POOL, threshold_ratio=ratio,
+    )
+
+    # Best score 100 → threshold 60 > 50: the non-matching tier can't pass
+    assert len(fetch_tiers(0.6)) == 20
+    # Threshold 20: the non-matching tier can still pass
+    assert len(fetch_tiers(0.2)) == 80
+
+
+def test_bm25_bonus_widens_the_bound(monkeypatch):
+    monkeypatch.setenv("ENABLE_BM25", "true")
+    index = BM25Index.build((item["_id"], item["vendorName"]) for item in POOL)
+    monkeypatch.setitem(bm25._INDEXES, "vendor", index)
+    results = fetch()
+
+    # The text match is read and outranks everything
+    assert "v055" in [item["_id"] for item in results]
+    assert top_ids(results) == top_ids(POOL)
+    assert top_ids(POOL)[0] == "v055"
+
+
+def test_no_margin_without_postings(monkeypatch):
+    monkeypatch.setenv("ENABLE_BM25", "true")
+    index = BM25Index.build((item["_id"], item["vendorName"]) for item in POOL)
+    monkeypatch.setitem(bm25._INDEXES, "vendor", index)
+    assert text_margin("vendor", STRUCTURED_QUERY) == 30
+
+    # No query term is indexed → no doc gets a bonus → tier bounds stay tight
+    query = dict(LOCALITY_QUERY, raw_query="zzz")
+    assert text_margin("vendor", query) == 0
+    results = progressive_fetch(None, LOCALITY_TIERS, None, query, "vendor", 10, pool=LOCALITY_POOL, threshold_ratio=0.6)
+    assert len(results) == 20
+
+    # An indexed term: +30 could lift a non-matching doc over the threshold
+    results = progressive_fetch(None, LOCALITY_TIERS, None, LOCALITY_QUERY, "vendor", 10, pool=LOCALITY_POOL, threshold_ratio=0.6)
+    assert len(results) == 80
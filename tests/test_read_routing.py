@@ -0,0 +1,48 @@
+import asyncio
+
+from app.utils import data_version, read_routing
+from app.utils.response_cache import ResponseCache
+
+
+def route_to_secondaries(monkeypatch, max_staleness=90):
+    monkeypatch.setattr(read_routing, "_search_alias_connected", True)
+    monkeypatch.setattr(read_routing, "SEARCH_READ_PREFERENCE", "secondaryPreferred")
+    monkeypatch.setattr(read_routing, "SEARCH_MAX_STALENESS_SECONDS", max_staleness)
+
+
+def test_primary_reads_are_always_settled():
+    assert read_routing.search_reads_settle_in() == 0
+
+
+def test_secondary_reads_settle_after_max_staleness(monkeypatch):
+    route_to_secondaries(monkeypatch)
+    monkeypatch.setattr(data_version, "_changed_at", data_version._changed_at)
+
+    data_version._changed_at -= 30
+    assert not read_routing.search_reads_settled()
+    assert 60 < read_routing.search_reads_settle_in() <= 70
+
+    data_version._changed_at -= 100
+    assert read_routing.search_reads_settled()
+
+
+def test_no_staleness_limit_never_settles(monkeypatch):
+    route_to_secondaries(monkeypatch, max_staleness=-1)
+    assert read_routing.search_reads_settle_in() is None
+
+
+def test_unsettled_secondary_reads_are_not_cached(monkeypatch):
+    route_to_secondaries(monkeypatch)
+    monkeypatch.setattr(data_version, "_changed_at", data_version._changed_at)
+    data_version._changed_at = data_version.time.monotonic()
+
+    async def compute():
+        return b"{}", 0
+
+    async def run():
+        cache = ResponseCache()
+        first = await cache.get_or_compute(("q",), compute)
+        second = await cache.get_or_compute(("q",), compute)
+        return first[1], second[1]
+
+    assert asyncio.run(run()) == ("MISS", "MISS")
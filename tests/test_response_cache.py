@@ -0,0 +1,87 @@
+import asyncio
+import threading
+
+from app.utils import data_version
+from app.utils.response_cache import ResponseCache
+
+
+def make_compute(body=b"{}", tier=0, calls=None, before=None):
+    async def compute():
+        if calls is not None:
+            calls.append(1)
+        if before is not None:
+            await before()
+        return body, tier
+    return compute
+
+
+def test_hit_after_miss():
+    async def run():
+        cache = ResponseCache()
+        _, first = await cache.get_or_compute(("q",), make_compute())
+        _, second = await cache.get_or_compute(("q",), make_compute())
+        return first, second
+
+    assert asyncio.run(run()) == ("MISS", "HIT")
+
+
+def test_degraded_tier_is_shared_not_stored():
+    async def run():
+        cache = ResponseCache()
+        calls = []
+        gate = asyncio.Event()
+        compute = make_compute(tier=1, calls=calls, before=gate.wait)
+        leader = asyncio.create_task(cache.get_or_compute(("q",), compute))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache.get_or_compute(("q",), compute))
+        await asyncio.sleep(0)
+        gate.set()
+        statuses = [status for _, status in await asyncio.gather(leader, follower)]
+        return statuses, len(calls), ("q",) in cache.entries
+
+    statuses, calls, stored = asyncio.run(run())
+    assert statuses == ["MISS", "COALESCED"]
+    assert calls == 1
+    assert not stored
+
+
+def test_version_change_invalidates():
+    async def run():
+        cache = ResponseCache()
+        await cache.get_or_compute(("q",), make_compute())
+        data_version._version = "other"
+        return cache.get(("q",))
+
+    saved = data_version._version
+    try:
+        assert asyncio.run(run()) is None
+    finally:
+        data_version._version = saved
+
+
+def test_clear_from_worker_thread_runs_on_loop():
+    async def run():
+        cache = ResponseCache()
+        await cache.get_or_compute(("q",), make_compute())
+        cleared_on = []
+        cache._clear = lambda: cleared_on.append(threading.current_thread())
+        await asyncio.to_thread(cache.clear, "v2")
+        await asyncio.sleep(0)
+        return cleared_on
+
+    assert asyncio.run(run()) == [threading.main_thread()]
+
+
+def test_computation_overlapping_clear_is_not_stored():
+    async def run():
+        cache = ResponseCache()
+
+        async def clear_midway():
+            cache.clear("v2")
+
+        _, status = await cache.get_or_compute(("q",), make_compute(before=clear_midway))
+        return status, cache.get(("q",))
+
+    status, entry = asyncio.run(run())
+    assert status == "MISS"
+    assert entry is None
@@ -0,0 +1,33 @@
+import socket
+
+import pytest
+
+from app.utils.search_client import SearchClient
+
+
+class FakeConnection:
+    def __init__(self, error):
+        self.error = error
+        self.closed = False
+
+    def request(self, *args, **kwargs):
+        pass
+
+    def getresponse(self):
+        raise self.error
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.parametrize("error", [socket.timeout("timed out"), ValueError("bad chunk")])
+def test_connection_dropped_after_any_error(error):
+    client = SearchClient("http://search:8050", binary=False)
+    conn = FakeConnection(error)
+    client._local.conn = conn
+
+    with pytest.raises(type(error)):
+        client._post("/api/v1/search", b"{}", "application/json")
+
+    assert conn.closed
+    assert client._local.conn is None
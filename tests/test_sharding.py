@@ -0,0 +1,98 @@
+import asyncio
+import datetime
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+from bson import ObjectId
+from mongoengine import connect, disconnect
+
+from app.models.vendor_model import Vendor
+from app.routes.search import _rank
+from app.utils import bm25, sharding
+from app.utils.bm25 import build_search_indexes
+from app.utils.deadline import DeadlineExceeded
+from app.utils.hard_filter import hard_filter_vendors
+
+
+CITIES = {"Delhi": "Delhi", "Noida": "Uttar Pradesh", "Gurgaon": "Haryana", "Pune": "Maharashtra"}
+QUERIES = [
+    {"city": "Delhi"},
+    {"city": "Delhi", "locality": "Sector 3", "semantic_tags": ["royal"]},
+    {"state": "Maharashtra", "min_experience": 5},
+    {"semantic_tags": ["decor", "golden"]},
+    {},
+]
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    monkeypatch.setenv("ENABLE_BM25", "true")
+    monkeypatch.setenv("ENABLE_SEARCH_READ_ROUTING", "false")
+    disconnect()
+    connect("sharding_test", host="mongodb://localhost", mongo_client_class=mongomock.MongoClient)
+
+    rng = random.Random(3)
+    start = datetime.datetime(2024, 1, 1)
+    docs = []
+    for i in range(600):
+        city = rng.choice(list(CITIES))
+        docs.append({
+            "_id": ObjectId(),
+            "vendorName": f"{rng.choice(['Royal', 'Golden', 'Plain'])} {rng.choice(['decor', 'caterers', 'studio'])} {i}",
+            "city": city,
+            "state": CITIES[city],
+            "locality": f"Sector {rng.randint(1, 12)}",
+            "experience": rng.randint(0, 15),
+            # Coarse dates: many ties on lastActive, broken by _id
+            "lastActive": None if i % 25 == 0 else start + datetime.timedelta(days=rng.randint(0, 20)),
+        })
+    Vendor._get_collection().insert_many(docs)
+
+    saved = dict(bm25._INDEXES)
+    build_search_indexes()
+    monkeypatch.setattr(sharding, "_get_pool", lambda: ThreadPoolExecutor(4))
+    monkeypatch.setattr(sharding, "SEARCH_SHARDS", 4)
+    sharding._partitions.clear()
+    yield
+    sharding._partitions.clear()
+    bm25._INDEXES.clear()
+    bm25._INDEXES.update(saved)
+    disconnect()
+
+
+@pytest.mark.parametrize("shard_by", ["id", "state"])
+@pytest.mark.parametrize("max_depth", [None, 120])
+def test_sharded_matches_single_process(catalog, monkeypatch, shard_by, max_depth):
+    monkeypatch.setattr(sharding, "SHARD_BY", shard_by)
+    sharding._partitions.clear()
+
+    async def run(query, top_n, ratio):
+        single = _rank(
+            await hard_filter_vendors(dict(query), top_n=top_n, max_depth=max_depth, threshold_ratio=ratio),
+            dict(query), ratio,
+        )
+        sharded = await sharding.sharded_search("vendor", dict(query), top_n, max_depth, ratio)
+        return single, sharded
+
+    for query in QUERIES:
+        query = dict(query, raw_query=" ".join(str(value) for value in query.values() if not isinstance(value, list)))
+        for top_n, ratio in ((10, 0.2), (40, 0.6)):
+            single, (items, total, ids) = asyncio.run(run(query, top_n, ratio))
+
+            assert [item["_id"] for item in items] == [item["_id"] for item in single[:top_n]]
+            assert [item["_score"] for item in items] == [item["_score"] for item in single[:top_n]]
+            assert total == len(single)
+            assert ids == [item["_id"] for item in single]
+
+
+def test_workers_get_the_remaining_deadline(catalog):
+    # What is left of the request budget travels with the shard call
+    partition = sharding.compute_partitions("vendor")[0]
+    with pytest.raises(DeadlineExceeded):
+        sharding.run_shard("vendor", {"city": "Delhi"}, partition, 50, 0.2, 0, deadline_ms=0.001)
+
+    assert sharding.run_shard("vendor", {"city": "Delhi"}, partition, 50, 0.2, 0, deadline_ms=5000)["rows"]
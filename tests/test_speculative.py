@@ -0,0 +1,25 @@
+from app.utils.hard_filter import can_match_in_memory, matches_filters
+from app.utils.speculative import _extra_filters
+
+
+def test_stricter_filters_are_a_narrowing():
+    looser = {"visibility": "public"}
+    stricter = {"visibility": "public", "location__city__in": ["65a0"], "startingPrice__lte": 50000}
+    assert _extra_filters(looser, stricter) == {"location__city__in": ["65a0"], "startingPrice__lte": 50000}
+
+
+def test_changed_or_dropped_filters_are_not():
+    assert _extra_filters({"city__iexact": "Delhi"}, {"state__iexact": "Delhi"}) is None
+    assert _extra_filters({"city__iexact": "Delhi"}, {"city__iexact": "Noida"}) is None
+    assert _extra_filters({"city__iexact": "Delhi"}, {"city__iexact": "delhi"}) == {}
+
+
+def test_in_memory_filters():
+    assert can_match_in_memory({"city__iexact": "Delhi", "experience__gte": 5})
+    assert not can_match_in_memory({"pincode": "110001"})
+
+    vendor = {"vendorName": "Royal Studio", "city": "Delhi", "experience": 7, "workingSince": None}
+    assert matches_filters(vendor, {"city__iexact": "delhi", "experience__gte": 5})
+    assert not matches_filters(vendor, {"experience__gte": 10})
+    assert not matches_filters(vendor, {"workingSince__lte": 2015})
+    assert matches_filters({"venueName": "Lake Palace"}, {"title__icontains": "palace"})
@@ -0,0 +1,38 @@
+from app.utils.suggest import SUGGEST_TOP_K, SuggestIndex
+
+
+def test_type_filter_sees_entries_cut_by_other_types():
+    index = SuggestIndex(top_k=10)
+    index.bulk_load([("vendor", f"Delhi Caterer {i}", 5.0) for i in range(12)] + [("city", "Delhi", 1.0)])
+
+    assert [s["text"] for s in index.suggest("del", types={"city"})] == ["Delhi"]
+    assert all(s["type"] == "vendor" for s in index.suggest("del", limit=10))
+
+
+def test_type_filter_after_incremental_updates():
+    index = SuggestIndex(top_k=10)
+    index.upsert("city", "Delhi", 1.0)
+    for i in range(12):
+        index.upsert("vendor", f"Delhi Caterer {i}", 5.0)
+
+    assert [s["text"] for s in index.suggest("del", types={"city"})] == ["Delhi"]
+
+    index.remove("city", "Delhi")
+    assert index.suggest("del", types={"city"}) == []
+
+
+def test_limit_up_to_top_k_ordered_by_weight():
+    index = SuggestIndex()
+    index.bulk_load([("venue", f"Lake Palace {i}", float(i)) for i in range(30)])
+
+    results = index.suggest("lake", limit=SUGGEST_TOP_K)
+    assert len(results) == SUGGEST_TOP_K >= 20
+    assert [s["score"] for s in results] == sorted((float(i) for i in range(30)), reverse=True)[:SUGGEST_TOP_K]
+
+
+def test_merges_types_by_weight():
+    index = SuggestIndex()
+    index.bulk_load([("vendor", "Noida Decor", 2.0), ("city", "Noida", 3.0), ("locality", "Noida Sector 18", 1.0)])
+
+    assert [s["type"] for s in index.suggest("noi")] == ["city", "vendor", "locality"]
+    assert [s["type"] for s in index.suggest("noi", types={"vendor", "locality"})] == ["vendor", "locality"]